@@ -0,0 +1,343 @@
+"""Offline benchmarks for tickr's data, cache, display and chart paths.
+
+Providers are replayed from a fixture (synthetic by default, see benchmarks.fixtures),
+the history store and snapshot live in a throwaway data directory, and provider rate
+limits are lifted unless --rate-limits is given, so the numbers measure tickr itself.
+
+    cd src-py
+    python -m benchmarks.bench --output bench.json
+    python -m benchmarks.bench --output new.json --baseline bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+# the store, snapshot and Qt platform must be settled before tickr modules are imported
+os.environ['TICKR_DATA_DIR'] = tempfile.mkdtemp(prefix="tickr-bench-")
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import numpy as np
+
+from benchmarks import fixtures
+from tickr_backend import cache as cache_module
+from tickr_backend import data
+from tickr_backend.extremes import EXTREMES
+from tickr_backend.history import WRITE_LOCK, get_connection
+from tickr_backend.quote import Quote, price_series
+from tickr_backend.ratelimit import RATE_LIMITER, TokenBucket
+from tickr_backend.scheduler import RefreshScheduler
+from tickr_backend.screener import Screener
+
+STOCK_RANGES = ["1d", "1y", "5y"]
+CRYPTO_RANGES = ["1d", "1y"]
+CHART_SIZES = [1_000, 100_000]
+SCREENER_SIZE = 10_000
+REGRESSION_THRESHOLD = 1.2
+# sub-microsecond paths (cache hits) swing by more than the threshold on timer noise alone
+REGRESSION_MIN_DELTA_MS = 0.05
+
+def summarize(samples):
+    values = np.asarray(samples) * 1000
+    return {
+        "n": len(values),
+        "mean_ms": round(float(values.mean()), 4),
+        "median_ms": round(float(np.median(values)), 4),
+        "p95_ms": round(float(np.percentile(values, 95)), 4),
+        "min_ms": round(float(values.min()), 4),
+        "max_ms": round(float(values.max()), 4)
+    }
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+def clear_cache():
+    for key in data.DATA_CACHE.keys():
+        data.DATA_CACHE.invalidate(key)
+
+def clear_store():
+    with WRITE_LOCK:
+        conn = get_connection()
+        with conn:
+            conn.execute("DELETE FROM bars")
+    EXTREMES.clear()
+
+def lift_rate_limits():
+    for provider in list(RATE_LIMITER.buckets):
+        RATE_LIMITER.buckets[provider] = TokenBucket(1e9, 1e9)
+
+def bench_stock_paths(results, fixture):
+    symbols = list(fixture["stocks"])
+    for time_range in STOCK_RANGES:
+        cold, store, warm = [], [], []
+        clear_cache()
+        clear_store()
+        for symbol in symbols:
+            elapsed, quote = timed(data.get_stock_data, symbol, False, time_range)
+            assert quote, f"no quote for {symbol}"
+            cold.append(elapsed)
+        # the daily store is populated, only the cache is gone: the incremental-update path
+        clear_cache()
+        for symbol in symbols:
+            store.append(timed(data.get_stock_data, symbol, False, time_range)[0])
+        for _ in range(20):
+            for symbol in symbols:
+                warm.append(timed(data.get_stock_data, symbol, False, time_range)[0])
+        results[f"get_stock_data.{time_range}.cold"] = summarize(cold)
+        results[f"get_stock_data.{time_range}.store_warm"] = summarize(store)
+        results[f"get_stock_data.{time_range}.cache_warm"] = summarize(warm)
+
+    clear_cache()
+    clear_store()
+    elapsed, quotes = timed(data.get_stocks_data, symbols, False, "1y")
+    results["get_stocks_data.1y.batch_cold"] = summarize([elapsed])
+    results["get_stocks_data.1y.batch_cold_per_symbol"] = summarize([elapsed / len(symbols)])
+
+def bench_crypto_paths(results, fixture):
+    coins = [symbol for symbol in fixtures.DEFAULT_CRYPTOS if fixtures.coin_id(symbol) in fixture["coingecko"]]
+    # the coin index is refreshed daily, not per fetch; build it up front and time it on its own
+    results["coin_index.refresh"] = summarize([timed(data.COINS.refresh)[0]])
+    data.COINS.loaded = True
+    for time_range in CRYPTO_RANGES:
+        cold, warm = [], []
+        clear_cache()
+        for symbol in coins:
+            elapsed, quote = timed(data.get_crypto_data, symbol, False, time_range)
+            assert quote, f"no quote for {symbol}"
+            cold.append(elapsed)
+        for _ in range(20):
+            for symbol in coins:
+                warm.append(timed(data.get_crypto_data, symbol, False, time_range)[0])
+        results[f"get_crypto_data.{time_range}.cold"] = summarize(cold)
+        results[f"get_crypto_data.{time_range}.cache_warm"] = summarize(warm)
+    # a symbol no provider lists: negatively cached after the first lookup, no requests
+    unknown = [timed(data.get_crypto_data, "NOTACOIN", False, "1d")[0] for _ in range(20)]
+    results["get_crypto_data.unknown"] = summarize(unknown)
+
+class SimulatedTime:
+    """Stand-in for the `time` module inside cache.py, so TTLs expire on the simulated clock"""
+
+    def __init__(self, start):
+        self.now = start
+
+    def time(self):
+        return self.now
+
+def bench_refresh_simulation(results, fixture, providers, duration=600, read_every=5):
+    """Replay `duration` seconds of the UI's refresh loop and report cache behaviour.
+
+    Views mirror TickrUI: a visible stock tab, a hidden crypto tab and a hidden
+    watchlist, refreshed via RefreshScheduler exactly as refresh_data does; every
+    `read_every` seconds something re-reads the visible quote without forcing.
+    """
+    symbols = list(fixture["stocks"])
+    coins = [symbol for symbol in fixtures.DEFAULT_CRYPTOS if fixtures.coin_id(symbol) in fixture["coingecko"]]
+    clear_cache()
+    scheduler = RefreshScheduler()
+    scheduler.set_symbols("stocks", [(symbols[0], False, "1d")])
+    scheduler.set_symbols("crypto", [(coins[0], True, "1d")])
+    scheduler.set_symbols("watchlist", [(symbol, False, "1y") for symbol in symbols])
+    scheduler.set_visible("crypto", False)
+    scheduler.set_visible("watchlist", False)
+
+    real_time = cache_module.time
+    clock = SimulatedTime(time.time())
+    cache_module.time = clock
+    before = data.DATA_CACHE.stats()
+    calls_before = sum(providers.calls.values())
+    base = time.monotonic()
+    refreshes = 0
+    start = time.perf_counter()
+    try:
+        for second in range(duration):
+            clock.now += 1
+            watchlist = []
+            for view, symbol, is_crypto, time_range in scheduler.due(base + second):
+                refreshes += 1
+                if view == "watchlist":
+                    watchlist.append(symbol)
+                elif is_crypto:
+                    data.get_crypto_data(symbol, True, time_range)
+                else:
+                    data.get_stock_data(symbol, True, time_range)
+            if watchlist:
+                data.get_stocks_data(watchlist, True, "1y")
+            if second % read_every == 0:
+                data.get_stock_data(symbols[0], False, "1d")
+    finally:
+        cache_module.time = real_time
+    elapsed = time.perf_counter() - start
+
+    after = data.DATA_CACHE.stats()
+    hits = after["hits"] - before["hits"]
+    stale_hits = after["stale_hits"] - before["stale_hits"]
+    misses = after["misses"] - before["misses"]
+    lookups = hits + stale_hits + misses
+    results["refresh_simulation"] = {
+        "simulated_seconds": duration,
+        "refreshes": refreshes,
+        "provider_calls": sum(providers.calls.values()) - calls_before,
+        "hits": hits,
+        "stale_hits": stale_hits,
+        "misses": misses,
+        "hit_ratio": round((hits + stale_hits) / lookups, 4) if lookups else 0.0,
+        "wall_ms": round(elapsed * 1000, 2)
+    }
+
+def bench_screener(results, size=SCREENER_SIZE, repeat=200):
+    rng = np.random.default_rng(0)
+    screener = Screener()
+    high = rng.uniform(10, 500, size)
+    low = high * rng.uniform(0.3, 0.9, size)
+    symbols = [f"S{i:05d}" for i in range(size)]
+    screener.update_many(symbols, current=rng.uniform(low, high), high=high, low=low,
+                         volume=rng.lognormal(13, 1, size), avg_volume=rng.lognormal(13, 1, size),
+                         change_percent=rng.normal(0, 2, size))
+    where = "pct_from_high > -2 and rel_volume > 1.5"
+    results[f"screener.filter.{size}"] = summarize([timed(screener.screen, where)[0] for _ in range(repeat)])
+    results[f"screener.top20.{size}"] = summarize(
+        [timed(screener.screen, where, "rel_volume", 20)[0] for _ in range(repeat)])
+    quote = make_quote(100.0)
+    results["screener.update"] = summarize([timed(screener.update, quote)[0] for _ in range(repeat)])
+
+def make_quote(price, length=390):
+    return Quote("BENCH", price, price, price - 1, price + 5, price - 5, 1.0, 1.0, 25.0, 2e12,
+                 10_000_000, 20_000_000, price * 0.999, price * 1.001,
+                 price_series(np.linspace(price - 5, price, length)), "1d", "stock", time.time())
+
+def bench_ui(results, repeat=200):
+    from PySide6.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    from tickr_backend.ui import TickrUI
+    from tickr_backend.chart import ChartWidget
+
+    window = TickrUI()
+    window.resize(1200, 900)
+    window.show()
+    app.processEvents()
+    tab = window.stock_tab
+    labels = window.labels_for(tab)
+
+    changed, unchanged, with_chart = [], [], []
+    same = make_quote(100.0)
+    for i in range(repeat):
+        quote = make_quote(100.0 + (i % 50) * 0.25)
+        changed.append(timed(lambda: (window.update_display(quote, labels, None), app.processEvents()))[0])
+        window.update_display(same, labels, None)
+        unchanged.append(timed(lambda: (window.update_display(same, labels, None), app.processEvents()))[0])
+    chart = window.ensure_chart(tab)
+    for i in range(repeat // 4):
+        quote = make_quote(100.0 + i * 0.25)
+        with_chart.append(timed(lambda: (window.update_display(quote, labels, chart), chart.canvas.draw(),
+                                         app.processEvents()))[0])
+    results["update_display.changed"] = summarize(changed)
+    results["update_display.unchanged"] = summarize(unchanged)
+    results["update_display.with_chart"] = summarize(with_chart)
+    window.close()
+
+    widget = ChartWidget()
+    widget.resize(1000, 400)
+    widget.show()
+    app.processEvents()
+    rng = np.random.default_rng(0)
+    for size in CHART_SIZES:
+        base = 100 + np.cumsum(rng.normal(0, 1, size))
+        full = []
+        for i in range(10):
+            # a different series each time so update_chart can't short-circuit
+            full.append(timed(lambda: (widget.update_chart(base + i, f"bench {size}"), widget.canvas.draw()))[0])
+        ticks = []
+        for i in range(200):
+            ticks.append(timed(widget.append_point, float(base[-1] + rng.normal(0, 0.1)))[0])
+        results[f"chart.update_chart.{size}"] = summarize(full)
+        results[f"chart.append_point.{size}"] = summarize(ticks)
+    widget.close()
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD, min_delta_ms=REGRESSION_MIN_DELTA_MS):
+    """Print median ratios against a baseline run; returns the names that got slower than `threshold`"""
+    regressions = []
+    for name, current in sorted(results["results"].items()):
+        previous = baseline.get("results", {}).get(name)
+        if not previous or "median_ms" not in current or not previous.get("median_ms"):
+            continue
+        ratio = current["median_ms"] / previous["median_ms"]
+        regressed = ratio > threshold and current["median_ms"] - previous["median_ms"] > min_delta_ms
+        flag = "  REGRESSION" if regressed else ""
+        print(f"  {name:<40} {previous['median_ms']:10.3f} -> {current['median_ms']:10.3f} ms  x{ratio:.2f}{flag}")
+        if regressed:
+            regressions.append(name)
+    if baseline.get("meta", {}).get("fixture") != results["meta"]["fixture"]:
+        print("  note: baseline used a different fixture")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="benchmarks.bench", description="Run tickr's offline benchmarks")
+    parser.add_argument('--fixtures', help="fixture file from benchmarks.fixtures (default: generated synthetic data)")
+    parser.add_argument('--output', default="bench-results.json", help="where to write the JSON results")
+    parser.add_argument('--baseline', help="earlier results file to compare medians against")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help="median slowdown ratio reported as a regression")
+    parser.add_argument('--latency', type=float, default=0.0, help="simulated milliseconds per provider request")
+    parser.add_argument('--rate-limits', action='store_true', help="keep the real provider rate limits")
+    parser.add_argument('--skip-ui', action='store_true', help="skip the Qt display and chart benchmarks")
+    args = parser.parse_args(argv)
+
+    fixture = fixtures.load(args.fixtures) if args.fixtures else fixtures.generate()
+    if not args.rate_limits:
+        lift_rate_limits()
+
+    results = {}
+    with fixtures.FixtureProviders(fixture, latency=args.latency / 1000) as providers:
+        bench_stock_paths(results, fixture)
+        bench_crypto_paths(results, fixture)
+        bench_refresh_simulation(results, fixture, providers)
+        bench_screener(results)
+        if not args.skip_ui:
+            bench_ui(results)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "fixture": fixtures.fixture_digest(fixture),
+            "fixture_source": fixture.get("source"),
+            "latency_ms": args.latency,
+            "rate_limits": args.rate_limits
+        },
+        "results": results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    for name, summary in results.items():
+        if "median_ms" in summary:
+            print(f"  {name:<40} median {summary['median_ms']:10.3f} ms  p95 {summary['p95_ms']:10.3f} ms  (n={summary['n']})")
+        else:
+            print(f"  {name:<40} {summary}")
+    print(f"wrote {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"compared with {args.baseline}:")
+        if compare(report, baseline, args.threshold):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
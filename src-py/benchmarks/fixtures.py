@@ -0,0 +1,350 @@
+"""Provider fixtures for offline benchmarks.
+
+A fixture holds everything tickr asks Yahoo, CoinGecko and CoinMarketCap for:
+daily and intraday bars plus quote-summary fields per stock, market data and price
+points per coin. `generate` builds a deterministic synthetic one, `record` captures
+the live providers once, and `FixtureProviders` replays either by patching
+yfinance, the get_json used by data and coins, and the symbol master download.
+
+    python -m benchmarks.fixtures generate --out fixtures.json.gz
+    python -m benchmarks.fixtures record --out fixtures.json.gz --stocks AAPL MSFT --cryptos BTC ETH
+"""
+import argparse
+import gzip
+import json
+import threading
+import time
+import zlib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+FIXTURE_VERSION = 1
+DEFAULT_STOCKS = ["AAPL", "MSFT", "NVDA", "AMZN", "GOOGL", "META", "TSLA", "JPM", "XOM", "KO"]
+DEFAULT_CRYPTOS = ["BTC", "ETH", "SOL", "DOGE"]
+EXCHANGE_TZ = "America/New_York"
+BAR_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+# interval -> (yfinance period recorded, bar spacing) for the ranges data.py asks for
+INTRADAY = {"1m": ("1d", "1min"), "5m": ("1d", "5min"), "30m": ("5d", "30min"), "1wk": ("5y", "W-FRI")}
+PERIOD_DAYS = {"1d": 1, "5d": 5, "1mo": 31, "3mo": 92, "1y": 365, "5y": 1826}
+
+def encode_frame(frame):
+    index = frame.index if frame.index.tz is not None else frame.index.tz_localize(EXCHANGE_TZ)
+    return {
+        "index": (index.tz_convert("UTC").asi8 // 10**9).tolist(),
+        "columns": {column: frame[column].astype(float).tolist() for column in frame.columns}
+    }
+
+def decode_frame(encoded):
+    index = pd.to_datetime(encoded["index"], unit="s", utc=True).tz_convert(EXCHANGE_TZ)
+    return pd.DataFrame(encoded["columns"], index=index)
+
+def random_walk(rng, start, steps, volatility):
+    return start * np.exp(np.cumsum(rng.normal(0, volatility, steps)))
+
+def synthetic_bars(rng, index, start, volatility):
+    close = random_walk(rng, start, len(index), volatility)
+    spread = close * rng.uniform(0.001, volatility * 2, len(index))
+    frame = pd.DataFrame({
+        "Open": close * (1 + rng.normal(0, volatility / 4, len(index))),
+        "High": close + spread,
+        "Low": close - spread,
+        "Close": close,
+        "Volume": rng.integers(1_000_000, 50_000_000, len(index)).astype(float)
+    }, index=index)
+    return frame
+
+def generate(stocks=DEFAULT_STOCKS, cryptos=DEFAULT_CRYPTOS, seed=0, end="2025-06-13"):
+    """Deterministic synthetic fixture with the same shape as a recorded one"""
+    end = pd.Timestamp(end)
+    fixture = {"version": FIXTURE_VERSION, "source": "synthetic", "created": end.isoformat(),
+               "stocks": {}, "coingecko": {}, "coinmarketcap": {}}
+    for position, symbol in enumerate(stocks):
+        rng = np.random.default_rng(seed + position)
+        start = float(rng.uniform(20, 800))
+        daily = synthetic_bars(rng, pd.bdate_range(end=end, periods=5 * 252, tz=EXCHANGE_TZ), start, 0.02)
+        daily["Dividends"] = 0.0
+        daily["Stock Splits"] = 0.0
+        last = float(daily["Close"].iloc[-1])
+        bars = {"1d": encode_frame(daily)}
+        session_close = end + pd.Timedelta(hours=15, minutes=59)
+        for interval, (period, spacing) in INTRADAY.items():
+            if interval == "1wk":
+                index = pd.date_range(end=end, periods=260, freq=spacing, tz=EXCHANGE_TZ)
+            else:
+                periods = {"1m": 390, "5m": 78, "30m": 65}[interval]
+                index = pd.date_range(end=session_close, periods=periods, freq=spacing, tz=EXCHANGE_TZ)
+            bars[interval] = encode_frame(synthetic_bars(rng, index, last, 0.002))
+        fixture["stocks"][symbol] = {
+            "info": {"marketCap": last * 1e9, "trailingPE": float(rng.uniform(8, 60)),
+                     "averageVolume": float(daily["Volume"].mean())},
+            "bars": bars
+        }
+
+    end_ms = int(end.tz_localize("UTC").timestamp() * 1000)
+    for position, symbol in enumerate(cryptos):
+        rng = np.random.default_rng(seed + 1000 + position)
+        price = float(rng.uniform(0.1, 60000))
+        daily = random_walk(rng, price, 1825, 0.03)
+        hourly = random_walk(rng, float(daily[-1]), 90 * 24, 0.005)
+        five_minute = random_walk(rng, float(hourly[-1]), 288, 0.001)
+        current = float(five_minute[-1])
+        fixture["coingecko"][coin_id(symbol)] = {
+            "market": {"market_data": {
+                "current_price": {"usd": current},
+                "market_cap": {"usd": current * 1e8},
+                "total_volume": {"usd": current * 1e6},
+                "price_change_24h": current - float(five_minute[0])
+            }},
+            "daily": points(end_ms, daily, 24 * 3600 * 1000),
+            "hourly": points(end_ms, hourly, 3600 * 1000),
+            "intraday": points(end_ms, five_minute, 300 * 1000)
+        }
+        fixture["coinmarketcap"][cmc_id(symbol)] = {
+            "price": current, "open_24h": float(five_minute[0]), "high_24h": float(five_minute.max()),
+            "low_24h": float(five_minute.min()), "percent_change_24h": (current / float(five_minute[0]) - 1) * 100,
+            "market_cap": current * 1e8, "volume_24h": current * 1e6
+        }
+    fixture["symbols"] = directory_files(stocks, end)
+    return fixture
+
+def directory_files(stocks, created):
+    """nasdaqlisted.txt and otherlisted.txt in Nasdaq Trader's layout, listing the fixture's stocks"""
+    stamp = pd.Timestamp(created).strftime("%m%d%Y%H:%M")
+    nasdaq = ["Symbol|Security Name|Market Category|Test Issue|Financial Status|Round Lot Size|ETF|NextShares"]
+    other = ["ACT Symbol|Security Name|Exchange|CQS Symbol|ETF|Round Lot Size|Test Issue|NASDAQ Symbol"]
+    for position, symbol in enumerate(stocks):
+        name = f"{symbol} Holdings Inc. - Common Stock"
+        if position % 2 == 0:
+            nasdaq.append(f"{symbol}|{name}|Q|N|N|100|N|N")
+        else:
+            other.append(f"{symbol}|{name}|N|{symbol}|N|100|N|{symbol}")
+    nasdaq.append(f"File Creation Time: {stamp}|||||||")
+    other.append(f"File Creation Time: {stamp}|||||||")
+    return {"nasdaqlisted": "\n".join(nasdaq), "otherlisted": "\n".join(other)}
+
+def points(end_ms, prices, step_ms):
+    return [[end_ms - (len(prices) - 1 - i) * step_ms, float(price)] for i, price in enumerate(prices)]
+
+def coin_id(symbol):
+    from tickr_backend.data import CRYPTO_MAPPING
+    return CRYPTO_MAPPING.get(symbol, {}).get('coingecko', symbol.lower())
+
+def cmc_id(symbol):
+    from tickr_backend.data import CRYPTO_MAPPING
+    return CRYPTO_MAPPING.get(symbol, {}).get('coinmarketcap', symbol)
+
+def record(stocks=DEFAULT_STOCKS, cryptos=DEFAULT_CRYPTOS):
+    """Capture the live providers once, in the same shape `generate` produces"""
+    import yfinance as yf
+    from tickr_backend.data import FUNDAMENTAL_FIELDS, COINMARKETCAP_API_KEY
+    from tickr_backend.transport import get_json
+
+    fixture = {"version": FIXTURE_VERSION, "source": "recorded",
+               "created": datetime.now(timezone.utc).isoformat(),
+               "stocks": {}, "coingecko": {}, "coinmarketcap": {}}
+    for symbol in stocks:
+        ticker = yf.Ticker(symbol)
+        bars = {"1d": encode_frame(ticker.history(period="5y", actions=True))}
+        for interval, (period, _) in INTRADAY.items():
+            bars[interval] = encode_frame(ticker.history(period=period, interval=interval)[BAR_COLUMNS])
+        info = ticker.info
+        fixture["stocks"][symbol] = {"info": {field: info.get(field) for field in FUNDAMENTAL_FIELDS}, "bars": bars}
+        print(f"recorded {symbol}")
+
+    base = "https://api.coingecko.com/api/v3/coins/"
+    for symbol in cryptos:
+        coin = coin_id(symbol)
+        market = get_json(base + coin, provider='coingecko')["market_data"]
+        chart = lambda days: get_json(f"{base}{coin}/market_chart", {"vs_currency": "usd", "days": days},
+                                      provider='coingecko')["prices"]
+        fixture["coingecko"][coin] = {
+            "market": {"market_data": {field: market.get(field) for field in
+                                       ("current_price", "market_cap", "total_volume", "price_change_24h")}},
+            "daily": chart("1825"),
+            "hourly": chart("90"),
+            "intraday": chart("1")
+        }
+        if COINMARKETCAP_API_KEY and COINMARKETCAP_API_KEY != 'your-api-key-here':
+            url = "https://pro-api.coinmarketcap.com/v1/cryptocurrency/quotes/latest"
+            data = get_json(url, {'id': cmc_id(symbol), 'convert': 'USD'},
+                            {'X-CMC_PRO_API_KEY': COINMARKETCAP_API_KEY}, provider='coinmarketcap')
+            fixture["coinmarketcap"][cmc_id(symbol)] = data['data'][str(cmc_id(symbol))]['quote']['USD']
+        print(f"recorded {symbol}")
+    # the real directory files run to megabytes, the symbol master only needs the recorded stocks
+    fixture["symbols"] = directory_files(stocks, fixture["created"])
+    return fixture
+
+def save(fixture, path):
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        json.dump(fixture, f)
+
+def load(path):
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        fixture = json.load(f)
+    if fixture.get("version") != FIXTURE_VERSION:
+        raise ValueError(f"{path} is fixture version {fixture.get('version')}, expected {FIXTURE_VERSION}")
+    return fixture
+
+class FixtureError(Exception):
+    """Raised for requests the fixture has no answer for, like an unknown coin (a 404 upstream)"""
+
+class FakeTicker:
+    def __init__(self, providers, symbol):
+        self.providers = providers
+        self.symbol = symbol
+
+    @property
+    def info(self):
+        self.providers.hit("yahoo.info")
+        stock = self.providers.fixture["stocks"].get(self.symbol)
+        return dict(stock["info"]) if stock else {}
+
+    def history(self, period=None, interval="1d", start=None, **kwargs):
+        self.providers.hit("yahoo.history")
+        return self.providers.bars(self.symbol, period, interval, start)
+
+class FixtureProviders:
+    """Context manager that serves yfinance, the get_json of data and coins and the symbol master from a fixture.
+
+    `latency` seconds are slept per simulated request so concurrency effects
+    (parallel fundamentals, hedging) still show up; `calls` counts requests by kind.
+    """
+
+    def __init__(self, fixture, latency=0.0):
+        self.fixture = fixture
+        self.latency = latency
+        self.calls = Counter()
+        self.lock = threading.Lock()
+        self.frames = {}
+        self.patched = []
+        self.pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="fixture-json")
+
+    def hit(self, kind):
+        with self.lock:
+            self.calls[kind] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def frame(self, symbol, interval):
+        key = (symbol, interval)
+        if key not in self.frames:
+            stock = self.fixture["stocks"].get(symbol)
+            encoded = stock and stock["bars"].get(interval)
+            self.frames[key] = decode_frame(encoded) if encoded else pd.DataFrame(columns=BAR_COLUMNS)
+        return self.frames[key]
+
+    def bars(self, symbol, period=None, interval="1d", start=None):
+        frame = self.frame(symbol, interval)
+        if frame.empty:
+            return frame.copy()
+        if start is not None:
+            return frame[frame.index >= pd.Timestamp(start).tz_localize(EXCHANGE_TZ)].copy()
+        if period in PERIOD_DAYS:
+            return frame[frame.index > frame.index[-1] - pd.Timedelta(days=PERIOD_DAYS[period])].copy()
+        return frame.copy()
+
+    def download(self, tickers, period=None, interval="1d", start=None, **kwargs):
+        self.hit("yahoo.download")
+        tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+        frames = {symbol: self.bars(symbol, period, interval, start) for symbol in tickers
+                  if symbol in self.fixture["stocks"]}
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, axis=1, names=["Ticker", "Price"])
+
+    def coin_symbols(self):
+        """(coin id, symbol) for every coin in the fixture, symbols taken from the pinned mapping"""
+        from tickr_backend.data import CRYPTO_MAPPING
+        symbols = {ids['coingecko']: symbol for symbol, ids in CRYPTO_MAPPING.items()}
+        return [(coin, symbols.get(coin, coin.upper())) for coin in self.fixture["coingecko"]]
+
+    def get_json(self, url, params=None, headers=None, provider=None, **kwargs):
+        self.hit(f"{provider}.json")
+        params = params or {}
+        # the coin index: every fixture coin is listed and ranked in fixture order
+        if url.endswith("/coins/list"):
+            return [{"id": coin, "symbol": symbol.lower(), "name": coin} for coin, symbol in self.coin_symbols()]
+        if url.endswith("/coins/markets"):
+            if int(params.get("page", 1)) > 1:
+                return []
+            return [{"id": coin, "market_cap_rank": rank} for rank, (coin, _) in enumerate(self.coin_symbols(), 1)]
+        if url.endswith("/cryptocurrency/map"):
+            from tickr_backend.data import CRYPTO_MAPPING
+            listed = [(ids['coinmarketcap'], symbol) for symbol, ids in CRYPTO_MAPPING.items()
+                      if ids['coinmarketcap'] in self.fixture["coinmarketcap"]]
+            return {"data": [{"id": int(coin_id), "symbol": symbol, "rank": rank, "is_active": 1}
+                             for rank, (coin_id, symbol) in enumerate(listed, 1)]}
+        if "coinmarketcap" in url:
+            quote = self.fixture["coinmarketcap"].get(str(params.get('id')))
+            if quote is None:
+                raise FixtureError(f"no CoinMarketCap fixture for id {params.get('id')}")
+            return {"data": {str(params['id']): {"quote": {"USD": quote}}}}
+        path = url.split("/coins/", 1)[1]
+        coin, _, endpoint = path.partition("/")
+        entry = self.fixture["coingecko"].get(coin)
+        if entry is None:
+            raise FixtureError(f"no CoinGecko fixture for {coin}")
+        if endpoint != "market_chart":
+            return entry["market"]
+        days = float(params.get("days", 1))
+        # CoinGecko's own granularity rules: 5-minute for 1 day, hourly up to 90, daily beyond
+        series = entry["intraday"] if days <= 1 else entry["hourly"] if days <= 90 else entry["daily"]
+        cutoff = series[-1][0] - days * 24 * 3600 * 1000
+        return {"prices": [point for point in series if point[0] > cutoff]}
+
+    def submit_json(self, *args, **kwargs):
+        return self.pool.submit(self.get_json, *args, **kwargs)
+
+    def symbol_directory(self):
+        """SymbolDirectory.download from the fixture's directory files"""
+        from tickr_backend.symbols import parse_directory
+        self.hit("nasdaqtrader.directory")
+        # fixtures saved before the directory files were added list their stocks all the same
+        files = self.fixture.get("symbols") or directory_files(list(self.fixture["stocks"]), self.fixture["created"])
+        return (parse_directory(files["nasdaqlisted"], "Symbol")
+                + parse_directory(files["otherlisted"], "ACT Symbol", "Exchange"))
+
+    def __enter__(self):
+        import yfinance as yf
+        from tickr_backend import coins, data
+        from tickr_backend.symbols import SymbolDirectory
+        for owner, name, value in ((yf, "Ticker", lambda symbol: FakeTicker(self, symbol)),
+                                   (yf, "download", self.download),
+                                   (data, "get_json", self.get_json),
+                                   (data, "submit_json", self.submit_json),
+                                   (coins, "get_json", self.get_json),
+                                   (SymbolDirectory, "download", lambda directory: self.symbol_directory())):
+            self.patched.append((owner, name, getattr(owner, name)))
+            setattr(owner, name, value)
+        return self
+
+    def __exit__(self, *exc_info):
+        while self.patched:
+            owner, name, value = self.patched.pop()
+            setattr(owner, name, value)
+
+def fixture_digest(fixture):
+    """Short content hash, stored with results so runs on different fixtures aren't compared"""
+    return f"{zlib.crc32(json.dumps(fixture, sort_keys=True).encode()):08x}"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="benchmarks.fixtures", description="Create provider fixtures for the benchmarks")
+    parser.add_argument('mode', choices=['generate', 'record'])
+    parser.add_argument('--out', required=True, help="fixture file to write (.json.gz)")
+    parser.add_argument('--stocks', nargs='+', default=DEFAULT_STOCKS)
+    parser.add_argument('--cryptos', nargs='+', default=DEFAULT_CRYPTOS)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    if args.mode == 'generate':
+        fixture = generate(args.stocks, args.cryptos, args.seed)
+    else:
+        fixture = record(args.stocks, args.cryptos)
+    save(fixture, args.out)
+    print(f"wrote {args.out} ({len(fixture['stocks'])} stocks, {len(fixture['coingecko'])} coins)")
+
+if __name__ == "__main__":
+    main()
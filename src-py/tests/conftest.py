@@ -0,0 +1,8 @@
+import os
+import sys
+import tempfile
+
+# the backend keeps its history store, coin index and snapshot under TICKR_DATA_DIR;
+# tests must never touch the user's ~/.tickr
+os.environ['TICKR_DATA_DIR'] = tempfile.mkdtemp(prefix="tickr-tests-")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("yfinance")
+
+from tickr_backend.backfill import Checkpoint, normalize, read_part, to_columns, write_part
+from tickr_backend.history import COLUMNS
+
+
+def grouped_download(bars_by_symbol):
+    """A frame shaped like yf.download(group_by="ticker"): (symbol, field) columns"""
+    return pd.concat(bars_by_symbol, axis=1)
+
+
+def bars(closes, start="2024-01-01"):
+    index = pd.date_range(start, periods=len(closes), freq="D", tz="America/New_York", name="Date")
+    closes = np.asarray(closes, dtype=np.float64)
+    return pd.DataFrame({"Open": closes - 1, "High": closes + 1, "Low": closes - 2,
+                         "Close": closes, "Volume": np.full(len(closes), 1000.0)}, index=index)[COLUMNS]
+
+
+def test_to_columns_groups_rows_by_symbol_and_reports_missing():
+    frames = grouped_download({"AAPL": bars([10.0, np.nan, 12.0]), "MSFT": bars([np.nan, np.nan]),
+                               "SPY": bars([1.0, 2.0])})
+    columns, kept, missing = to_columns(frames, ["AAPL", "MSFT", "SPY", "NOPE"])
+    assert kept == ["AAPL", "SPY"] and missing == ["MSFT", "NOPE"]
+    assert columns["offsets"].tolist() == [0, 2, 4]
+    assert columns["close"].tolist() == [10.0, 12.0, 1.0, 2.0]
+    assert columns["date"].dtype == np.dtype("datetime64[D]")
+
+
+def test_to_columns_of_an_empty_download():
+    columns, kept, missing = to_columns(pd.DataFrame(), ["AAPL"])
+    assert kept == [] and missing == ["AAPL"]
+    assert columns["offsets"].tolist() == [0] and len(columns["close"]) == 0
+
+
+@pytest.mark.parametrize("fmt", ["npz", "parquet"])
+def test_part_round_trip(tmp_path, fmt):
+    if fmt == "parquet":
+        pytest.importorskip("pyarrow")
+    frames = grouped_download({"AAPL": bars([10.0, 11.0, 12.0]), "SPY": bars([1.0, 2.0])})
+    columns, _, _ = to_columns(frames, ["AAPL", "SPY"])
+    path = str(tmp_path / f"part-00000.{fmt}")
+    write_part(columns, path, fmt)
+
+    parts = read_part(path)
+    assert list(parts) == ["AAPL", "SPY"]
+    assert list(parts["AAPL"].columns) == COLUMNS
+    assert parts["AAPL"]["Close"].tolist() == [10.0, 11.0, 12.0]
+    assert parts["SPY"].index[0] == pd.Timestamp("2024-01-01")
+
+
+def test_checkpoint_records_and_refuses_another_config(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    config = {"period": "5y", "interval": "1d"}
+    checkpoint = Checkpoint.load(path, config)
+    checkpoint.record(["AAPL"], ["NOPE"], "timeout")
+    checkpoint.save()
+    checkpoint = Checkpoint.load(path, config)
+    checkpoint.record(["NOPE"], [])
+    assert checkpoint.done == {"AAPL", "NOPE"} and checkpoint.failed == {}
+    with pytest.raises(ValueError):
+        Checkpoint.load(path, {"period": "1y", "interval": "1d"})
+
+
+def test_normalize_dedupes_in_order():
+    assert normalize(["aapl", " msft ", "", "AAPL"]) == ["AAPL", "MSFT"]
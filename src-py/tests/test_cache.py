@@ -0,0 +1,120 @@
+import threading
+import time
+
+import pytest
+
+from tickr_backend.cache import QuoteCache
+
+
+def test_fresh_entry_is_a_hit():
+    cache = QuoteCache(ttl=60)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_expired_entry_is_only_served_stale_within_max_stale():
+    cache = QuoteCache(ttl=60, max_stale=100)
+    cache.restore("a", 1, time.time() - 90, 60)
+    assert cache.get("a") is None
+    assert cache.get("a", allow_stale=True) == 1
+
+    cache.restore("b", 2, time.time() - 200, 60)
+    assert cache.get("b", allow_stale=True) is None
+    stats = cache.stats()
+    assert (stats["stale_hits"], stats["misses"]) == (1, 2)
+
+
+def test_restore_keeps_a_newer_entry():
+    cache = QuoteCache()
+    cache.set("a", "new")
+    cache.restore("a", "old", time.time() - 10, 60)
+    assert cache.get("a") == "new"
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = QuoteCache(max_entries=2)
+    removed = []
+    cache.subscribe_removals(lambda key, value: removed.append((key, value)))
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.keys() == ["a", "c"]
+    assert removed == [("b", 2)]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_invalidate_notifies_removal_listeners():
+    cache = QuoteCache()
+    removed = []
+    cache.subscribe_removals(lambda key, value: removed.append(key))
+    cache.set("a", 1)
+    cache.invalidate("a")
+    cache.invalidate("missing")
+    assert "a" not in cache
+    assert removed == ["a"]
+
+
+def test_listeners_see_every_store():
+    cache = QuoteCache()
+    stored = []
+    cache.subscribe(lambda key, value: stored.append((key, value)))
+    cache.set("a", 1)
+    cache.restore("b", 2, time.time(), 60)
+    assert stored == [("a", 1), ("b", 2)]
+
+
+def test_concurrent_loads_share_one_call():
+    cache = QuoteCache()
+    release = threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        release.wait(5)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.load("k", loader))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    while cache.stats()["coalesced"] < 7:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert calls == [1]
+    assert results == ["value"] * 8
+    assert cache.get("k") == "value"
+    assert cache.stats()["inflight"] == 0
+
+
+def test_failed_load_is_not_cached_and_can_be_retried():
+    cache = QuoteCache()
+
+    def failing():
+        raise RuntimeError("provider down")
+
+    with pytest.raises(RuntimeError):
+        cache.load("k", failing)
+    assert cache.stats()["inflight"] == 0
+    assert cache.load("k", lambda: None) is None
+    assert "k" not in cache
+    assert cache.load("k", lambda: 3) == 3
+
+
+def test_get_or_load_serves_stale_while_refreshing():
+    cache = QuoteCache(ttl=60)
+    cache.restore("k", "old", time.time() - 120, 60)
+    refreshed = threading.Event()
+
+    def loader():
+        refreshed.set()
+        return "new"
+
+    assert cache.get_or_load("k", loader) == "old"
+    assert refreshed.wait(5)
+    cache.refresher.shutdown(wait=True)
+    assert cache.get("k") == "new"
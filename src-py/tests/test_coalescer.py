@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+pytest.importorskip("PySide6")
+
+from PySide6.QtCore import QCoreApplication
+
+from tickr_backend.coalescer import UpdateCoalescer
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+def run_until(app, condition, timeout=2.0):
+    deadline = time.perf_counter() + timeout
+    while not condition() and time.perf_counter() < deadline:
+        app.processEvents()
+        time.sleep(0.001)
+    return condition()
+
+
+def test_only_the_newest_update_per_key_is_applied(app):
+    coalescer = UpdateCoalescer(max_fps=30)
+    applied = []
+    for price in (1, 2, 3):
+        coalescer.push(("stocks", "AAPL"), applied.append, ("AAPL", price))
+    coalescer.push(("stocks", "MSFT"), applied.append, ("MSFT", 9))
+    assert applied == []
+    assert run_until(app, lambda: len(applied) == 2)
+    assert applied == [("AAPL", 3), ("MSFT", 9)]
+    assert (coalescer.received, coalescer.applied, coalescer.dropped) == (4, 2, 2)
+
+
+def test_flushes_are_capped_at_the_frame_rate(app):
+    coalescer = UpdateCoalescer(max_fps=30)
+    flushes = []
+    started = time.perf_counter()
+    deadline = started + 0.25
+    # a result every millisecond for a quarter of a second
+    while time.perf_counter() < deadline:
+        coalescer.push("key", lambda: flushes.append(time.perf_counter()))
+        app.processEvents()
+        time.sleep(0.001)
+    run_until(app, lambda: not coalescer.pending)
+    assert coalescer.received > 100
+    assert 3 <= len(flushes) <= 9
+    gaps = [later - earlier for earlier, later in zip(flushes, flushes[1:])]
+    assert min(gaps) >= 0.025
+    assert not coalescer.timer.isActive()
+
+
+def test_discard_and_failing_updates_leave_the_rest(app, capsys):
+    coalescer = UpdateCoalescer(max_fps=60)
+    applied = []
+    coalescer.push("gone", applied.append, "gone")
+    coalescer.push("broken", lambda: 1 / 0)
+    coalescer.push("kept", applied.append, "kept")
+    coalescer.discard("gone")
+    assert run_until(app, lambda: applied == ["kept"])
+    assert "Error applying UI update" in capsys.readouterr().out
@@ -0,0 +1,76 @@
+import time
+
+from tickr_backend import coins
+from tickr_backend.coins import CoinIndex, rank_coingecko, rank_coinmarketcap
+
+
+def make_index(tmp_path, lists=None, **kwargs):
+    index = CoinIndex(pinned={"BTC": {"coingecko": "bitcoin"}}, path=str(tmp_path / "coins.json"), **kwargs)
+    downloads = []
+
+    def download():
+        downloads.append(time.time())
+        return lists or {"coingecko": {"ETH": "ethereum", "BTC": "bitcoin-fork"}, "coinmarketcap": {"ETH": "1027"}}
+
+    index.download = download
+    return index, downloads
+
+
+def test_ranking_prefers_market_cap_then_shortest_id():
+    coins_list = [{"id": "ethereum", "symbol": "eth"}, {"id": "eth-wormhole", "symbol": "eth"},
+                  {"id": "aa-token", "symbol": "aaa"}, {"id": "a-token", "symbol": "aaa"}]
+    assert rank_coingecko(coins_list, {"ethereum": 2}) == {"ETH": "ethereum", "AAA": "a-token"}
+    entries = [{"id": 1, "symbol": "x", "rank": 9}, {"id": 2, "symbol": "X", "rank": 3},
+               {"id": 3, "symbol": "X", "rank": 1, "is_active": 0}]
+    assert rank_coinmarketcap(entries) == {"X": "2"}
+
+
+def test_pinned_ids_win_over_the_lists(tmp_path):
+    index, _ = make_index(tmp_path)
+    assert index.resolve("btc") == {"coingecko": "bitcoin", "coinmarketcap": None}
+    assert index.provider_id("ETH", "coinmarketcap") == "1027"
+
+
+def test_unresolved_symbols_are_skipped_until_the_next_refresh(tmp_path, monkeypatch):
+    monkeypatch.setattr(coins, "COINS_SAVE_DELAY", 60)
+    index, downloads = make_index(tmp_path)
+    assert index.resolve("NOPE") == {"coingecko": None, "coinmarketcap": None}
+    before = index.unresolved
+    index.mark_unresolved("nope")
+    assert index.resolve("NOPE") is None
+    # readers holding the old set never see it change
+    assert before == set() and index.unresolved == {"NOPE"}
+    assert index.save_timer is not None
+    index.save()
+    assert index.save_timer is None
+
+    reloaded, _ = make_index(tmp_path)
+    assert reloaded.resolve("NOPE") is None
+
+    index.fetched_at = time.time() - index.max_age - 1
+    assert index.resolve("NOPE") == {"coingecko": None, "coinmarketcap": None}
+    assert len(downloads) == 2
+
+
+def test_nothing_is_ruled_out_without_a_coin_list(tmp_path):
+    index, _ = make_index(tmp_path)
+    index.download = lambda: (_ for _ in ()).throw(OSError("offline"))
+    index.resolve("NOPE")
+    index.mark_unresolved("NOPE")
+    assert index.unresolved == set()
+    assert index.retry_at > time.time()
+
+
+def test_failed_refresh_keeps_the_old_index_and_waits_before_retrying(tmp_path):
+    index, downloads = make_index(tmp_path)
+    index.resolve("ETH")
+    index.fetched_at = 0
+
+    def fail():
+        downloads.append(time.time())
+        raise OSError("offline")
+
+    index.download = fail
+    assert index.resolve("ETH")["coingecko"] == "ethereum"
+    assert index.resolve("ETH")["coingecko"] == "ethereum"
+    assert len(downloads) == 2
@@ -0,0 +1,90 @@
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("yfinance")
+
+from tickr_backend import data
+
+
+def daily_bars(closes, start="2024-01-01"):
+    index = pd.date_range(start, periods=len(closes), freq="B")
+    return pd.DataFrame({"Open": closes, "High": closes, "Low": closes, "Close": closes,
+                         "Volume": [1000.0] * len(closes)}, index=index)
+
+
+def test_bar_quotes_leave_bid_and_ask_unknown():
+    hist = daily_bars([10.0, 11.0, 12.0])
+    quote = data.build_stock_result("BIDASK", hist, hist.iloc[-1:], data.bar_quote_info(hist), hist["Close"], "1y")
+    assert quote.bid is None and quote.ask is None
+    assert (quote.current, quote.prev_close, quote.change) == (12.0, 11.0, 1.0)
+    assert quote.to_dict()["bid"] is None
+
+
+def test_unknown_ranges_fall_back_to_a_year():
+    assert data.normalize_range("5y") == "5y"
+    assert data.normalize_range("2y") == "1y"
+    assert set(data.STOCK_RANGES) == set(data.RANGE_DAYS)
+
+
+def test_trim_keeps_the_points_inside_the_range():
+    closes = daily_bars([float(day) for day in range(40)], start="2024-01-01")["Close"]
+    trimmed = data.trim_to_range(closes, "1m")
+    assert trimmed.index[-1] == closes.index[-1]
+    assert (closes.index[-1] - trimmed.index[0]).days < 31
+    assert len(data.trim_to_range(closes, "5y")) == 40
+
+
+def test_store_ranges_slice_daily_bars_and_intraday_ranges_ask_yahoo(monkeypatch):
+    requests = []
+    monkeypatch.setattr(data, "yahoo_submit", lambda fn, **kwargs: requests.append(kwargs) or "future")
+    stock = SimpleNamespace(history=None)
+    assert data.submit_range_bars(stock, "3m") is None
+    assert data.submit_range_bars(stock, "1y") is None
+    assert data.submit_range_bars(stock, "1h") == "future"
+    assert data.submit_range_bars(stock, "5y") == "future"
+    assert requests == [{"period": "1d", "interval": "1m"}, {"period": "5y", "interval": "1wk"}]
+
+    hist = daily_bars([float(day) for day in range(300)])
+    assert len(data.stock_range_series(hist, "3m", None)) < len(data.stock_range_series(hist, "1y", None))
+
+
+def test_coingecko_ranges_stay_within_the_public_api():
+    assert max(int(days) for days in data.COINGECKO_RANGES.values()) <= 365
+    assert "5y" not in data.COINGECKO_RANGES
+
+
+@pytest.mark.parametrize("time_range, expected", [
+    ("1d", ["coingecko", "coinmarketcap", "yfinance"]),
+    ("1y", ["coingecko", "coinmarketcap", "yfinance"]),
+    ("5y", ["yfinance", "coinmarketcap"]),
+])
+def test_crypto_ranges_pick_providers_that_can_serve_them(monkeypatch, time_range, expected):
+    tried = []
+    for name in ("coingecko", "coinmarketcap", "yfinance"):
+        monkeypatch.setattr(data, f"get_crypto_data_{name}",
+                            lambda symbol, time_range, name=name: tried.append(name))
+    monkeypatch.setattr(data.COINS, "resolve", lambda symbol: {"coingecko": "bitcoin", "coinmarketcap": "1"})
+    monkeypatch.setattr(data, "CRYPTO_FETCH_MODE", "sequential")
+    assert data.fetch_crypto_data("BTC", time_range) is None
+    assert tried == expected
+
+
+def test_coingecko_refuses_ranges_beyond_a_year_without_a_request(monkeypatch):
+    monkeypatch.setattr(data.COINS, "provider_id", lambda symbol, provider: "bitcoin")
+    monkeypatch.setattr(data, "submit_json", lambda *args, **kwargs: pytest.fail("requested 5y from CoinGecko"))
+    assert data.get_crypto_data_coingecko("BTC", "5y") is None
+
+
+def test_coingecko_quote_without_a_year_chart_has_unknown_extremes(monkeypatch):
+    market = Future()
+    market.set_result({"market_data": {"current_price": {"usd": 12.0}, "price_change_24h": 2.0}})
+    monkeypatch.setattr(data.COINS, "provider_id", lambda symbol, provider: "bitcoin")
+    monkeypatch.setattr(data, "submit_json", lambda *args, **kwargs: market)
+    monkeypatch.setattr(data, "coingecko_chart", lambda coin_id, days: [[0, 10.0], [60_000, 12.0]])
+    monkeypatch.setattr(data, "coingecko_year_extremes", lambda coin_id: None)
+    quote = data.get_crypto_data_coingecko("BTC", "1d")
+    assert quote.current == 12.0 and quote.prev_close == 10.0
+    assert quote.high != quote.high and quote.low != quote.low
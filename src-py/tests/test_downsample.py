@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("PySide6")
+pytest.importorskip("matplotlib")
+
+from tickr_backend.chart import lttb, minmax_decimate  # noqa: E402
+
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(3)
+    values = np.cumsum(rng.normal(size=10_000))
+    values[4321] += 500.0
+    return values
+
+
+def test_short_series_are_kept_whole():
+    values = np.arange(10.0)
+    assert np.array_equal(lttb(values, 20), np.arange(10))
+    assert np.array_equal(minmax_decimate(values, 20), np.arange(10))
+
+
+def test_lttb_keeps_the_ends_and_returns_sorted_indices(series):
+    indices = lttb(series, 500)
+    assert len(indices) == 500
+    assert (indices[0], indices[-1]) == (0, len(series) - 1)
+    assert np.all(np.diff(indices) > 0)
+    assert 4321 in indices
+
+
+def test_minmax_keeps_every_extreme(series):
+    indices = minmax_decimate(series, 500)
+    assert len(indices) <= 502
+    assert np.all(np.diff(indices) > 0)
+    assert (indices[0], indices[-1]) == (0, len(series) - 1)
+    assert series[indices].max() == series.max()
+    assert series[indices].min() == series.min()
+
+
+def test_minmax_handles_lengths_that_do_not_divide_evenly():
+    values = np.arange(1001.0)
+    indices = minmax_decimate(values, 100)
+    assert indices[-1] == 1000
+    assert indices.max() < len(values)
@@ -0,0 +1,100 @@
+import random
+from datetime import date
+
+import pandas as pd
+
+from tickr_backend.extremes import CRYPTO, ExtremesEngine, RollingExtremes
+
+
+def test_matches_brute_force_over_the_window():
+    rng = random.Random(7)
+    window = 20
+    state = RollingExtremes()
+    bars = []
+    for day in range(200):
+        high = rng.uniform(50, 150)
+        low = high - rng.uniform(0, 10)
+        state.push(day, high, low, window)
+        bars.append((day, high, low))
+        recent = [bar for bar in bars if bar[0] > day - window]
+        assert state.extremes() == (max(bar[1] for bar in recent), min(bar[2] for bar in recent))
+
+
+def test_revising_the_pending_bar_replaces_it():
+    state = RollingExtremes()
+    state.push(1, 10.0, 5.0, 364)
+    state.push(2, 30.0, 4.0, 364)
+    state.push(2, 12.0, 6.0, 364)
+    assert state.extremes() == (12.0, 5.0)
+
+
+def test_records_need_a_full_window():
+    engine = ExtremesEngine(window_days=5)
+    flags = [engine.update("A", day, float(day), float(100 - day)) for day in range(1, 9)]
+    assert flags[:5] == [(False, False)] * 5
+    assert flags[5:] == [(True, True)] * 3
+
+
+def test_bars_older_than_the_pending_one_are_ignored():
+    engine = ExtremesEngine(window_days=5)
+    engine.update("A", 10, 10.0, 5.0)
+    assert engine.update("A", 9, 99.0, 1.0) == (False, False)
+    assert engine.extremes("A") == (10.0, 5.0)
+
+
+def test_only_the_current_session_keeps_its_symbols():
+    engine = ExtremesEngine(window_days=3)
+    for day in range(1, 8):
+        engine.update("UP", day, float(day), 1.0)
+        engine.update("DOWN", day, 10.0, 10.0 - day)
+    assert engine.highs_on(7) == ["UP"]
+    assert engine.lows_on(7) == ["DOWN"]
+    assert engine.highs_on(6) == []
+    assert engine.session_day() == date.fromordinal(7)
+
+
+def test_breadth_keeps_daily_counts_for_the_window():
+    engine = ExtremesEngine(window_days=3)
+    for day in range(1, 8):
+        engine.update("UP", day, float(day), 1.0)
+        engine.update("DOWN", day, 10.0, 10.0 - day)
+    assert engine.breadth() == [(date.fromordinal(day), 1, 1, 0) for day in (5, 6, 7)]
+
+    # revising the pending bar takes back the record it set
+    engine.update("UP", 7, 1.0, 1.0)
+    assert engine.breadth()[-1] == (date.fromordinal(7), 0, 1, -1)
+    assert engine.highs_on(7) == []
+
+
+def test_calendars_keep_their_own_sessions():
+    engine = ExtremesEngine(window_days=3)
+    for day in range(1, 8):
+        engine.update("AAPL", day, float(day), 1.0)
+    engine.update("BTC-USD", 8, 1.0, 1.0, calendar=CRYPTO)
+    assert engine.highs_on(7) == ["AAPL"]
+    assert engine.session_day(CRYPTO) == date.fromordinal(8)
+    assert engine.breadth()[-1] == (date.fromordinal(7), 1, 0, 1)
+
+
+def test_feed_only_processes_new_bars():
+    engine = ExtremesEngine()
+    index = pd.date_range("2024-01-01", periods=300, freq="D")
+    hist = pd.DataFrame({"High": range(300), "Low": range(300)}, index=index, dtype=float)
+    assert engine.feed("A", hist.iloc[:200]) == (199.0, 0.0)
+    assert engine.feed("A", hist) == (299.0, 0.0)
+    assert engine.symbols["A"].pending[0] == index[-1].date().toordinal()
+
+
+def test_reset_takes_back_a_symbols_records():
+    engine = ExtremesEngine(window_days=3)
+    for day in range(1, 8):
+        engine.update("UP", day, float(day), 1.0)
+        engine.update("FLAT", day, 1.0, 1.0)
+    engine.reset("UP")
+    assert engine.extremes("UP") == (None, None)
+    assert engine.highs_on(7) == []
+    assert engine.breadth()[-1] == (date.fromordinal(7), 0, 0, 0)
+
+    for day in range(1, 8):
+        engine.update("UP", day, float(day), 1.0)
+    assert engine.breadth() == [(date.fromordinal(day), 1, 0, 1) for day in (5, 6, 7)]
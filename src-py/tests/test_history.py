@@ -0,0 +1,57 @@
+from concurrent.futures import Future
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("yfinance")
+
+from tickr_backend import history
+from tickr_backend.extremes import EXTREMES
+from tickr_backend.history import COLUMNS, load_history, store_bars, update_histories
+
+
+def daily_bars(closes, start="2024-01-01"):
+    index = pd.date_range(start, periods=len(closes), freq="D")
+    return pd.DataFrame({"Open": closes, "High": closes, "Low": closes, "Close": closes,
+                         "Volume": [100.0] * len(closes)}, index=index)[COLUMNS]
+
+
+def test_replacing_the_store_rebuilds_the_extremes():
+    closes = [float(100 + day % 300) for day in range(400)]
+    store_bars("SPLIT", daily_bars(closes), replace=True)
+    assert EXTREMES.feed("SPLIT", load_history("SPLIT")) == (399.0, 100.0)
+
+    # a 4:1 split re-adjusts the whole series
+    store_bars("SPLIT", daily_bars([close / 4 for close in closes]), replace=True)
+    assert EXTREMES.feed("SPLIT", load_history("SPLIT")) == (99.75, 25.0)
+
+
+def test_appending_bars_keeps_the_extremes():
+    store_bars("GROW", daily_bars([10.0, 20.0, 30.0]), replace=True)
+    EXTREMES.feed("GROW", load_history("GROW"))
+    store_bars("GROW", daily_bars([40.0], start="2024-01-04"))
+    assert EXTREMES.feed("GROW", load_history("GROW")) == (40.0, 10.0)
+    assert len(load_history("GROW")) == 4
+
+
+def test_bulk_downloads_are_charged_one_token_per_ticker(monkeypatch):
+    calls = []
+
+    def fake_submit(provider, fn, *args, cost=1, max_wait=None, **kwargs):
+        calls.append((provider, cost, kwargs["threads"]))
+        future = Future()
+        future.set_result(pd.DataFrame())
+        return future
+
+    monkeypatch.setattr(history, "submit_call", fake_submit)
+    update_histories(["NEW1", "NEW2", "NEW3"])
+    assert calls == [("yahoo", 3, False)]
+
+
+def test_yahoo_calls_fail_fast_once_the_budget_is_spent(monkeypatch):
+    from tickr_backend.ratelimit import RATE_LIMITER, RateLimited, TokenBucket
+
+    monkeypatch.setitem(RATE_LIMITER.buckets, 'yahoo', TokenBucket(0.01, 1))
+    assert history.yahoo_call(lambda: "first") == "first"
+    with pytest.raises(RateLimited):
+        history.yahoo_call(lambda: "second")
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from tickr_backend.metrics import Histogram, Metrics
+
+
+def test_quantile_interpolates_inside_the_bucket():
+    histogram = Histogram((1.0, 2.0, 3.0, 4.0))
+    for value in (0.5, 1.5, 2.5, 3.5):
+        histogram.observe(value)
+    assert histogram.quantile(0.25) == pytest.approx(1.0)
+    assert histogram.quantile(0.5) == pytest.approx(2.0)
+    assert histogram.quantile(0.625) == pytest.approx(2.5)
+    assert histogram.quantile(1.0) == pytest.approx(4.0)
+
+
+def test_quantile_of_values_past_the_last_bound_is_that_bound():
+    histogram = Histogram((1.0, 2.0))
+    histogram.observe(50.0)
+    assert histogram.quantile(0.99) == 2.0
+
+
+def test_empty_histogram_has_no_quantiles():
+    histogram = Histogram()
+    assert histogram.quantile(0.5) is None
+    assert histogram.to_dict()["p99"] is None
+
+
+def test_buckets_are_cumulative_on_export():
+    histogram = Histogram((1.0, 2.0))
+    for value in (0.5, 1.0, 1.5, 9.0):
+        histogram.observe(value)
+    exported = histogram.to_dict()
+    assert exported["buckets"] == {"1.0": 2, "2.0": 3, "+Inf": 4}
+    assert (exported["count"], exported["sum"]) == (4, 12.0)
+
+
+def test_prometheus_and_json_exports():
+    metrics = Metrics()
+    metrics.describe("requests_total", "Requests")
+    metrics.inc("requests_total", {"provider": "yahoo"}, 2)
+    metrics.observe("latency_seconds", 0.2, {"provider": "yahoo"}, buckets=(0.1, 1.0))
+    metrics.register_collector(lambda: [("cache_entries", "gauge", None, 3)])
+
+    text = metrics.to_prometheus()
+    assert "# HELP requests_total Requests\n# TYPE requests_total counter" in text
+    assert 'requests_total{provider="yahoo"} 2' in text
+    assert 'latency_seconds_bucket{provider="yahoo",le="0.1"} 0' in text
+    assert 'latency_seconds_bucket{provider="yahoo",le="+Inf"} 1' in text
+    assert "cache_entries 3" in text
+
+    exported = json.loads(metrics.to_json())
+    assert exported["counters"]["requests_total"] == [{"labels": {"provider": "yahoo"}, "value": 2}]
+    assert exported["gauges"]["cache_entries"][0]["value"] == 3
+    assert exported["histograms"]["latency_seconds"][0]["count"] == 1
+
+
+def test_failing_collector_does_not_break_the_export():
+    metrics = Metrics()
+    metrics.register_collector(lambda: 1 / 0)
+    metrics.inc("ok_total")
+    assert "ok_total 1" in metrics.to_prometheus()
@@ -0,0 +1,100 @@
+import threading
+
+import pytest
+import requests
+
+from tickr_backend import transport
+from tickr_backend.ratelimit import RateLimited, RateLimiter, TokenBucket
+
+
+def test_burst_is_free_then_slots_are_spaced_at_the_rate():
+    bucket = TokenBucket(rate=10, burst=3)
+    delays = [bucket.reserve() for _ in range(5)]
+    assert delays[:3] == [0.0, 0.0, 0.0]
+    assert delays[3] == pytest.approx(0.1, abs=0.01)
+    assert delays[4] == pytest.approx(0.2, abs=0.01)
+
+
+def test_reservation_over_max_wait_claims_nothing():
+    bucket = TokenBucket(rate=10, burst=1)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve(max_wait=0.05) is None
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+
+
+def test_cost_above_burst_leaves_debt():
+    bucket = TokenBucket(rate=10, burst=3)
+    assert bucket.reserve(cost=5) == 0.0
+    # two tokens owed plus one for this reservation
+    assert bucket.reserve() == pytest.approx(0.3, abs=0.01)
+
+
+def test_tokens_refill_up_to_the_burst():
+    bucket = TokenBucket(rate=10, burst=2)
+    bucket.reserve(cost=2)
+    bucket.updated -= 10
+    assert bucket.reserve() == 0.0
+    assert bucket.tokens == pytest.approx(1, abs=0.01)
+
+
+def test_submit_runs_in_the_slot_and_raises_when_out_of_budget():
+    limiter = RateLimiter({'test': (10, 1)}, max_workers=2)
+    assert limiter.submit('test', lambda x: x * 2, 21).result(5) == 42
+    with pytest.raises(RateLimited):
+        limiter.submit('test', lambda: None, max_wait=0.01)
+
+
+@pytest.fixture
+def fast_limits(monkeypatch):
+    monkeypatch.setitem(transport.RATE_LIMITER.buckets, 'yahoo', TokenBucket(1e6, 1e6))
+    monkeypatch.setattr(transport, "backoff_delay", lambda attempt, retry_after=None: 0.0)
+
+
+def test_submit_call_retries_connection_errors(fast_limits):
+    attempts = []
+
+    def flaky():
+        attempts.append(threading.current_thread().name)
+        if len(attempts) < 3:
+            raise requests.ConnectionError("reset")
+        return "ok"
+
+    assert transport.call_with_retries('yahoo', flaky) == "ok"
+    assert len(attempts) == 3
+    # attempts run on the scheduler's pool, the caller only waits for the Future
+    assert all(name.startswith("tickr-ratelimit") for name in attempts)
+
+
+def test_submit_call_gives_up_after_max_retries(fast_limits):
+    attempts = []
+
+    def down():
+        attempts.append(1)
+        raise requests.Timeout("slow")
+
+    with pytest.raises(requests.Timeout):
+        transport.call_with_retries('yahoo', down)
+    assert len(attempts) == transport.MAX_RETRIES + 1
+
+
+def test_other_errors_are_not_retried(fast_limits):
+    attempts = []
+
+    def broken():
+        attempts.append(1)
+        raise ValueError("bad payload")
+
+    with pytest.raises(ValueError):
+        transport.call_with_retries('yahoo', broken)
+    assert attempts == [1]
+
+
+def test_cancelled_call_never_runs(monkeypatch):
+    monkeypatch.setitem(transport.RATE_LIMITER.buckets, 'yahoo', TokenBucket(1, 1))
+    transport.RATE_LIMITER.reserve('yahoo')
+    calls = []
+    future = transport.submit_call('yahoo', lambda: calls.append(1))
+    assert future.cancel()
+    # the slot is a second out; the queued attempt finds the Future cancelled
+    transport.RATE_LIMITER.later(1.1, lambda: None).result(5)
+    assert calls == []
@@ -0,0 +1,68 @@
+import time
+
+import pytest
+
+from tickr_backend.scheduler import RefreshScheduler
+
+
+def scheduler(**kwargs):
+    return RefreshScheduler(**{"fast_interval": 10.0, "slow_interval": 100.0, "jitter": 0.0, **kwargs})
+
+
+def due_at(scheduler, view, symbol):
+    return next(due for entry, due in scheduler.views[view].items() if entry[0] == symbol)
+
+
+def test_due_entries_are_returned_once_and_rescheduled():
+    refresh = scheduler()
+    refresh.set_symbols("stocks", [("AAPL", False, "1d")])
+    start = due_at(refresh, "stocks", "AAPL")
+    assert refresh.due(start - 1) == []
+    assert refresh.due(start) == [("stocks", "AAPL", False, "1d")]
+    assert refresh.due(start) == []
+    assert due_at(refresh, "stocks", "AAPL") == pytest.approx(start + 10.0)
+
+
+def test_failures_back_off_exponentially_up_to_the_cap():
+    refresh = scheduler(max_backoff=50.0)
+    refresh.subscribe("stocks", "AAPL")
+    now = time.monotonic()
+    delays = []
+    for _ in range(4):
+        refresh.report_error("AAPL")
+        delays.append(due_at(refresh, "stocks", "AAPL") - now)
+    assert delays == pytest.approx([20.0, 40.0, 50.0, 50.0], abs=0.5)
+
+    refresh.report_success("AAPL")
+    refresh.due(due_at(refresh, "stocks", "AAPL"))
+    assert refresh.next_delay("stocks", "AAPL", False) == 10.0
+
+
+def test_hidden_views_use_the_slow_interval_and_catch_up_when_shown():
+    refresh = scheduler(jitter=0.2)
+    refresh.subscribe("crypto", "BTC", True)
+    refresh.set_visible("crypto", False)
+    now = time.monotonic()
+    assert 80.0 <= due_at(refresh, "crypto", "BTC") - now <= 120.0
+
+    refresh.set_visible("crypto", True)
+    # stale data is refreshed within the jitter spread of the fast interval
+    assert due_at(refresh, "crypto", "BTC") - now <= 2.0 + 0.5
+
+
+def test_no_slow_interval_stops_hidden_views():
+    refresh = scheduler(slow_interval=None)
+    refresh.subscribe("watchlist", "MSFT")
+    refresh.set_visible("watchlist", False)
+    assert due_at(refresh, "watchlist", "MSFT") is None
+    assert refresh.due(time.monotonic() + 10 ** 6) == []
+
+
+def test_set_symbols_keeps_existing_schedules():
+    refresh = scheduler()
+    refresh.set_symbols("watchlist", [("AAPL", False, "1y")])
+    first = due_at(refresh, "watchlist", "AAPL")
+    refresh.set_symbols("watchlist", [("AAPL", False, "1y"), ("MSFT", False, "1y")])
+    assert due_at(refresh, "watchlist", "AAPL") == first
+    refresh.unsubscribe("watchlist", "AAPL")
+    assert [entry[0] for entry in refresh.views["watchlist"]] == ["MSFT"]
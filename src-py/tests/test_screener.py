@@ -0,0 +1,95 @@
+import time
+
+import numpy as np
+import pytest
+
+from tickr_backend.quote import Quote, price_series
+from tickr_backend.screener import ExpressionError, Screener, compile_expression
+
+
+def quote(symbol, current, high=None, low=None, volume=None, avg_volume=None, kind="stock"):
+    return Quote(symbol, current, current, current, high, low, 0.0, 0.0, None, None, volume, avg_volume,
+                 current, current, price_series([current]), "1d", kind, time.time())
+
+
+@pytest.fixture
+def screener():
+    screener = Screener(capacity=2)
+    screener.update(quote("AAA", 99.0, high=100.0, low=50.0, volume=300, avg_volume=100))
+    screener.update(quote("BBB", 60.0, high=100.0, low=55.0, volume=100, avg_volume=100))
+    screener.update(quote("CCC", 10.0))
+    screener.update(quote("BTC", 30000.0, high=31000.0, low=15000.0, kind="crypto"))
+    return screener
+
+
+def symbols(rows):
+    return [row["symbol"] for row in rows]
+
+
+@pytest.mark.parametrize("text", [
+    "__import__('os').system('true')",
+    "price.__class__",
+    "().__class__.__bases__",
+    "open('/etc/passwd')",
+    "eval('1')",
+    "[price for price in crypto]",
+    "lambda: 1",
+    "crypto[0]",
+    "'text' == 'text'",
+    "True",
+    "None",
+    "abs(price, out=price)",
+    "price if crypto else 1",
+    "unknown > 1",
+    "price >",
+])
+def test_rejects_everything_outside_the_whitelist(text):
+    with pytest.raises(ExpressionError):
+        compile_expression(text)
+
+
+def test_integer_powers_are_evaluated_as_floats(screener):
+    # Python ints would compute 9 ** 9 ** 9 exactly and never finish; floats overflow at once
+    started = time.perf_counter()
+    with pytest.raises(ExpressionError):
+        screener.screen("9 ** 9 ** 9 > price")
+    assert time.perf_counter() - started < 1
+    assert len(screener.screen("2 ** 10 > price")) == 3
+
+
+def test_boolean_operators_and_chained_comparisons_are_element_wise(screener):
+    assert symbols(screener.screen("50 < price < 100")) == ["AAA", "BBB"]
+    assert symbols(screener.screen("price > 50 and not crypto")) == ["AAA", "BBB"]
+    assert symbols(screener.screen("price < 20 or crypto")) == ["CCC", "BTC"]
+
+
+def test_missing_values_never_match(screener):
+    assert symbols(screener.screen("pct_from_high > -50")) == ["AAA", "BBB", "BTC"]
+    assert symbols(screener.screen("rel_volume >= 1")) == ["AAA", "BBB"]
+
+
+def test_order_by_with_limit(screener):
+    rows = screener.screen(order_by="pct_from_high", limit=2)
+    assert symbols(rows) == ["AAA", "BTC"]
+    assert rows[0]["score"] == pytest.approx(-1.0)
+    assert symbols(screener.screen(order_by="price", ascending=True, limit=2)) == ["CCC", "BBB"]
+
+
+def test_missing_fields_come_back_as_none(screener):
+    row = screener.screen("price < 20")[0]
+    assert row["high"] is None and row["pct_from_high"] is None
+
+
+def test_remove_keeps_the_rows_dense(screener):
+    screener.remove("AAA")
+    screener.remove("AAA")
+    screener.remove("BTC", "crypto")
+    assert len(screener) == 2
+    assert symbols(screener.screen()) == ["CCC", "BBB"]
+    assert np.isnan(screener.columns["current"][2:]).all()
+
+
+def test_update_overwrites_the_row(screener):
+    screener.update(quote("CCC", 75.0, high=80.0, low=5.0))
+    assert len(screener) == 4
+    assert symbols(screener.screen("price > 70 and price < 90")) == ["CCC"]
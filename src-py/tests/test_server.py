@@ -0,0 +1,118 @@
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("aiohttp")
+pytest.importorskip("yfinance")
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from tickr_backend.extremes import CRYPTO, EXTREMES
+from tickr_backend.quote import Quote, price_series
+from tickr_backend.server import QuoteServer, parse_key
+
+
+def make_quote(symbol, time_range):
+    return Quote(symbol=symbol, current=101.5, open=100.0, prev_close=99.0, high=float('nan'), low=98.5,
+                 change=2.5, change_percent=2.53, pe_ratio=None, market_cap=None, volume=1200, avg_volume=None,
+                 bid=None, ask=None, data=price_series([99.0, 101.5]), time_range=time_range, type="stock",
+                 last_updated=time.time())
+
+
+class FakeFetch:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, symbol, is_crypto, time_range, force_refresh):
+        self.calls.append((symbol, is_crypto, time_range))
+        return None if symbol == "NOPE" else make_quote(symbol, time_range)
+
+
+def run_client(server, scenario):
+    """Run scenario(client) against the server's app on an ephemeral port"""
+    async def main():
+        client = TestClient(TestServer(server.make_app()))
+        await client.start_server()
+        try:
+            return await scenario(client)
+        finally:
+            await client.close()
+    return asyncio.run(main())
+
+
+def test_breadth_reports_the_latest_session_per_kind():
+    EXTREMES.clear()
+    for day in range(738000, 738400):
+        EXTREMES.update("AAPL", day, float(day), 1.0)
+    EXTREMES.update("BTC-USD", 738500, 1.0, 1.0, calendar=CRYPTO)
+
+    async def scenario(client):
+        stock = await (await client.get("/breadth")).json()
+        crypto = await (await client.get("/breadth", params={"kind": "crypto"})).json()
+        bad = await client.get("/breadth", params={"kind": "bonds"})
+        return stock, crypto, bad.status
+
+    try:
+        stock, crypto, status = run_client(QuoteServer(fetch=lambda *args: None), scenario)
+    finally:
+        EXTREMES.clear()
+    assert stock["new_highs"] == ["AAPL"] and stock["new_lows"] == []
+    assert stock["breadth"][-1] == {"date": stock["session"], "highs": 1, "lows": 0, "net": 1}
+    assert crypto["new_highs"] == [] and crypto["session"] != stock["session"]
+    assert status == 400
+
+
+def test_parse_key_validates_kind_symbol_and_range():
+    assert parse_key("stock", " aapl ") == ("AAPL", False, "1d")
+    assert parse_key("crypto", "btc", "5y") == ("BTC", True, "5y")
+    for kind, symbol, time_range in (("bonds", "AAPL", "1d"), (["stock"], "AAPL", "1d"), ("stock", " ", "1d"),
+                                     ("stock", "AAPL", "2y"), ("stock", "AAPL", ["1d"]), ("stock", "AAPL", "")):
+        with pytest.raises(ValueError):
+            parse_key(kind, symbol, time_range)
+
+
+def test_quote_endpoint_rejects_bad_requests_before_fetching():
+    fetch = FakeFetch()
+
+    async def scenario(client):
+        ok = await client.get("/quote/stock/aapl", params={"range": "1w"})
+        missing = await client.get("/quote/stock/NOPE")
+        bad_range = await client.get("/quote/stock/AAPL", params={"range": "2y"})
+        bad_kind = await client.get("/quote/bonds/AAPL")
+        return (ok.status, await ok.json()), missing.status, (bad_range.status, await bad_range.json()), bad_kind.status
+
+    (status, body), missing, (bad_status, bad_body), bad_kind = run_client(QuoteServer(fetch=fetch), scenario)
+    assert status == 200 and body["symbol"] == "AAPL" and body["high"] is None
+    assert missing == 404
+    assert bad_status == 400 and "range must be one of" in bad_body["error"]
+    assert bad_kind == 400
+    assert ("AAPL", False, "2y") not in fetch.calls and ("AAPL", False, "1w") in fetch.calls
+
+
+def test_websocket_errors_keep_the_connection_usable():
+    fetch = FakeFetch()
+
+    async def scenario(client):
+        ws = await client.ws_connect("/ws")
+        replies = []
+        for message in ({"action": "subscribe", "symbols": ["AAPL"], "range": ["1d"]},
+                        {"action": "subscribe", "symbols": ["AAPL"], "range": "2y"},
+                        {"action": "subscribe", "symbols": "AAPL"},
+                        {"action": "watch", "symbols": ["AAPL"]}):
+            await ws.send_json(message)
+            replies.append(await ws.receive_json(timeout=5))
+        await ws.send_str("not json")
+        replies.append(await ws.receive_json(timeout=5))
+        await ws.send_json({"action": "subscribe", "kind": "stock", "symbols": ["msft"], "range": "1m"})
+        replies.append(await ws.receive_json(timeout=5))
+        await ws.close()
+        return replies
+
+    replies = run_client(QuoteServer(fetch=fetch), scenario)
+    assert [reply["type"] for reply in replies[:5]] == ["error"] * 5
+    assert "range must be one of" in replies[1]["message"]
+    assert replies[2]["message"] == "symbols must be a list of strings"
+    quote = replies[5]
+    assert (quote["type"], quote["symbol"], quote["range"], quote["full"]) == ("quote", "MSFT", "1m", True)
+    assert quote["fields"]["current"] == 101.5
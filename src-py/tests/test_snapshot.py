@@ -0,0 +1,69 @@
+import threading
+import time
+
+import numpy as np
+
+from tickr_backend.cache import QuoteCache
+from tickr_backend.quote import Quote, price_series
+from tickr_backend.snapshot import build_snapshot, load_snapshot, save_snapshot, write_snapshot
+
+
+def make_quote(symbol, time_range="1d", kind="stock"):
+    return Quote(symbol=symbol, current=101.5, open=100.0, prev_close=99.0, high=102.0, low=98.5,
+                 change=2.5, change_percent=2.53, pe_ratio=None, market_cap=2.5e12, volume=np.int64(1200),
+                 avg_volume=None, bid=101.4, ask=101.6, data=price_series([99.0, 100.5, 101.5]),
+                 time_range=time_range, type=kind, last_updated=time.time())
+
+
+def test_round_trip_keeps_fields_series_and_views(tmp_path):
+    path = str(tmp_path / "snapshot.npz")
+    cache = QuoteCache()
+    cache.set("AAPL_1d", make_quote("AAPL"))
+    cache.set("BTC_1y", make_quote("BTC", "1y", "crypto"))
+    cache.set("not-a-quote", {"ignored": True})
+    views = {"tabs": [{"symbol": "AAPL", "range": "1d"}]}
+    save_snapshot(cache, views, current_tab=1, path=path)
+
+    snapshot = load_snapshot(path)
+    assert snapshot.views == views and snapshot.current_tab == 1
+    quote = snapshot.find("btc", "1y", "crypto")
+    assert quote.stale and quote.symbol == "BTC" and quote.volume == 1200
+    np.testing.assert_array_equal(quote.data, [99.0, 100.5, 101.5])
+    assert snapshot.find("AAPL", "5y", "stock") is None
+    assert len(snapshot.meta["quotes"]) == 2
+
+
+def test_seed_restores_original_ages(tmp_path):
+    path = str(tmp_path / "snapshot.npz")
+    cache = QuoteCache(ttl=60)
+    cache.restore("AAPL_1d", make_quote("AAPL"), time.time() - 120, 60)
+    save_snapshot(cache, {}, path=path)
+
+    fresh = QuoteCache(ttl=60, max_stale=3600)
+    load_snapshot(path).seed(fresh)
+    assert fresh.get("AAPL_1d") is None
+    assert fresh.get("AAPL_1d", allow_stale=True).stale
+
+
+def test_missing_or_unreadable_files_load_as_none(tmp_path):
+    assert load_snapshot(str(tmp_path / "missing.npz")) is None
+    broken = tmp_path / "broken.npz"
+    broken.write_bytes(b"not a zip")
+    assert load_snapshot(str(broken)) is None
+
+
+def test_payload_is_taken_when_built_and_written_later(tmp_path):
+    path = str(tmp_path / "snapshot.npz")
+    cache = QuoteCache()
+    cache.set("AAPL_1d", make_quote("AAPL"))
+    payload = build_snapshot(cache, {"stocks": {"symbol": "AAPL"}})
+    cache.set("MSFT_1d", make_quote("MSFT"))
+
+    writers = [threading.Thread(target=write_snapshot, args=(payload, path)) for _ in range(4)]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+    snapshot = load_snapshot(path)
+    assert [entry["key"] for entry in snapshot.meta["quotes"]] == ["AAPL_1d"]
+    assert not (tmp_path / "snapshot.npz.tmp").exists()
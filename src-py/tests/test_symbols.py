@@ -0,0 +1,49 @@
+from tickr_backend.symbols import SymbolDirectory, SymbolIndex, parse_directory
+
+NASDAQ_LISTED = """Symbol|Security Name|Market Category|Test Issue|Financial Status|Round Lot Size|ETF|NextShares
+AAPL|Apple Inc. - Common Stock|Q|N|N|100|N|N
+QQQ|Invesco QQQ Trust, Series 1|G|N|N|100|Y|N
+ZXZZT|NASDAQ TEST STOCK|G|Y|N|100|N|N
+File Creation Time: 0613202521:32|||||||"""
+
+OTHER_LISTED = """ACT Symbol|Security Name|Exchange|CQS Symbol|ETF|Round Lot Size|Test Issue|NASDAQ Symbol
+BRK.B|Berkshire Hathaway Inc. Class B|N|BRK.B|N|100|N|BRK=B
+ABR$D|Arbor Realty Trust - 6.375% Series D Preferred|N|ABRpD|N|100|N|ABR-D
+SPY|SPDR S&P 500 ETF Trust|P|SPY|Y|100|N|SPY
+File Creation Time: 0613202521:32|||||||"""
+
+
+def test_parse_skips_test_issues_and_the_padded_trailer():
+    listings = parse_directory(NASDAQ_LISTED, "Symbol")
+    assert [(listing.symbol, listing.exchange, listing.type) for listing in listings] == [
+        ("AAPL", "Q", "Stock"), ("QQQ", "Q", "ETF")]
+    assert listings[0].name == "Apple Inc."
+
+
+def test_parse_other_listed_uses_yahoo_symbols_and_exchanges():
+    listings = parse_directory(OTHER_LISTED, "ACT Symbol", "Exchange")
+    assert [(listing.symbol, listing.exchange_name) for listing in listings] == [
+        ("BRK-B", "NYSE"), ("ABR-PD", "NYSE"), ("SPY", "NYSE Arca")]
+
+
+def test_completion_puts_tickers_before_name_words():
+    index = SymbolIndex(parse_directory(NASDAQ_LISTED, "Symbol") +
+                        parse_directory(OTHER_LISTED, "ACT Symbol", "Exchange"))
+    assert [listing.symbol for listing in index.complete("a")] == ["AAPL", "ABR-PD"]
+    assert [listing.symbol for listing in index.complete("berk")] == ["BRK-B"]
+    assert index.get("SPY").type == "ETF"
+    assert index.complete("") == []
+
+
+def test_tradingview_symbols_follow_the_listing_exchange(tmp_path):
+    directory = SymbolDirectory(path=str(tmp_path / "symbols.json"))
+    directory.download = lambda: (parse_directory(NASDAQ_LISTED, "Symbol") +
+                                  parse_directory(OTHER_LISTED, "ACT Symbol", "Exchange"))
+    directory.ensure()
+    assert directory.tradingview_symbol("aapl") == "NASDAQ:AAPL"
+    assert directory.tradingview_symbol("BRK-B") == "NYSE:BRK.B"
+    assert directory.tradingview_symbol("SPY") == "AMEX:SPY"
+    assert directory.tradingview_symbol("NOPE") is None
+
+    reloaded = SymbolDirectory(path=directory.path)
+    assert reloaded.load() and len(reloaded.index) == 5
@@ -0,0 +1,96 @@
+import json
+from collections import OrderedDict
+
+import pytest
+import requests
+
+from tickr_backend import transport
+
+
+def response(status, payload=None, headers=None):
+    result = requests.Response()
+    result.status_code = status
+    result._content = json.dumps(payload).encode() if payload is not None else b""
+    result.headers.update(headers or {})
+    return result
+
+
+class FakeSession:
+    """Answers GETs from a list of responses and records the headers each request sent"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.sent = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.sent.append(dict(headers or {}))
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def validators(monkeypatch):
+    monkeypatch.setattr(transport, "VALIDATORS", OrderedDict())
+    monkeypatch.setattr(transport, "validator_bytes", 0)
+    monkeypatch.setattr(transport, "backoff_delay", lambda attempt, retry_after=None: 0)
+    return transport.VALIDATORS
+
+
+def serve(monkeypatch, responses):
+    session = FakeSession(responses)
+    monkeypatch.setitem(transport.SESSIONS, "api.test", session)
+    return session
+
+
+def test_etag_revalidation_returns_the_stored_payload(monkeypatch, validators):
+    session = serve(monkeypatch, [
+        response(200, {"price": 1}, {"ETag": '"v1"', "Last-Modified": "Fri, 13 Jun 2025 00:00:00 GMT"}),
+        response(304),
+        response(200, {"price": 2}, {"ETag": '"v2"'}),
+    ])
+    url = "https://api.test/coins"
+    assert transport.get_json(url, {"id": "btc"}) == {"price": 1}
+    assert transport.get_json(url, {"id": "btc"}) == {"price": 1}
+    assert transport.get_json(url, {"id": "btc"}) == {"price": 2}
+    assert "If-None-Match" not in session.sent[0]
+    assert session.sent[1]["If-None-Match"] == '"v1"'
+    assert session.sent[1]["If-Modified-Since"] == "Fri, 13 Jun 2025 00:00:00 GMT"
+    assert session.sent[2]["If-None-Match"] == '"v1"'
+    assert validators[("https://api.test/coins", (("id", "btc"),))][0] == '"v2"'
+
+
+def test_unconditional_requests_send_and_keep_no_validators(monkeypatch, validators):
+    session = serve(monkeypatch, [response(200, {"a": 1}, {"ETag": '"v1"'})] * 2)
+    transport.get_json("https://api.test/list", conditional=False)
+    transport.get_json("https://api.test/list", conditional=False)
+    assert session.sent == [{}, {}] and not validators
+
+
+def test_server_errors_are_retried(monkeypatch, validators):
+    session = serve(monkeypatch, [response(503), response(200, {"ok": True})])
+    assert transport.get_json("https://api.test/flaky") == {"ok": True}
+    assert len(session.sent) == 2
+
+    serve(monkeypatch, [response(404)])
+    with pytest.raises(requests.HTTPError):
+        transport.get_json("https://api.test/missing")
+
+
+def test_validators_are_bounded_by_bytes_and_count(monkeypatch, validators):
+    monkeypatch.setattr(transport, "VALIDATOR_MAX_BODY", 100)
+    monkeypatch.setattr(transport, "VALIDATOR_MAX_BYTES", 250)
+    for key in "abc":
+        transport.set_validator(key, "etag", None, {}, 100)
+    # a, b and c need 300 bytes: the oldest goes
+    assert list(validators) == ["b", "c"] and transport.validator_bytes == 200
+
+    transport.set_validator("b", "etag", None, {}, 50)
+    assert list(validators) == ["c", "b"] and transport.validator_bytes == 150
+
+    # too large to keep, and the stale smaller entry for the same key is dropped too
+    transport.set_validator("c", "etag", None, {}, 101)
+    assert list(validators) == ["b"] and transport.validator_bytes == 50
+
+    monkeypatch.setattr(transport, "VALIDATOR_ENTRIES", 2)
+    for key in "xyz":
+        transport.set_validator(key, "etag", None, {}, 1)
+    assert list(validators) == ["y", "z"] and transport.validator_bytes == 2
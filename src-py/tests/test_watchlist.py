@@ -0,0 +1,78 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("PySide6")
+
+from PySide6.QtCore import Qt
+
+from tickr_backend.watchlist import WatchlistModel, WatchlistProxy
+
+
+def quote(symbol, current, change_percent=0.0, high=None, low=None):
+    return SimpleNamespace(symbol=symbol, current=current, change_percent=change_percent, high=high, low=low)
+
+
+def display(model, row):
+    return [model.data(model.index(row, column)) for column in range(model.columnCount())]
+
+
+def test_add_skips_duplicates_and_remove_reindexes():
+    model = WatchlistModel()
+    assert model.add_symbols(["AAPL", "MSFT", "AAPL", ""]) == ["AAPL", "MSFT"]
+    assert model.add_symbols(["MSFT", "NVDA"]) == ["NVDA"]
+    model.remove_symbols(["MSFT", "NOPE"])
+    assert model.symbols == ["AAPL", "NVDA"] and model.rows == {"AAPL": 0, "NVDA": 1}
+    assert model.rowCount() == 2 and display(model, 1) == ["NVDA", "--", "--", "--", "--"]
+
+
+def test_update_only_signals_the_cells_whose_text_changed():
+    model = WatchlistModel()
+    model.add_symbols(["AAPL"])
+    changes = []
+    model.dataChanged.connect(lambda first, last, roles: changes.append((first.column(), last.column())))
+
+    model.update_quote(quote("AAPL", 100.0, 1.5, high=200.0, low=50.0))
+    assert display(model, 0) == ["AAPL", "$100.00", "+1.50%", "-50.00%", "+100.00%"]
+    assert changes == [(1, 4)]
+
+    changes.clear()
+    model.update_quote(quote("AAPL", 100.001, 1.5, high=200.0, low=50.0))
+    assert changes == []
+
+    # price and distance from the low change, the change % and the high distance don't
+    model.update_quote(quote("AAPL", 110.0, 1.5, high=220.0, low=50.0))
+    assert changes == [(1, 1), (4, 4)]
+    model.update_quote(quote("NOPE", 1.0))
+    assert model.rowCount() == 1
+
+
+def test_sort_role_puts_missing_values_last_and_colors_follow_the_sign():
+    model = WatchlistModel()
+    model.add_symbols(["UP", "DOWN", "NONE"])
+    model.update_quote(quote("UP", 10.0, 2.0))
+    model.update_quote(quote("DOWN", 20.0, -3.0))
+    assert model.data(model.index(2, 1), Qt.UserRole) == float("-inf")
+    assert model.data(model.index(0, 2), Qt.ForegroundRole).name() == "#03dac6"
+    assert model.data(model.index(1, 2), Qt.ForegroundRole).name() == "#cf6679"
+
+    proxy = WatchlistProxy()
+    proxy.setSourceModel(model)
+    proxy.sort(1, Qt.DescendingOrder)
+    assert [proxy.data(proxy.index(row, 0)) for row in range(3)] == ["DOWN", "UP", "NONE"]
+
+
+def test_proxy_filters_by_text_and_by_screen_matches():
+    model = WatchlistModel()
+    model.add_symbols(["AAPL", "AMZN", "MSFT"])
+    proxy = WatchlistProxy()
+    proxy.setSourceModel(model)
+    proxy.sort(0, Qt.AscendingOrder)
+
+    proxy.setFilterFixedString("a")
+    assert [proxy.data(proxy.index(row, 0)) for row in range(proxy.rowCount())] == ["AAPL", "AMZN"]
+    proxy.set_matches({"AMZN", "MSFT"})
+    assert [proxy.data(proxy.index(row, 0)) for row in range(proxy.rowCount())] == ["AMZN"]
+    proxy.setFilterFixedString("")
+    proxy.set_matches(None)
+    assert proxy.rowCount() == 3
@@ -0,0 +1,280 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+from .history import COLUMNS, first_stored_date, store_bars, yahoo_call
+from .metrics import METRICS
+
+DEFAULT_PERIOD = "5y"
+DEFAULT_CHUNK = 50
+DEFAULT_WORKERS = 4
+CHECKPOINT_FILE = "checkpoint.json"
+FIELDS = [column.lower() for column in COLUMNS]
+
+METRICS.describe("tickr_backfill_symbols_total", "Symbols processed by the backfill, by outcome")
+
+def read_symbols(path):
+    """One symbol per line (commas also accepted); blank lines and # comments are skipped"""
+    handle = sys.stdin if path == "-" else open(path)
+    with handle:
+        symbols = []
+        for line in handle:
+            line = line.split("#", 1)[0]
+            symbols.extend(part for part in line.replace(",", " ").split())
+        return symbols
+
+def normalize(symbols):
+    """Upper-case and de-duplicate, keeping the given order"""
+    return list(dict.fromkeys(symbol.strip().upper() for symbol in symbols if symbol.strip()))
+
+def chunked(items, size):
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+def resolve_format(fmt):
+    """Parquet needs the optional pyarrow; npz only needs numpy"""
+    if fmt == "npz":
+        return fmt
+    try:
+        import pyarrow  # noqa: F401
+        return "parquet"
+    except ImportError:
+        if fmt == "parquet":
+            raise ValueError("--format parquet needs pyarrow (pip install pyarrow)")
+        return "npz"
+
+def to_columns(frames, symbols):
+    """Flatten a grouped yf.download result into columns, rows grouped by symbol.
+
+    `offsets[i]:offsets[i + 1]` are the rows of `symbols[i]`; symbols without bars
+    are left out and returned separately.
+    """
+    available = set(frames.columns.get_level_values(0)) if not frames.empty else set()
+    kept, missing, parts = [], [], []
+    for symbol in symbols:
+        bars = frames[symbol].dropna(subset=["Close"]) if symbol in available else None
+        if bars is None or bars.empty:
+            missing.append(symbol)
+            continue
+        kept.append(symbol)
+        parts.append(bars[COLUMNS])
+
+    lengths = [len(bars) for bars in parts]
+    columns = {
+        "symbols": np.array(kept, dtype=str),
+        "offsets": np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64),
+    }
+    if parts:
+        joined = pd.concat(parts)
+        index = joined.index.tz_localize(None) if joined.index.tz is not None else joined.index
+        columns["date"] = index.values.astype("datetime64[D]")
+        for column, field in zip(COLUMNS, FIELDS):
+            columns[field] = joined[column].to_numpy(dtype=np.float64)
+    else:
+        columns["date"] = np.array([], dtype="datetime64[D]")
+        for field in FIELDS:
+            columns[field] = np.array([], dtype=np.float64)
+    return columns, kept, missing
+
+def write_part(columns, path, fmt):
+    """Write one chunk atomically as .npz or .parquet"""
+    temp_path = path + ".tmp"
+    if fmt == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        repeats = np.diff(columns["offsets"])
+        table = pa.table({
+            "symbol": pa.DictionaryArray.from_arrays(
+                np.repeat(np.arange(len(columns["symbols"]), dtype=np.int32), repeats),
+                pa.array(columns["symbols"].tolist(), pa.string())),
+            "date": columns["date"],
+            **{field: columns[field] for field in FIELDS}
+        })
+        pq.write_table(table, temp_path, compression="zstd")
+    else:
+        with open(temp_path, 'wb') as f:
+            np.savez_compressed(f, **columns)
+    os.replace(temp_path, path)
+
+def read_part(path):
+    """{symbol: DataFrame} for one part file, in the shape yf.Ticker.history returns"""
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        frame = pq.read_table(path).to_pandas()
+        return {
+            str(symbol): bars.drop(columns="symbol").set_index(pd.DatetimeIndex(bars["date"]))
+                             .drop(columns="date").rename(columns=dict(zip(FIELDS, COLUMNS)))
+            for symbol, bars in frame.groupby("symbol", observed=True, sort=False)
+        }
+    with np.load(path) as archive:
+        columns = {name: archive[name] for name in archive.files}
+    offsets = columns["offsets"]
+    result = {}
+    for index, symbol in enumerate(columns["symbols"]):
+        rows = slice(offsets[index], offsets[index + 1])
+        result[str(symbol)] = pd.DataFrame(
+            {column: columns[field][rows] for column, field in zip(COLUMNS, FIELDS)},
+            index=pd.DatetimeIndex(columns["date"][rows], name="Date")
+        )
+    return result
+
+def read_backfill(directory):
+    """Merge every part in a backfill directory into {symbol: DataFrame}"""
+    result = {}
+    for name in sorted(os.listdir(directory)):
+        if name.startswith("part-") and name.endswith((".npz", ".parquet")):
+            result.update(read_part(os.path.join(directory, name)))
+    return result
+
+class Checkpoint:
+    """Which symbols are finished for a given (period, interval); saved atomically after every chunk"""
+
+    def __init__(self, path, config):
+        self.path = path
+        self.config = config
+        self.done = set()
+        self.failed = {}
+
+    @classmethod
+    def load(cls, path, config):
+        checkpoint = cls(path, config)
+        if not os.path.exists(path):
+            return checkpoint
+        with open(path) as f:
+            state = json.load(f)
+        if state.get("config") != config:
+            raise ValueError(f"{path} was written for {state.get('config')}, not {config}; use --restart")
+        checkpoint.done = set(state.get("done", []))
+        checkpoint.failed = state.get("failed", {})
+        return checkpoint
+
+    def record(self, kept, missing, error=None):
+        self.done.update(kept)
+        for symbol in kept:
+            self.failed.pop(symbol, None)
+        for symbol in missing:
+            self.failed[symbol] = error or "no data"
+
+    def save(self):
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w') as f:
+            json.dump({"config": self.config, "done": sorted(self.done), "failed": self.failed}, f)
+        os.replace(temp_path, self.path)
+
+def backfill_chunk(symbols, period, interval, path, fmt, store=False):
+    """Download, write and optionally store one chunk; returns (kept, missing)"""
+    # yf.download makes one request per ticker: the chunk is charged a token for each,
+    # and without its own threads they go out one at a time; a headless run waits its turn
+    frames = yahoo_call(yf.download, symbols, period=period, interval=interval, group_by="ticker",
+                        auto_adjust=True, actions=False, threads=False, progress=False, cost=len(symbols),
+                        max_wait=None)
+    columns, kept, missing = to_columns(frames, symbols)
+    if kept:
+        write_part(columns, path, fmt)
+        if store:
+            for symbol in kept:
+                store_backfill(symbol, frames[symbol].dropna(subset=["Close"]))
+    return kept, missing
+
+def store_backfill(symbol, bars):
+    """Upsert daily bars into the history store; the stored series is only replaced
+    when the download reaches back at least as far, so a shorter period never truncates it"""
+    first = first_stored_date(symbol)
+    store_bars(symbol, bars, replace=first is not None and bars.index[0].strftime("%Y-%m-%d") <= first)
+
+def backfill(symbols, out_dir, period=DEFAULT_PERIOD, interval="1d", chunk_size=DEFAULT_CHUNK,
+             workers=DEFAULT_WORKERS, fmt="auto", store=False, restart=False):
+    """Backfill every symbol not yet in the checkpoint; returns the Checkpoint.
+
+    Chunks go through one yf.download each on a thread pool. A download makes one
+    request per symbol and takes that many tokens from the shared 'yahoo' rate
+    limiter, so at most `workers` requests are in flight and the sustained rate
+    stays within the provider's budget however many workers run. Each finished
+    chunk becomes one part file and is recorded in the checkpoint, so an
+    interrupted run resumes.
+    """
+    if store and interval != "1d":
+        raise ValueError("--store only takes daily bars, use it with --interval 1d")
+    os.makedirs(out_dir, exist_ok=True)
+    fmt = resolve_format(fmt)
+    checkpoint_path = os.path.join(out_dir, CHECKPOINT_FILE)
+    if restart and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    checkpoint = Checkpoint.load(checkpoint_path, {"period": period, "interval": interval})
+
+    pending = [symbol for symbol in normalize(symbols) if symbol not in checkpoint.done]
+    chunks = chunked(pending, chunk_size)
+    if not chunks:
+        print(f"Nothing to do: {len(checkpoint.done)} symbols already backfilled in {out_dir}")
+        return checkpoint
+
+    # a run id keeps part names unique across resumed runs without a shared counter
+    run_id = time.strftime("%Y%m%d%H%M%S")
+    started = time.monotonic()
+    print(f"Backfilling {len(pending)} symbols in {len(chunks)} chunks with {workers} workers ({fmt})")
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tickr-backfill") as executor:
+        futures = {
+            executor.submit(backfill_chunk, chunk, period, interval,
+                            os.path.join(out_dir, f"part-{run_id}-{index:05d}.{fmt}"), fmt, store): chunk
+            for index, chunk in enumerate(chunks)
+        }
+        finished = 0
+        for future in as_completed(futures):
+            chunk = futures[future]
+            try:
+                kept, missing = future.result()
+                checkpoint.record(kept, missing)
+            except Exception as e:
+                print(f"Chunk {chunk[0]}..{chunk[-1]} failed: {e}")
+                kept, missing = [], chunk
+                checkpoint.record(kept, missing, error=str(e))
+            checkpoint.save()
+            METRICS.inc("tickr_backfill_symbols_total", {"status": "ok"}, len(kept))
+            METRICS.inc("tickr_backfill_symbols_total", {"status": "missing"}, len(missing))
+            finished += len(chunk)
+            elapsed = time.monotonic() - started
+            print(f"[{finished}/{len(pending)}] {len(kept)} ok, {len(missing)} missing "
+                  f"({finished / elapsed:.1f} symbols/s)")
+    return checkpoint
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="tickr-backfill", description="Backfill daily history for a list of symbols")
+    parser.add_argument('symbols', nargs='*', help="symbols to backfill")
+    parser.add_argument('--file', help="file with one symbol per line, or - for stdin")
+    parser.add_argument('--out', default="backfill", help="output directory for part files and the checkpoint")
+    parser.add_argument('--period', default=DEFAULT_PERIOD, help="yfinance period, e.g. 1y, 5y, 10y, max")
+    parser.add_argument('--interval', default="1d", choices=["1d", "5d", "1wk", "1mo", "3mo"])
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK, help="symbols per download")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="downloads in flight at once")
+    parser.add_argument('--format', default="auto", choices=["auto", "npz", "parquet"],
+                        help="part file format; auto picks parquet when pyarrow is installed")
+    parser.add_argument('--store', action='store_true', help="also load the bars into the local history store (daily interval only)")
+    parser.add_argument('--restart', action='store_true', help="ignore an existing checkpoint")
+    args = parser.parse_args(argv)
+
+    symbols = list(args.symbols)
+    if args.file:
+        symbols.extend(read_symbols(args.file))
+    if not symbols:
+        parser.error("no symbols given")
+
+    try:
+        checkpoint = backfill(symbols, args.out, args.period, args.interval, max(1, args.chunk_size),
+                              max(1, args.workers), args.format, args.store, args.restart)
+    except ValueError as e:
+        print(e)
+        return 2
+    if checkpoint.failed:
+        print(f"{len(checkpoint.failed)} symbols without data, rerun to retry: "
+              f"{', '.join(sorted(checkpoint.failed)[:20])}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
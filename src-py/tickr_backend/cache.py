@@ -0,0 +1,181 @@
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+
+class QuoteCache:
+    """Bounded LRU cache with per-key TTLs, stale-while-revalidate and single-flight loads.
+
+    Entries past their TTL are still served for up to `max_stale` seconds while a
+    background refresh runs; concurrent loads of the same key share one fetch.
+    """
+
+    def __init__(self, max_entries=512, ttl=300, max_stale=3600, refresh_workers=4):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.entries = OrderedDict()
+        self.inflight = {}
+        self.lock = Lock()
+        self.refresher = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="tickr-cache")
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.coalesced = 0
+        self.listeners = []
+        self.removal_listeners = []
+
+    def __len__(self):
+        with self.lock:
+            return len(self.entries)
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.entries
+
+    def subscribe(self, listener):
+        """Call `listener(key, value)` after every store, outside the cache lock"""
+        self.listeners.append(listener)
+
+    def subscribe_removals(self, listener):
+        """Call `listener(key, value)` after an entry is evicted or invalidated, outside the cache lock"""
+        self.removal_listeners.append(listener)
+
+    def notify(self, key, value, listeners=None):
+        for listener in self.listeners if listeners is None else listeners:
+            try:
+                listener(key, value)
+            except Exception as e:
+                print(f"Cache listener failed for {key}: {e}")
+
+    def notify_removed(self, removed):
+        for key, (value, _, _) in removed:
+            self.notify(key, value, self.removal_listeners)
+
+    def keys(self):
+        with self.lock:
+            return list(self.entries)
+
+    def items(self):
+        """(key, value, stored_at, ttl) for every entry, oldest first"""
+        with self.lock:
+            return [(key, value, stored_at, ttl) for key, (value, stored_at, ttl) in self.entries.items()]
+
+    def restore(self, key, value, stored_at, ttl):
+        """Re-insert an entry with its original age, unless a newer one is already cached"""
+        with self.lock:
+            current = self.entries.get(key)
+            if current is not None and current[1] >= stored_at:
+                return
+            self.entries[key] = (value, stored_at, ttl)
+            self.entries.move_to_end(key)
+            evicted = self.evict()
+        self.notify(key, value)
+        self.notify_removed(evicted)
+
+    def lookup(self, key):
+        """(value, age, ttl) without touching LRU order or counters, None when absent"""
+        with self.lock:
+            entry = self.entries.get(key)
+        if entry is None:
+            return None
+        value, stored_at, ttl = entry
+        return value, time.time() - stored_at, ttl
+
+    def get(self, key, allow_stale=False):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                value, stored_at, ttl = entry
+                age = time.time() - stored_at
+                if age < ttl or (allow_stale and age < ttl + self.max_stale):
+                    self.entries.move_to_end(key)
+                    if age < ttl:
+                        self.hits += 1
+                    else:
+                        self.stale_hits += 1
+                    return value
+            self.misses += 1
+        return None
+
+    def set(self, key, value, ttl=None):
+        with self.lock:
+            self.entries[key] = (value, time.time(), self.ttl if ttl is None else ttl)
+            self.entries.move_to_end(key)
+            evicted = self.evict()
+        self.notify(key, value)
+        self.notify_removed(evicted)
+
+    def evict(self):
+        """Drop least recently used entries over max_entries; lock held, returns them for notify_removed"""
+        evicted = []
+        while len(self.entries) > self.max_entries:
+            evicted.append(self.entries.popitem(last=False))
+            self.evictions += 1
+        return evicted
+
+    def invalidate(self, key):
+        with self.lock:
+            entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.notify_removed([(key, entry)])
+
+    def load(self, key, loader, ttl=None):
+        """Run `loader` and cache a non-empty result; callers racing on the same key share one call"""
+        with self.lock:
+            future = self.inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                owner = False
+            else:
+                future = self.inflight[key] = Future()
+                owner = True
+
+        if not owner:
+            return future.result()
+
+        try:
+            value = loader()
+            if value:
+                self.set(key, value, ttl)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                self.inflight.pop(key, None)
+
+    def refresh_in_background(self, key, loader, ttl=None):
+        with self.lock:
+            if key in self.inflight:
+                return
+        self.refresher.submit(self.load, key, loader, ttl)
+
+    def get_or_load(self, key, loader, ttl=None):
+        with self.lock:
+            entry = self.entries.get(key)
+            expired = entry is not None and time.time() - entry[1] >= entry[2]
+        value = self.get(key, allow_stale=True)
+        if value:
+            if expired:
+                self.refresh_in_background(key, loader, ttl)
+            return value
+        return self.load(key, loader, ttl)
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "coalesced": self.coalesced,
+                "inflight": len(self.inflight),
+                "hit_ratio": (self.hits + self.stale_hits) / lookups if lookups else 0.0
+            }
@@ -1,27 +1,161 @@
+import numpy as np
 from PySide6.QtWidgets import QWidget, QVBoxLayout
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-import matplotlib.pyplot as plt
+from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.figure import Figure
+
+# fraction of extra room given to the axes when a live series outgrows them,
+# so the following ticks can still be blitted instead of forcing a full redraw
+HEADROOM = 0.1
+
+def lttb(values, threshold):
+    """Largest-Triangle-Three-Buckets downsampling; returns the indices of the points to keep"""
+    n = len(values)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    indices = np.empty(threshold, dtype=np.intp)
+    indices[0] = 0
+    indices[-1] = n - 1
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.intp)
+    selected = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        average_x = (end + next_end - 1) / 2
+        average_y = values[end:next_end].mean()
+        xs = np.arange(start, end)
+        ys = values[start:end]
+        areas = np.abs((selected - average_x) * (ys - values[selected])
+                       - (selected - xs) * (average_y - values[selected]))
+        selected = start + int(areas.argmax())
+        indices[bucket + 1] = selected
+    return indices
+
+def minmax_decimate(values, threshold):
+    """Keep the min and max of each bucket; fully vectorized, preserves every spike"""
+    n = len(values)
+    buckets = threshold // 2
+    if n <= threshold or buckets < 1:
+        return np.arange(n)
+    size = -(-n // buckets)
+    padded = np.pad(values, (0, size * buckets - n), mode='edge').reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    indices = np.concatenate([offsets + padded.argmin(axis=1), offsets + padded.argmax(axis=1), [0, n - 1]])
+    return np.unique(np.minimum(indices, n - 1))
+
+DOWNSAMPLERS = {"lttb": lttb, "minmax": minmax_decimate}
 
 class ChartWidget(QWidget):
-    def __init__(self, data, title=""):
+    """Line chart that reuses one Line2D and blits it over a cached background.
+
+    The series is downsampled to the axes' pixel width before drawing. Axis limits
+    only change when the data outgrows them (with headroom), so updates and live
+    appends normally cost a restore + one artist draw + blit rather than a full
+    figure redraw.
+    """
+
+    def __init__(self, data=None, title="", downsample="lttb"):
         super().__init__()
-        self.figure, self.ax = plt.subplots()
+        # a bare Figure stays out of pyplot's global figure registry
+        self.figure = Figure()
+        self.ax = self.figure.add_subplot()
         self.canvas = FigureCanvas(self.figure)
-        
+        self.downsample = DOWNSAMPLERS[downsample]
+
+        self.line, = self.ax.plot([], [], color='#1f77b4', animated=True)
+        self.ax.set_xlabel("Days", fontsize=10)
+        self.ax.set_ylabel("Price (USD)", fontsize=10)
+        self.ax.grid(True, linestyle='--', alpha=0.7)
+
+        self.buffer = np.empty(0, dtype=np.float64)
+        self.length = 0
+        self.background = None
+        self.canvas.mpl_connect('draw_event', self.on_draw)
+        self.canvas.mpl_connect('resize_event', lambda event: self.redraw())
+
         layout = QVBoxLayout()
         layout.addWidget(self.canvas)
         self.setLayout(layout)
-        
-        self.update_chart(data, title)
-    
+
+        self.update_chart(data if data is not None else [], title)
+
+    @property
+    def series(self):
+        return self.buffer[:self.length]
+
+    def on_draw(self, event):
+        # full redraws (resize, new limits) refresh the cached background under the line
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self.ax.draw_artist(self.line)
+
     def update_chart(self, data, title):
-        self.ax.clear()
-        
-        if data:
-            self.ax.plot(data, color='#1f77b4')
+        values = np.asarray(data, dtype=np.float64)
+        title = title if len(values) else ""
+        if title == self.ax.get_title():
+            # a refresh that returns the same series (or one more bar) needs no full redraw
+            length = self.length
+            if len(values) == length and np.array_equal(values, self.series, equal_nan=True):
+                return
+            if len(values) == length + 1 and np.array_equal(values[:-1], self.series, equal_nan=True):
+                self.append_point(values[-1])
+                return
+        self.buffer = values.copy()
+        self.length = len(values)
+        if self.ax.get_title() != title:
             self.ax.set_title(title, fontsize=12)
-            self.ax.set_xlabel("Days", fontsize=10)
-            self.ax.set_ylabel("Price (USD)", fontsize=10)
-            self.ax.grid(True, linestyle='--', alpha=0.7)
-        
-        self.canvas.draw()
\ No newline at end of file
+            self.background = None
+        self.redraw(rescale=True)
+
+    def append_point(self, value):
+        """Append one live tick; amortized O(1) storage and usually a blit-only redraw"""
+        if self.length == len(self.buffer):
+            grown = np.empty(max(16, 2 * len(self.buffer)), dtype=np.float64)
+            grown[:self.length] = self.series
+            self.buffer = grown
+        self.buffer[self.length] = value
+        self.length += 1
+        self.redraw(live=True)
+
+    def visible_points(self, live=False):
+        series = self.series
+        width = max(100, int(self.ax.bbox.width))
+        # LTTB walks its buckets in Python; per-tick redraws use the vectorized decimator
+        downsample = minmax_decimate if live else self.downsample
+        indices = downsample(series, width)
+        return indices, series[indices]
+
+    def fit_limits(self, rescale):
+        """Grow (or on rescale, reset) the axis limits; returns True when they changed"""
+        series = self.series
+        if not len(series):
+            return False
+        low, high = float(np.nanmin(series)), float(np.nanmax(series))
+        pad = (high - low) * 0.05 or abs(high) * 0.01 or 1.0
+        x_low, x_high = self.ax.get_xlim()
+        y_low, y_high = self.ax.get_ylim()
+        last = len(series) - 1
+        if rescale:
+            self.ax.set_xlim(0, max(last, 1))
+            self.ax.set_ylim(low - pad, high + pad)
+            return True
+        changed = False
+        if last > x_high:
+            self.ax.set_xlim(0, last + max(1, int(last * HEADROOM)))
+            changed = True
+        if low < y_low or high > y_high:
+            span = (high - low) * HEADROOM
+            self.ax.set_ylim(min(y_low, low - span), max(y_high, high + span))
+            changed = True
+        return changed
+
+    def redraw(self, rescale=False, live=False):
+        if self.length:
+            x, y = self.visible_points(live)
+        else:
+            x, y = [], []
+        self.line.set_data(x, y)
+        if self.fit_limits(rescale) or self.background is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self.background)
+        self.ax.draw_artist(self.line)
+        self.canvas.blit(self.figure.bbox)
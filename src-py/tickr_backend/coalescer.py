@@ -0,0 +1,45 @@
+import os
+
+from PySide6.QtCore import QObject, QTimer
+
+MAX_UI_FPS = float(os.getenv('TICKR_MAX_UI_FPS', '30'))
+
+class UpdateCoalescer(QObject):
+    """Keeps only the latest pending update per key and applies them at a capped rate.
+
+    Producers call push(key, fn, *args) as often as results arrive; at most once per
+    frame (1 / max_fps) the newest call per key runs on the GUI thread and older
+    ones for the same key are dropped. The timer only runs while updates are pending.
+    """
+
+    def __init__(self, parent=None, max_fps=MAX_UI_FPS):
+        super().__init__(parent)
+        self.pending = {}
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(max(1, int(1000 / max_fps)))
+        self.timer.timeout.connect(self.flush)
+        self.received = 0
+        self.applied = 0
+
+    def push(self, key, fn, *args):
+        self.received += 1
+        self.pending[key] = (fn, args)
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def discard(self, key):
+        self.pending.pop(key, None)
+
+    def flush(self):
+        pending, self.pending = self.pending, {}
+        for fn, args in pending.values():
+            self.applied += 1
+            try:
+                fn(*args)
+            except Exception as e:
+                print(f"Error applying UI update: {e}")
+
+    @property
+    def dropped(self):
+        return self.received - self.applied - len(self.pending)
@@ -0,0 +1,194 @@
+import json
+import math
+import os
+import time
+from threading import Lock, Timer
+
+from .paths import data_path
+from .transport import get_json
+
+COINS_FILE = "coins.json"
+COINS_MAX_AGE = 24 * 3600
+# after a failed refresh the old index is kept and the next attempt waits this long
+COINS_RETRY_DELAY = 600
+# newly unresolved symbols are written out together, at most this long after the first one
+COINS_SAVE_DELAY = 30
+COINGECKO_LIST_URL = "https://api.coingecko.com/api/v3/coins/list"
+COINGECKO_MARKETS_URL = "https://api.coingecko.com/api/v3/coins/markets"
+# pages of 250 coins by market cap used to pick the coin behind an ambiguous symbol
+COINGECKO_MARKET_PAGES = 4
+COINMARKETCAP_MAP_URL = "https://pro-api.coinmarketcap.com/v1/cryptocurrency/map"
+PROVIDERS = ('coingecko', 'coinmarketcap')
+
+def rank_coingecko(coins, ranks):
+    """symbol -> coin id; a symbol shared by many coins (hundreds of tokens call themselves ETH)
+    goes to the one with the best market cap rank, unranked ones to the shortest id"""
+    candidates = {}
+    for coin in coins:
+        symbol = (coin.get("symbol") or "").upper()
+        if symbol and coin.get("id"):
+            candidates.setdefault(symbol, []).append(coin["id"])
+    return {
+        symbol: min(ids, key=lambda coin_id: (ranks.get(coin_id, math.inf), len(coin_id), coin_id))
+        for symbol, ids in candidates.items()
+    }
+
+def rank_coinmarketcap(entries):
+    """symbol -> CoinMarketCap id of the best-ranked active coin"""
+    best = {}
+    for entry in entries:
+        if not entry.get("is_active", 1):
+            continue
+        symbol = entry["symbol"].upper()
+        rank = entry.get("rank") or math.inf
+        if symbol not in best or rank < best[symbol][0]:
+            best[symbol] = (rank, str(entry["id"]))
+    return {symbol: coin_id for symbol, (_, coin_id) in best.items()}
+
+class CoinIndex:
+    """Symbol -> provider id for every coin the providers list, persisted and refreshed daily.
+
+    `pinned` ids (CRYPTO_MAPPING) always win. Symbols that no provider could serve
+    are marked unresolved, remembered on disk as well, and skipped without a request
+    until the next refresh.
+    `ids` and `unresolved` are only ever replaced whole, so lookups read them without
+    the lock; it guards the bookkeeping and is never held across a request or a write.
+    """
+
+    def __init__(self, pinned=None, coinmarketcap_key=None, path=None, max_age=COINS_MAX_AGE):
+        self.pinned = pinned or {}
+        self.coinmarketcap_key = coinmarketcap_key
+        self.path = path
+        self.max_age = max_age
+        self.ids = {provider: {} for provider in PROVIDERS}
+        self.unresolved = set()
+        self.fetched_at = 0
+        self.retry_at = 0
+        self.loaded = False
+        self.refreshing = False
+        self.save_timer = None
+        self.lock = Lock()
+        self.save_lock = Lock()
+
+    def file_path(self):
+        return self.path or data_path(COINS_FILE)
+
+    def load(self):
+        path = self.file_path()
+        if not os.path.exists(path):
+            return False
+        try:
+            with open(path) as f:
+                state = json.load(f)
+            self.ids = {provider: dict(state["ids"].get(provider, {})) for provider in PROVIDERS}
+            self.unresolved = set(state.get("unresolved", []))
+            self.fetched_at = state.get("fetched_at", 0)
+        except (OSError, ValueError, KeyError, AttributeError) as e:
+            print(f"Ignoring unreadable coin index {path}: {e}")
+            return False
+        return True
+
+    def save(self):
+        with self.lock:
+            state = {"fetched_at": self.fetched_at, "ids": self.ids, "unresolved": sorted(self.unresolved)}
+            if self.save_timer is not None:
+                self.save_timer.cancel()
+                self.save_timer = None
+        path = self.file_path()
+        temp_path = path + ".tmp"
+        with self.save_lock:
+            with open(temp_path, 'w') as f:
+                json.dump(state, f, separators=(",", ":"))
+            os.replace(temp_path, path)
+
+    def save_later(self):
+        """Debounced save for new unresolved symbols; call with the lock held"""
+        if self.save_timer is None:
+            self.save_timer = Timer(COINS_SAVE_DELAY, self.save_quietly)
+            self.save_timer.daemon = True
+            self.save_timer.start()
+
+    def save_quietly(self):
+        try:
+            self.save()
+        except OSError as e:
+            print(f"Could not save the coin index: {e}")
+
+    def download(self):
+        coins = get_json(COINGECKO_LIST_URL, provider='coingecko')
+        ranks = {}
+        for page in range(1, COINGECKO_MARKET_PAGES + 1):
+            markets = get_json(COINGECKO_MARKETS_URL, {"vs_currency": "usd", "order": "market_cap_desc",
+                                                        "per_page": 250, "page": page}, provider='coingecko')
+            ranks.update((market["id"], market.get("market_cap_rank") or math.inf) for market in markets)
+            if len(markets) < 250:
+                break
+        ids = {"coingecko": rank_coingecko(coins, ranks), "coinmarketcap": self.ids["coinmarketcap"]}
+        if self.coinmarketcap_key:
+            try:
+                entries = get_json(COINMARKETCAP_MAP_URL, {"listing_status": "active"},
+                                   {'X-CMC_PRO_API_KEY': self.coinmarketcap_key}, provider='coinmarketcap')["data"]
+                ids["coinmarketcap"] = rank_coinmarketcap(entries)
+            except Exception as e:
+                print(f"Error fetching the CoinMarketCap map, keeping the previous one: {e}")
+        return ids
+
+    def refresh(self):
+        ids = self.download()
+        if not ids["coingecko"]:
+            raise ValueError("CoinGecko coin list came back empty")
+        with self.lock:
+            self.ids = ids
+            # a new index gets to decide again about every symbol that failed before
+            self.unresolved = set()
+            self.fetched_at = time.time()
+        self.save()
+
+    def ensure(self):
+        """Load from disk once, refresh when older than max_age; failures keep the old index.
+
+        One caller downloads the new lists outside the lock while every other caller
+        goes on resolving against the old index.
+        """
+        with self.lock:
+            if not self.loaded:
+                self.load()
+                self.loaded = True
+            now = time.time()
+            if self.refreshing or now - self.fetched_at <= self.max_age or now < self.retry_at:
+                return
+            self.refreshing = True
+        try:
+            self.refresh()
+        except Exception as e:
+            print(f"Error refreshing the coin index: {e}")
+            with self.lock:
+                self.retry_at = time.time() + COINS_RETRY_DELAY
+        finally:
+            with self.lock:
+                self.refreshing = False
+
+    def resolve(self, symbol):
+        """{provider: id or None} for a symbol, or None when it is known not to resolve"""
+        self.ensure()
+        symbol = symbol.upper()
+        if symbol in self.unresolved:
+            return None
+        pinned = self.pinned.get(symbol, {})
+        return {provider: pinned.get(provider) or self.ids[provider].get(symbol) for provider in PROVIDERS}
+
+    def mark_unresolved(self, symbol):
+        """Remember a symbol no provider could serve, until the next refresh"""
+        # without a coin list the lookup proves nothing, only a loaded index may rule a symbol out
+        if not self.ids["coingecko"]:
+            return
+        symbol = symbol.upper()
+        with self.lock:
+            # copy-on-write: lookups read the set without the lock
+            self.unresolved = self.unresolved | {symbol}
+            self.save_later()
+        print(f"No coin found for {symbol}; skipping it until the coin index is refreshed")
+
+    def provider_id(self, symbol, provider):
+        ids = self.resolve(symbol)
+        return ids[provider] if ids else None
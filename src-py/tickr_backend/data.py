@@ -1,20 +1,29 @@
 import yfinance as yf
-import requests
-from datetime import datetime, timedelta
+import pandas as pd
+import numpy as np
 import time
-from threading import Lock
 import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from threading import Event
+from .history import update_history, update_histories, yahoo_call, yahoo_submit
+from .extremes import CRYPTO, EXCHANGE, EXTREMES
+from .cache import QuoteCache
+from .transport import get_json, submit_json
+from .quote import Quote, price_series
+from .metrics import METRICS
+from .screener import SCREENER
+from .coins import CoinIndex
 
-LAST_API_CALL = 0
-API_CALL_DELAY = 1.5
+# longest we queue for a provider's rate-limit slot before falling through to the next provider
+PROVIDER_MAX_WAIT = 10.0
 
-def rate_limit():
-    global LAST_API_CALL
-    now = time.time()
-    elapsed = now - LAST_API_CALL
-    if elapsed < API_CALL_DELAY:
-        time.sleep(API_CALL_DELAY - elapsed)
-    LAST_API_CALL = time.time()
+# 'hedged' races the crypto providers, 'sequential' tries them strictly one after another
+CRYPTO_FETCH_MODE = os.getenv('TICKR_CRYPTO_FETCH_MODE', 'hedged')
+# seconds a crypto provider gets before the next one is started alongside it
+CRYPTO_HEDGE_DELAY = float(os.getenv('TICKR_CRYPTO_HEDGE_DELAY', '2.0'))
+
+PROVIDER_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="tickr-provider")
+REQUEST_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="tickr-request")
 
 COINMARKETCAP_API_KEY = os.getenv('COINMARKETCAP_API_KEY', 'your-api-key-here')
 
@@ -30,212 +39,450 @@ CRYPTO_MAPPING = {
     'BNB': {'coingecko': 'binancecoin', 'coinmarketcap': '1839'},
     'LTC': {'coingecko': 'litecoin', 'coinmarketcap': '2'}
 }
+# every other symbol is resolved through the providers' coin lists, the mapping above stays pinned
+COINS = CoinIndex(CRYPTO_MAPPING, COINMARKETCAP_API_KEY if COINMARKETCAP_API_KEY != 'your-api-key-here' else None)
 
-DATA_CACHE = {}
-CACHE_LOCK = Lock()
 CACHE_TIMEOUT = 300
+# stock quotes are split in tiers: prices from the latest bars go stale within seconds,
+# quote-summary fundamentals (market cap, P/E, average volume) are refreshed hourly
+PRICE_TTL = 5
+FUNDAMENTALS_TTL = 3600
+FUNDAMENTAL_FIELDS = ('marketCap', 'trailingPE', 'averageVolume')
+CACHE_MAX_ENTRIES = int(os.getenv('TICKR_CACHE_MAX_ENTRIES', '512'))
+DATA_CACHE = QuoteCache(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TIMEOUT)
+
+def cache_metrics():
+    stats = DATA_CACHE.stats()
+    samples = [(f"tickr_cache_{name}_total", "counter", None, stats[name])
+               for name in ("hits", "stale_hits", "misses", "evictions", "coalesced")]
+    samples += [(f"tickr_cache_{name}", "gauge", None, stats[name]) for name in ("entries", "inflight", "hit_ratio")]
+    return samples
+
+METRICS.register_collector(cache_metrics)
+
+def feed_screener(key, value):
+    # every cached quote, fresh or restored from the snapshot, keeps the screener's columns current
+    if isinstance(value, Quote):
+        SCREENER.update(value)
+
+def drop_from_screener(key, value):
+    # a row leaves the screener with the last cached quote of its symbol, whatever the time range
+    if isinstance(value, Quote):
+        base = key.rsplit("_", 1)[0].upper()
+        if not any(other.rsplit("_", 1)[0].upper() == base for other in DATA_CACHE.keys()):
+            SCREENER.remove(value.symbol, value.type)
+
+DATA_CACHE.subscribe(feed_screener)
+DATA_CACHE.subscribe_removals(drop_from_screener)
 
 def get_cached_data(key):
-    with CACHE_LOCK:
-        if key in DATA_CACHE:
-            data, timestamp = DATA_CACHE[key]
-            if time.time() - timestamp < CACHE_TIMEOUT:
-                return data
-    return None
+    return DATA_CACHE.get(key)
+
+def set_cached_data(key, data, ttl=None):
+    DATA_CACHE.set(key, data, ttl)
+
+# time_range -> (yfinance period, interval); None slices the daily history store instead
+STOCK_RANGES = {
+    "1h": ("1d", "1m"),
+    "1d": ("1d", "5m"),
+    "1w": ("5d", "30m"),
+    "1m": None,
+    "3m": None,
+    "1y": None,
+    "5y": ("5y", "1wk"),
+}
+
+# time_range -> CoinGecko market_chart days (the API picks 5m/hourly/daily granularity from it);
+# the public API refuses more than 365 days, longer ranges come from yfinance first
+COINGECKO_RANGES = {
+    "1h": "1",
+    "1d": "1",
+    "1w": "7",
+    "1m": "30",
+    "3m": "90",
+    "1y": "365",
+}
+
+RANGE_DAYS = {"1h": 1 / 24, "1d": 1, "1w": 7, "1m": 31, "3m": 92, "1y": 365, "5y": 1826}
+
+def normalize_range(time_range):
+    return time_range if time_range in RANGE_DAYS else "1y"
+
+def trim_to_range(closes, time_range):
+    """Keep the points of a Close series that fall inside time_range of its last timestamp"""
+    if closes.empty:
+        return closes
+    start = closes.index[-1] - pd.Timedelta(days=RANGE_DAYS[time_range])
+    return closes[closes.index > start]
+
+def submit_range_bars(stock, time_range):
+    """Future for the bars of a range the daily store can't serve, None when it can"""
+    spec = STOCK_RANGES[time_range]
+    if spec is None:
+        return None
+    period, interval = spec
+    return yahoo_submit(stock.history, period=period, interval=interval)
 
-def set_cached_data(key, data):
-    with CACHE_LOCK:
-        DATA_CACHE[key] = (data, time.time())
+def stock_range_series(hist, time_range, bars_future):
+    if bars_future is None:
+        return trim_to_range(hist["Close"], time_range)
+    return trim_to_range(bars_future.result()["Close"].dropna(), time_range)
 
 def get_stock_data(ticker, force_refresh=False, time_range="1d"):
-    cache_key = f"stock_{ticker}"
-    if not force_refresh:
-        cached_data = get_cached_data(cache_key)
-        if cached_data:
-            return cached_data
+    time_range = normalize_range(time_range)
+    cache_key = f"stock_{ticker}_{time_range}"
+    if force_refresh:
+        return DATA_CACHE.load(cache_key, lambda: fetch_stock_data(ticker, time_range), ttl=PRICE_TTL)
+    return DATA_CACHE.get_or_load(cache_key, lambda: fetch_stock_data(ticker, time_range), ttl=PRICE_TTL)
+
+def get_fundamentals(ticker, stock=None):
+    """Slow tier: quote-summary fields that change at most daily, served stale while they refresh"""
+    def load():
+        info = yahoo_call(lambda: (stock or yf.Ticker(ticker)).info)
+        return {field: info.get(field) for field in FUNDAMENTAL_FIELDS}
+    return DATA_CACHE.get_or_load(f"fundamentals_{ticker}", load, ttl=FUNDAMENTALS_TTL)
+
+def bar_quote_info(hist):
+    """Fast tier: quote fields derived from the latest daily bars"""
+    last = hist.iloc[-1]
+    return {
+        'regularMarketPreviousClose': hist["Close"].iloc[-2] if len(hist) > 1 else last["Close"],
+        'regularMarketVolume': last["Volume"],
+    }
 
+def fetch_stock_data(ticker, time_range="1d"):
     try:
         stock = yf.Ticker(ticker)
         
-        # basic info
-        info = stock.info
-        hist = stock.history(period="1y")
+        # fundamentals come from the slow tier, usually straight from the cache
+        fundamentals_future = REQUEST_POOL.submit(get_fundamentals, ticker, stock)
+        # intraday bars are queued for their rate-limit slot now, so they are fetched
+        # while the daily store updates instead of after it
+        bars_future = submit_range_bars(stock, time_range)
+        # daily bars come from the local store, only bars newer than the last stored one are downloaded
+        hist = update_history(ticker, stock)
         
         if hist.empty:
             print(f"Warning: No data found for {ticker} (may be delisted)")
+            if bars_future is not None:
+                bars_future.cancel()
             return None
         
-        # price data
-        current_data = stock.history(period="1d")
-        current = current_data["Close"].iloc[-1]
-        open_price = current_data["Open"].iloc[-1] if not current_data["Open"].empty else info.get('regularMarketOpen', current)
-        prev_close = info.get('regularMarketPreviousClose', hist["Close"].iloc[-1])
-        
-        # volume data
-        volume = info.get('regularMarketVolume', hist["Volume"].iloc[-1])
-        avg_volume = info.get('averageVolume', hist["Volume"].mean())
-        
-        # market data
-        market_cap = info.get('marketCap')
-        pe_ratio = info.get('trailingPE')
-        
-        # bid/ask
-        bid = info.get('bid', current * 0.999)
-        ask = info.get('ask', current * 1.001)
+        info = bar_quote_info(hist)
+        try:
+            info.update(fundamentals_future.result())
+        except Exception as e:
+            print(f"Error fetching fundamentals for {ticker}: {str(e)}")
+            METRICS.inc("tickr_fetch_errors_total", {"source": "fundamentals"})
         
-        result = {
-            "symbol": ticker,
-            "current": round(current, 2),
-            "open": round(open_price, 2),
-            "prev_close": round(prev_close, 2),
-            "high": round(hist["High"].max(), 2),
-            "low": round(hist["Low"].min(), 2),
-            "change": round(current - prev_close, 2),
-            "change_percent": round((current - prev_close) / prev_close * 100, 2),
-            "pe_ratio": round(pe_ratio, 2) if pe_ratio else None,
-            "market_cap": f"{market_cap/1e9:.2f}B" if market_cap else "--",
-            "volume": int(volume) if volume else None,
-            "avg_volume": int(avg_volume) if avg_volume else None,
-            "bid": round(bid, 2),
-            "ask": round(ask, 2),
-            "data": hist["Close"].tolist(),
-            "type": "stock",
-            "last_updated": datetime.now().isoformat()
-        }
-        
-        set_cached_data(cache_key, result)
-        return result
+        # price data
+        current_data = hist.iloc[-1:]
+        series = stock_range_series(hist, time_range, bars_future)
+        return build_stock_result(ticker, hist, current_data, info, series, time_range)
         
     except Exception as e:
         print(f"Error fetching stock data for {ticker}: {str(e)}")
+        METRICS.inc("tickr_fetch_errors_total", {"source": "stock"})
         return None
 
-def get_crypto_data(symbol, force_refresh=False, time_range="1d"):
-    cache_key = f"crypto_{symbol}"
-    if not force_refresh:
-        cached_data = get_cached_data(cache_key)
-        if cached_data:
-            return cached_data
+def extremes_calendar(ticker):
+    # the yfinance crypto fallback quotes coins as SYMBOL-USD pairs, which trade around the clock
+    return CRYPTO if ticker.endswith("-USD") else EXCHANGE
 
-    data = get_crypto_data_coingecko(symbol)
-    if data:
-        set_cached_data(cache_key, data)
-        return data
+def build_stock_result(ticker, hist, current_data, info, series, time_range):
+    current = current_data["Close"].iloc[-1]
+    open_price = current_data["Open"].iloc[-1] if not current_data["Open"].empty else info.get('regularMarketOpen', current)
+    prev_close = info.get('regularMarketPreviousClose', hist["Close"].iloc[-1])
     
-    data = get_crypto_data_coinmarketcap(symbol)
-    if data:
-        set_cached_data(cache_key, data)
-        return data
+    # volume data
+    volume = info.get('regularMarketVolume', hist["Volume"].iloc[-1])
+    avg_volume = info.get('averageVolume') or hist["Volume"].mean()
     
-    data = get_crypto_data_yfinance(symbol)
-    if data:
-        set_cached_data(cache_key, data)
-        return data
+    # market data
+    market_cap = info.get('marketCap')
+    pe_ratio = info.get('trailingPE')
+    
+    # 52-week extremes are maintained incrementally as new bars arrive
+    high, low = EXTREMES.feed(ticker, hist, extremes_calendar(ticker))
     
-    return None
+    return Quote(
+        symbol=ticker,
+        current=round(current, 2),
+        open=round(open_price, 2),
+        prev_close=round(prev_close, 2),
+        high=round(high, 2),
+        low=round(low, 2),
+        change=round(current - prev_close, 2),
+        change_percent=round((current - prev_close) / prev_close * 100, 2),
+        pe_ratio=round(pe_ratio, 2) if pe_ratio else None,
+        market_cap=market_cap,
+        volume=int(volume) if volume else None,
+        avg_volume=int(avg_volume) if avg_volume else None,
+        # daily bars carry no book, and inventing a spread around the close would show as a real quote
+        bid=None,
+        ask=None,
+        data=price_series(series.to_numpy()),
+        time_range=time_range,
+        type="stock",
+        last_updated=time.time()
+    )
+
+def get_stocks_data(tickers, force_refresh=False, time_range="1d"):
+    """Fetch many stocks at once; returns {ticker: result} for every ticker that resolved"""
+    time_range = normalize_range(time_range)
+    results = {}
+    pending = []
+    for ticker in dict.fromkeys(tickers):
+        cached_data = None if force_refresh else get_cached_data(f"stock_{ticker}_{time_range}")
+        if cached_data:
+            results[ticker] = cached_data
+        else:
+            pending.append(ticker)
+
+    if not pending:
+        return results
 
-def get_crypto_data_coingecko(symbol):
+    try:
+        # bulk requests for the whole batch instead of info + 2 histories per symbol;
+        # the range download is queued first so it runs while the histories update
+        spec = STOCK_RANGES[time_range]
+        frames_future = None
+        if spec is not None:
+            # one request per ticker, charged as such
+            frames_future = yahoo_submit(yf.download, pending, period=spec[0], interval=spec[1], group_by="ticker",
+                                         auto_adjust=True, threads=False, progress=False, cost=len(pending))
+        histories = update_histories(pending)
+        frames = frames_future.result() if frames_future is not None else None
+    except Exception as e:
+        print(f"Error fetching batch stock data for {len(pending)} tickers: {str(e)}")
+        METRICS.inc("tickr_fetch_errors_total", {"source": "stock_batch"})
+        return results
+
+    for ticker in pending:
+        try:
+            hist = histories[ticker]
+            if hist.empty:
+                print(f"Warning: No data found for {ticker} (may be delisted)")
+                continue
+
+            # the bulk download has no quote summary: quote fields come from the bars,
+            # fundamentals only if the slow tier already has them
+            info = bar_quote_info(hist)
+            fundamentals = DATA_CACHE.get(f"fundamentals_{ticker}", allow_stale=True)
+            if fundamentals:
+                info.update(fundamentals)
+            if frames is None:
+                series = trim_to_range(hist["Close"], time_range)
+            elif ticker in frames.columns.get_level_values(0):
+                series = trim_to_range(frames[ticker]["Close"].dropna(), time_range)
+            else:
+                series = hist["Close"].iloc[:0]
+            result = build_stock_result(ticker, hist, hist.iloc[-1:], info, series, time_range)
+            set_cached_data(f"stock_{ticker}_{time_range}", result, PRICE_TTL)
+            results[ticker] = result
+        except Exception as e:
+            print(f"Error fetching stock data for {ticker}: {str(e)}")
+            METRICS.inc("tickr_fetch_errors_total", {"source": "stock_batch"})
+
+    return results
+
+def get_crypto_data(symbol, force_refresh=False, time_range="1d"):
+    time_range = normalize_range(time_range)
+    cache_key = f"crypto_{symbol}_{time_range}"
+    if force_refresh:
+        return DATA_CACHE.load(cache_key, lambda: fetch_crypto_data(symbol, time_range))
+    return DATA_CACHE.get_or_load(cache_key, lambda: fetch_crypto_data(symbol, time_range))
+
+def fetch_crypto_data(symbol, time_range="1d"):
+    ids = COINS.resolve(symbol)
+    # a symbol no provider could serve costs no request at all until the index is refreshed
+    if ids is None:
+        return None
+    if not any(ids.values()):
+        # missing from the coin lists, yfinance is the last provider that may still know it
+        data = get_crypto_data_yfinance(symbol, time_range)
+        if data is None:
+            COINS.mark_unresolved(symbol)
+        return data
+    if time_range in COINGECKO_RANGES:
+        providers = [get_crypto_data_coingecko, get_crypto_data_coinmarketcap, get_crypto_data_yfinance]
+    else:
+        providers = [get_crypto_data_yfinance, get_crypto_data_coinmarketcap]
+    if CRYPTO_FETCH_MODE == 'sequential':
+        for provider in providers:
+            data = provider(symbol, time_range)
+            if data:
+                return data
+        return None
+    return fetch_hedged(symbol, time_range, providers, CRYPTO_HEDGE_DELAY)
+
+def fetch_hedged(symbol, time_range, providers, hedge_delay):
+    """Start the next provider as soon as the running ones fail or take longer than hedge_delay; first valid result wins.
+
+    Losers get a cancel token: providers that have not started are dropped, running
+    ones check it between their requests and give up. A request already on the wire
+    still completes, its result is discarded.
+    """
+    queue = list(providers)
+    running = set()
+    cancelled = Event()
+    try:
+        while queue or running:
+            if queue:
+                running.add(PROVIDER_POOL.submit(queue.pop(0), symbol, time_range, cancelled))
+            done, running = wait(running, timeout=hedge_delay if queue else None, return_when=FIRST_COMPLETED)
+            for future in done:
+                data = future.result()
+                if data:
+                    return data
+        return None
+    finally:
+        cancelled.set()
+        for future in running:
+            future.cancel()
+
+def is_cancelled(cancelled):
+    return cancelled is not None and cancelled.is_set()
+
+def coingecko_chart(coin_id, days):
+    chart_url = f"https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart"
+    params = {"vs_currency": "usd", "days": days}
+    return get_json(chart_url, params, provider='coingecko', max_wait=PROVIDER_MAX_WAIT)["prices"]
+
+def year_extremes(points):
+    cutoff = points[-1][0] - 365 * 24 * 3600 * 1000
+    year = [price for timestamp, price in points if timestamp > cutoff]
+    return max(year), min(year)
+
+def coingecko_year_extremes(coin_id):
+    """52-week high/low cached on their own so short ranges don't download a year of prices"""
+    def load():
+        points = coingecko_chart(coin_id, "365")
+        return year_extremes(points) if points else None
+    return DATA_CACHE.get_or_load(f"coingecko_year_{coin_id}", load, ttl=3600)
+
+def get_crypto_data_coingecko(symbol, time_range="1d", cancelled=None):
     try:
         symbol_upper = symbol.upper()
-        coin_id = CRYPTO_MAPPING.get(symbol_upper, {}).get('coingecko', symbol.lower())
+        coin_id = COINS.provider_id(symbol, 'coingecko')
+        if not coin_id or time_range not in COINGECKO_RANGES or is_cancelled(cancelled):
+            return None
         
+        # the requests are independent, so the market data is fetched alongside the chart
         market_url = f"https://api.coingecko.com/api/v3/coins/{coin_id}"
-        market_r = requests.get(market_url, timeout=10)
-        market_r.raise_for_status()
-        market_data = market_r.json()
-        
-        chart_url = f"https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart"
-        params = {"vs_currency": "usd", "days": "365"}
-        chart_r = requests.get(chart_url, params=params, timeout=10)
-        chart_r.raise_for_status()
-        chart_data = chart_r.json()
+        market_future = submit_json(market_url, provider='coingecko', max_wait=PROVIDER_MAX_WAIT)
+        extremes_future = None
+        if time_range != "1y":
+            extremes_future = REQUEST_POOL.submit(coingecko_year_extremes, coin_id)
         
-        prices = [price[1] for price in chart_data["prices"]]
-        if not prices:
+        points = coingecko_chart(coin_id, COINGECKO_RANGES[time_range])
+        if is_cancelled(cancelled):
+            # the market request is dropped if it is still waiting for its rate-limit slot
+            market_future.cancel()
             return None
-            
+        market_data = market_future.result()
+        if not points:
+            return None
+        
+        if extremes_future is None:
+            high, low = year_extremes(points)
+        else:
+            # an empty year chart leaves the 52-week fields unknown rather than failing the quote
+            extremes = extremes_future.result()
+            high, low = extremes if extremes is not None else (float('nan'), float('nan'))
+        if time_range == "1h":
+            cutoff = points[-1][0] - 3600 * 1000
+            points = [point for point in points if point[0] > cutoff]
+        
+        prices = [price[1] for price in points]
         current = prices[-1]
         market_info = market_data.get('market_data', {})
+        change_24h = market_info.get('price_change_24h')
+        prev_close = current - change_24h if change_24h is not None else (prices[-2] if len(prices) > 1 else current)
         
-        return {
-            "symbol": symbol_upper,
-            "current": round(current, 2),
-            "open": round(market_info.get('current_price', {}).get('usd', current), 2),
-            "prev_close": round(prices[-2] if len(prices) > 1 else current, 2),
-            "high": round(max(prices), 2),
-            "low": round(min(prices), 2),
-            "change": round(current - prices[0], 2),
-            "change_percent": round((current - prices[0]) / prices[0] * 100, 2),
-            "pe_ratio": None,
-            "market_cap": f"{market_info.get('market_cap', {}).get('usd', 0)/1e9:.2f}B",
-            "volume": int(market_info.get('total_volume', {}).get('usd', 0)),
-            "avg_volume": None,
-            "bid": round(current * 0.999, 2),
-            "ask": round(current * 1.001, 2),
-            "data": prices,
-            "type": "crypto",
-            "last_updated": datetime.now().isoformat()
-        }
+        return Quote(
+            symbol=symbol_upper,
+            current=round(current, 2),
+            open=round(market_info.get('current_price', {}).get('usd', current), 2),
+            prev_close=round(prev_close, 2),
+            high=round(high, 2),
+            low=round(low, 2),
+            change=round(current - prices[0], 2),
+            change_percent=round((current - prices[0]) / prices[0] * 100, 2),
+            pe_ratio=None,
+            market_cap=market_info.get('market_cap', {}).get('usd'),
+            volume=int(market_info.get('total_volume', {}).get('usd', 0)),
+            avg_volume=None,
+            bid=None,
+            ask=None,
+            data=price_series(prices),
+            time_range=time_range,
+            type="crypto",
+            last_updated=time.time()
+        )
     except Exception as e:
         print(f"CoinGecko API error for {symbol}: {str(e)}")
+        METRICS.inc("tickr_fetch_errors_total", {"source": "coingecko"})
         return None
 
-def get_crypto_data_coinmarketcap(symbol):
+def get_crypto_data_coinmarketcap(symbol, time_range="1d", cancelled=None):
     try:
         if not COINMARKETCAP_API_KEY or COINMARKETCAP_API_KEY == 'your-api-key-here':
             return None
             
         symbol_upper = symbol.upper()
-        coin_id = CRYPTO_MAPPING.get(symbol_upper, {}).get('coinmarketcap')
-        if not coin_id:
+        coin_id = COINS.provider_id(symbol, 'coinmarketcap')
+        if not coin_id or is_cancelled(cancelled):
             return None
         
         url = "https://pro-api.coinmarketcap.com/v1/cryptocurrency/quotes/latest"
         params = {'id': coin_id, 'convert': 'USD'}
         headers = {'X-CMC_PRO_API_KEY': COINMARKETCAP_API_KEY}
         
-        response = requests.get(url, headers=headers, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        data = get_json(url, params, headers, provider='coinmarketcap', max_wait=PROVIDER_MAX_WAIT)
         
         quote = data['data'][str(coin_id)]['quote']['USD']
         current = quote['price']
         
-        prices = [current] * 30
+        # the quotes endpoint has no history, so the series is flat whatever the range
+        prices = np.full(30, current, dtype=np.float64)
         
-        return {
-            "symbol": symbol_upper,
-            "current": round(current, 2),
-            "open": round(quote.get('open_24h', current), 2),
-            "prev_close": round(quote.get('open_24h', current), 2),
-            "high": round(quote.get('high_24h', current), 2),
-            "low": round(quote.get('low_24h', current), 2),
-            "change": round(quote.get('percent_change_24h', 0) * current / 100, 2),
-            "change_percent": round(quote.get('percent_change_24h', 0), 2),
-            "pe_ratio": None,
-            "market_cap": f"{quote.get('market_cap', 0)/1e9:.2f}B",
-            "volume": int(quote.get('volume_24h', 0)),
-            "avg_volume": None,
-            "bid": round(current * 0.999, 2),
-            "ask": round(current * 1.001, 2),
-            "data": prices,
-            "type": "crypto",
-            "last_updated": datetime.now().isoformat()
-        }
+        return Quote(
+            symbol=symbol_upper,
+            current=round(current, 2),
+            open=round(quote.get('open_24h', current), 2),
+            prev_close=round(quote.get('open_24h', current), 2),
+            # the quotes endpoint only knows 24h extremes, not the 52-week ones these fields hold
+            high=float('nan'),
+            low=float('nan'),
+            change=round(quote.get('percent_change_24h', 0) * current / 100, 2),
+            change_percent=round(quote.get('percent_change_24h', 0), 2),
+            pe_ratio=None,
+            market_cap=quote.get('market_cap'),
+            volume=int(quote.get('volume_24h', 0)),
+            avg_volume=None,
+            bid=None,
+            ask=None,
+            data=prices,
+            time_range=time_range,
+            type="crypto",
+            last_updated=time.time()
+        )
     except Exception as e:
         print(f"CoinMarketCap API error for {symbol}: {str(e)}")
+        METRICS.inc("tickr_fetch_errors_total", {"source": "coinmarketcap"})
         return None
 
-def get_crypto_data_yfinance(symbol):
+def get_crypto_data_yfinance(symbol, time_range="1d", cancelled=None):
     try:
-        data = get_stock_data(f"{symbol}-USD", force_refresh=True)
+        if is_cancelled(cancelled):
+            return None
+        data = get_stock_data(f"{symbol}-USD", force_refresh=True, time_range=time_range)
         if data:
-            data["type"] = "crypto"
-            data["symbol"] = symbol.upper()
-            if 'data' not in data or not data['data']:
-                if 'history' in data:
-                    data['data'] = data['history']['Close'].tolist()
+            # the stock result is shared through the cache, relabel a copy
+            data = data.replace(type="crypto", symbol=symbol.upper())
         return data
     except Exception as e:
         print(f"YFinance fallback failed for {symbol}: {str(e)}")
+        METRICS.inc("tickr_fetch_errors_total", {"source": "yfinance_crypto"})
         return None
\ No newline at end of file
@@ -0,0 +1,75 @@
+from PySide6.QtCore import Qt, QObject, QTimer, QElapsedTimer
+from PySide6.QtGui import QFont
+from PySide6.QtWidgets import (
+    QApplication, QDockWidget, QWidget, QVBoxLayout, QHBoxLayout,
+    QPlainTextEdit, QComboBox, QPushButton
+)
+
+from .metrics import METRICS
+
+LAG_INTERVAL = 250
+PANEL_REFRESH = 1000
+
+class EventLoopLagMonitor(QObject):
+    """Measures how late a periodic timer fires; the excess is time the GUI thread was busy"""
+
+    def __init__(self, parent=None, interval=LAG_INTERVAL):
+        super().__init__(parent)
+        self.interval = interval
+        self.clock = QElapsedTimer()
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.tick)
+        self.clock.start()
+        self.timer.start(interval)
+
+    def tick(self):
+        elapsed = self.clock.restart()
+        METRICS.observe("tickr_event_loop_lag_seconds", max(0, elapsed - self.interval) / 1000)
+
+class DebugPanel(QDockWidget):
+    """Dock showing the live metrics as a summary, Prometheus text or JSON; refreshes only while visible"""
+
+    def __init__(self, parent=None):
+        super().__init__("Performance", parent)
+        self.setObjectName("performance_panel")
+
+        self.format_combo = QComboBox()
+        self.format_combo.addItems(["Summary", "Prometheus", "JSON"])
+        self.format_combo.currentTextChanged.connect(lambda _: self.render())
+        copy_button = QPushButton("Copy")
+        copy_button.clicked.connect(lambda: QApplication.clipboard().setText(self.view.toPlainText()))
+
+        self.view = QPlainTextEdit()
+        self.view.setReadOnly(True)
+        self.view.setFont(QFont("Consolas", 9))
+        self.view.setLineWrapMode(QPlainTextEdit.NoWrap)
+
+        controls = QHBoxLayout()
+        controls.addWidget(self.format_combo)
+        controls.addStretch(1)
+        controls.addWidget(copy_button)
+        body = QWidget()
+        layout = QVBoxLayout(body)
+        layout.addLayout(controls)
+        layout.addWidget(self.view)
+        self.setWidget(body)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.render)
+        self.visibilityChanged.connect(self.on_visibility_changed)
+
+    def on_visibility_changed(self, visible):
+        if visible:
+            self.render()
+            self.timer.start(PANEL_REFRESH)
+        else:
+            self.timer.stop()
+
+    def render(self):
+        export = {"Summary": METRICS.summary, "Prometheus": METRICS.to_prometheus, "JSON": METRICS.to_json}
+        text = export[self.format_combo.currentText()]()
+        scroll = self.view.verticalScrollBar()
+        position = scroll.value()
+        self.view.setPlainText(text)
+        scroll.setValue(position)
@@ -0,0 +1,213 @@
+from collections import deque
+from datetime import date, datetime
+from threading import Lock
+
+WINDOW_DAYS = 364
+
+class RollingExtremes:
+    """52-week max/min of one symbol kept in monotonic deques of (day, value).
+
+    Only finished bars are committed to the deques. The latest bar stays pending
+    because its session may still be open, so refreshes can revise it without
+    undoing deque pops.
+    """
+    __slots__ = ('highs', 'lows', 'first_day', 'pending', 'records')
+
+    def __init__(self):
+        self.highs = deque()
+        self.lows = deque()
+        self.first_day = None
+        self.pending = None
+        # day -> (new_high, new_low) for the days in the window that set a record, oldest first
+        self.records = {}
+
+    def commit(self, day, high, low):
+        while self.highs and self.highs[-1][1] <= high:
+            self.highs.pop()
+        self.highs.append((day, high))
+        while self.lows and self.lows[-1][1] >= low:
+            self.lows.pop()
+        self.lows.append((day, low))
+
+    def expire(self, day, window):
+        cutoff = day - window
+        while self.highs and self.highs[0][0] <= cutoff:
+            self.highs.popleft()
+        while self.lows and self.lows[0][0] <= cutoff:
+            self.lows.popleft()
+        while self.records and next(iter(self.records)) <= cutoff:
+            del self.records[next(iter(self.records))]
+
+    def push(self, day, high, low, window):
+        """Add or revise the latest bar; returns (new_high, new_low) for its day"""
+        if self.first_day is None:
+            self.first_day = day
+        if self.pending is not None and day > self.pending[0]:
+            self.commit(*self.pending)
+        self.pending = (day, high, low)
+        self.expire(day, window)
+
+        # a symbol only sets a 52-week record once it has a full window behind it
+        if self.first_day > day - window or not self.highs:
+            return False, False
+        return high > self.highs[0][1], low < self.lows[0][1]
+
+    def extremes(self):
+        if self.pending is None:
+            return None, None
+        _, high, low = self.pending
+        if self.highs:
+            high = max(high, self.highs[0][1])
+            low = min(low, self.lows[0][1])
+        return high, low
+
+# 24/7 markets (yfinance's crypto pairs) roll over every UTC midnight, weekends included,
+# so they get their own session and breadth instead of moving the exchanges' day forward
+EXCHANGE = "exchange"
+CRYPTO = "crypto"
+
+class Session:
+    """Breadth of one calendar: record counts per day over the last window, symbols for the latest day only"""
+    __slots__ = ('day', 'highs', 'lows', 'counts')
+
+    def __init__(self):
+        self.day = None
+        self.highs = set()
+        self.lows = set()
+        self.counts = {}
+
+    def advance(self, day, window):
+        self.day = day
+        self.highs = set()
+        self.lows = set()
+        cutoff = day - window
+        for old in [old for old in self.counts if old <= cutoff]:
+            del self.counts[old]
+
+    def count(self, day, before, after, window):
+        """Move one symbol's flags for `day` from `before` to `after` in the day's counts"""
+        if self.day is not None and day <= self.day - window:
+            return
+        counts = self.counts.setdefault(day, [0, 0])
+        for index in (0, 1):
+            counts[index] += after[index] - before[index]
+
+class ExtremesEngine:
+    """Rolling 52-week highs/lows for a whole universe, updated one bar at a time.
+
+    Symbols belong to a calendar. Each calendar keeps the number of new highs and
+    lows per day over the last window for its breadth series, and the symbols
+    behind them only for its current session, the latest day fed for any of its
+    symbols.
+    """
+
+    def __init__(self, window_days=WINDOW_DAYS):
+        self.window = window_days
+        self.symbols = {}
+        self.calendars = {}
+        self.sessions = {}
+        self.lock = Lock()
+
+    def clear(self):
+        with self.lock:
+            self.symbols.clear()
+            self.calendars.clear()
+            self.sessions.clear()
+
+    def reset(self, symbol):
+        """Forget a symbol's bars and the records they set; its next feed starts from scratch.
+
+        For a history that was rewritten, e.g. re-adjusted after a split or dividend.
+        """
+        with self.lock:
+            state = self.symbols.pop(symbol, None)
+            session = self.sessions.get(self.calendars.pop(symbol, None))
+            if state is None or session is None:
+                return
+            for day, flags in state.records.items():
+                session.count(day, flags, (False, False), self.window)
+            session.highs.discard(symbol)
+            session.lows.discard(symbol)
+
+    def update(self, symbol, day, high, low, calendar=EXCHANGE):
+        """Feed one daily bar (day as a date or ordinal); returns (new_high, new_low)"""
+        if isinstance(day, date):
+            day = day.toordinal()
+        with self.lock:
+            state = self.symbols.get(symbol)
+            if state is None:
+                state = self.symbols[symbol] = RollingExtremes()
+            elif state.pending is not None and day < state.pending[0]:
+                return False, False
+            self.calendars[symbol] = calendar
+            # a revised pending bar replaces the flags it set before
+            before = state.records.pop(day, (False, False))
+            new_high, new_low = state.push(day, high, low, self.window)
+            if new_high or new_low:
+                state.records[day] = (new_high, new_low)
+
+            session = self.sessions.get(calendar)
+            if session is None:
+                session = self.sessions[calendar] = Session()
+            if session.day is None or day > session.day:
+                session.advance(day, self.window)
+            session.count(day, before, (new_high, new_low), self.window)
+            if day == session.day:
+                self.mark(session.highs, symbol, new_high)
+                self.mark(session.lows, symbol, new_low)
+            return new_high, new_low
+
+    def mark(self, symbols, symbol, flagged):
+        if flagged:
+            symbols.add(symbol)
+        else:
+            symbols.discard(symbol)
+
+    def feed(self, symbol, hist, calendar=EXCHANGE):
+        """Feed the bars of a history frame the engine has not seen yet; returns (high, low)"""
+        with self.lock:
+            state = self.symbols.get(symbol)
+            last = state.pending[0] if state and state.pending else None
+        if last is not None:
+            # only the pending bar and anything after it, the rest is already in the deques
+            hist = hist.iloc[hist.index.searchsorted(datetime.fromordinal(last)):]
+        for index, high, low in zip(hist.index, hist["High"], hist["Low"]):
+            self.update(symbol, index.date().toordinal(), float(high), float(low), calendar)
+        return self.extremes(symbol)
+
+    def extremes(self, symbol):
+        with self.lock:
+            state = self.symbols.get(symbol)
+            return state.extremes() if state else (None, None)
+
+    def session_symbols(self, day, calendar, attribute):
+        if isinstance(day, date):
+            day = day.toordinal()
+        with self.lock:
+            session = self.sessions.get(calendar)
+            if session is None or session.day != day:
+                return []
+            return sorted(getattr(session, attribute))
+
+    def highs_on(self, day, calendar=EXCHANGE):
+        """Symbols at a new 52-week high on `day`; only the calendar's current session is known"""
+        return self.session_symbols(day, calendar, 'highs')
+
+    def lows_on(self, day, calendar=EXCHANGE):
+        return self.session_symbols(day, calendar, 'lows')
+
+    def session_day(self, calendar=EXCHANGE):
+        with self.lock:
+            session = self.sessions.get(calendar)
+            return date.fromordinal(session.day) if session and session.day is not None else None
+
+    def breadth(self, calendar=EXCHANGE):
+        """[(date, new highs, new lows, highs - lows)] for every day in the last window with a bar"""
+        with self.lock:
+            session = self.sessions.get(calendar)
+            if session is None:
+                return []
+            return [(date.fromordinal(day), highs, lows, highs - lows)
+                    for day, (highs, lows) in sorted(session.counts.items())]
+
+EXTREMES = ExtremesEngine()
@@ -0,0 +1,5 @@
+# display helpers shared by the window and Quote.to_dict; no numpy here, the window imports
+# this before its first paint
+
+def format_market_cap(value):
+    return f"{value/1e9:.2f}B" if value else "--"
@@ -0,0 +1,162 @@
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from threading import Lock
+
+import pandas as pd
+import requests
+import yfinance as yf
+from yfinance.exceptions import YFRateLimitError
+
+from .extremes import EXTREMES
+from .paths import data_path
+from .transport import submit_call
+
+HISTORY_PERIOD = "1y"
+HISTORY_DAYS = 365
+COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS bars (
+        symbol TEXT NOT NULL,
+        date TEXT NOT NULL,
+        open REAL,
+        high REAL,
+        low REAL,
+        close REAL,
+        volume REAL,
+        PRIMARY KEY (symbol, date)
+    ) WITHOUT ROWID
+"""
+
+WRITE_LOCK = Lock()
+_local = threading.local()
+
+# yfinance manages its own keep-alive session, these are the failures worth retrying
+YAHOO_RETRY_ERRORS = (YFRateLimitError, ConnectionError, TimeoutError, requests.ConnectionError, requests.Timeout)
+# longest a Yahoo call queues for its rate-limit slot; the threads waiting on it are loader
+# and pool workers, so past this the call fails with RateLimited instead of parking them
+YAHOO_MAX_WAIT = 15.0
+
+def yahoo_submit(fn, *args, cost=1, max_wait=YAHOO_MAX_WAIT, **kwargs):
+    """Rate-limited, retried yfinance call; returns a Future, or raises RateLimited when the slot is too far out"""
+    return submit_call('yahoo', fn, *args, retry_on=YAHOO_RETRY_ERRORS, throttled_on=YFRateLimitError,
+                       cost=cost, max_wait=max_wait, **kwargs)
+
+def yahoo_call(fn, *args, cost=1, max_wait=YAHOO_MAX_WAIT, **kwargs):
+    """yahoo_submit for callers that need the result before they can go on"""
+    return yahoo_submit(fn, *args, cost=cost, max_wait=max_wait, **kwargs).result()
+
+def get_connection():
+    """One sqlite connection per thread; WAL lets readers run alongside the writer"""
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        conn = sqlite3.connect(data_path('history.db'), timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(SCHEMA)
+        _local.conn = conn
+    return conn
+
+def last_stored_date(symbol):
+    row = get_connection().execute(
+        "SELECT MAX(date) FROM bars WHERE symbol = ?", (symbol,)
+    ).fetchone()
+    return row[0] if row else None
+
+def first_stored_date(symbol):
+    row = get_connection().execute(
+        "SELECT MIN(date) FROM bars WHERE symbol = ?", (symbol,)
+    ).fetchone()
+    return row[0] if row else None
+
+def store_bars(symbol, hist, replace=False):
+    """Upsert daily bars; the last stored bar is rewritten while its session is still open.
+
+    `replace` swaps in a whole new series, re-adjusted after a split or dividend, so
+    the symbol's 52-week extremes are rebuilt from it on the next feed.
+    """
+    if hist.empty:
+        return
+    rows = [
+        (symbol, index.strftime("%Y-%m-%d"), row.Open, row.High, row.Low, row.Close, row.Volume)
+        for index, row in zip(hist.index, hist[COLUMNS].itertuples(index=False))
+        if not pd.isna(row.Close)
+    ]
+    with WRITE_LOCK:
+        conn = get_connection()
+        with conn:
+            if replace:
+                conn.execute("DELETE FROM bars WHERE symbol = ?", (symbol,))
+            conn.executemany("INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+    if replace:
+        EXTREMES.reset(symbol)
+
+def load_history(symbol, days=HISTORY_DAYS):
+    """Last `days` of stored bars in the same shape as yf.Ticker.history"""
+    conn = get_connection()
+    last = last_stored_date(symbol)
+    if last is None:
+        return pd.DataFrame(columns=COLUMNS)
+    start = (datetime.strptime(last, "%Y-%m-%d") - timedelta(days=days)).strftime("%Y-%m-%d")
+    rows = conn.execute(
+        "SELECT date, open, high, low, close, volume FROM bars "
+        "WHERE symbol = ? AND date > ? ORDER BY date",
+        (symbol, start)
+    ).fetchall()
+    hist = pd.DataFrame(rows, columns=["Date"] + COLUMNS)
+    hist.index = pd.DatetimeIndex(pd.to_datetime(hist.pop("Date")))
+    return hist
+
+def has_corporate_action(hist):
+    """Dividends/splits re-adjust the whole series, so appended bars would no longer line up"""
+    for column in ("Dividends", "Stock Splits"):
+        if column in hist.columns and (hist[column].fillna(0) != 0).any():
+            return True
+    return False
+
+def update_history(symbol, stock=None):
+    """Fetch only bars newer than the last stored one, then serve the series from disk"""
+    stock = stock or yf.Ticker(symbol)
+    last = last_stored_date(symbol)
+    if last is None:
+        store_bars(symbol, yahoo_call(stock.history, period=HISTORY_PERIOD), replace=True)
+    else:
+        delta = yahoo_call(stock.history, start=last)
+        if has_corporate_action(delta):
+            store_bars(symbol, yahoo_call(stock.history, period=HISTORY_PERIOD), replace=True)
+        else:
+            store_bars(symbol, delta)
+    return load_history(symbol)
+
+def update_histories(symbols):
+    """Batch form of update_history: at most one bulk download for new symbols and one for known ones.
+
+    yf.download makes one request per ticker, so each download is charged that many
+    rate-limit tokens, and runs them one after another instead of in its own threads.
+    """
+    known = {symbol: last_stored_date(symbol) for symbol in symbols}
+    fresh = [symbol for symbol, last in known.items() if last is None]
+    stale = [symbol for symbol, last in known.items() if last is not None]
+
+    if fresh:
+        frames = yahoo_call(yf.download, fresh, period=HISTORY_PERIOD, group_by="ticker", auto_adjust=True,
+                             actions=True, threads=False, progress=False, cost=len(fresh))
+        for symbol in fresh:
+            if symbol in frames.columns.get_level_values(0):
+                store_bars(symbol, frames[symbol].dropna(subset=["Close"]), replace=True)
+
+    if stale:
+        start = min(known[symbol] for symbol in stale)
+        frames = yahoo_call(yf.download, stale, start=start, group_by="ticker", auto_adjust=True,
+                             actions=True, threads=False, progress=False, cost=len(stale))
+        for symbol in stale:
+            if symbol not in frames.columns.get_level_values(0):
+                continue
+            delta = frames[symbol].dropna(subset=["Close"])
+            if has_corporate_action(delta):
+                store_bars(symbol, yahoo_call(yf.Ticker(symbol).history, period=HISTORY_PERIOD), replace=True)
+            else:
+                store_bars(symbol, delta[delta.index.strftime("%Y-%m-%d") >= known[symbol]])
+
+    return {symbol: load_history(symbol) for symbol in symbols}
@@ -1,15 +1,54 @@
 import sys
-import os
-from PySide6.QtWidgets import QApplication
-from tickr_backend.ui import TickrUI
-import qtmodernredux6
+import argparse
+from tickr_backend.startup import StartupProfiler, on_first_paint
 
 
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="tickr")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="print import and construction timings, then exit after the first paint")
+    parser.add_argument('--server', action='store_true',
+                        help="run the headless quote server instead of the window (see tickr_backend.server)")
+    # whatever is left over is handed to Qt, or to the server's own options
+    return parser.parse_known_args(argv[1:])
+
 def run_app():
-    app = QApplication(sys.argv)
+    args, qt_args = parse_args(sys.argv)
+    if args.server:
+        from tickr_backend.server import main as run_server
+        run_server(qt_args)
+        return
+    profiler = StartupProfiler() if args.profile_startup else None
+    if profiler:
+        profiler.install()
+
+    from PySide6.QtWidgets import QApplication
+    from PySide6.QtCore import Qt, QCoreApplication
+    from tickr_backend.ui import TickrUI
+    if profiler:
+        profiler.mark("imports")
+
+    # QtWebEngine is imported lazily, so it can't set this itself before the app exists
+    QCoreApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
+    app = QApplication(sys.argv[:1] + qt_args)
+    if profiler:
+        profiler.mark("QApplication")
     window = TickrUI()
+    if profiler:
+        profiler.mark("TickrUI constructed")
     window.show()
-    sys.exit(app.exec())
+
+    if profiler:
+        def finish():
+            profiler.mark("first paint")
+            profiler.uninstall()
+            profiler.report()
+            app.quit()
+        on_first_paint(window, finish)
+    code = app.exec()
+    # let in-flight pool work (e.g. the import warm-up) wind down before the interpreter does
+    window.thread_pool.waitForDone(5000)
+    sys.exit(code)
 
 if __name__ == "__main__":
-    run_app()
\ No newline at end of file
+    run_app()
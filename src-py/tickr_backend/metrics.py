@@ -0,0 +1,181 @@
+import json
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from threading import Lock
+
+# seconds; covers cache hits and local work up to slow provider round trips
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Histogram:
+    """Fixed-bucket histogram; counts are per bucket and made cumulative on export"""
+    __slots__ = ('bounds', 'counts', 'total', 'count')
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Estimate by linear interpolation inside the bucket holding the q-th observation"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.bounds[index - 1] if index else 0.0
+                upper = self.bounds[index] if index < len(self.bounds) else self.bounds[-1]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.bounds[-1]
+
+    def to_dict(self):
+        cumulative = []
+        running = 0
+        for count in self.counts:
+            running += count
+            cumulative.append(running)
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "buckets": dict(zip([str(bound) for bound in self.bounds] + ["+Inf"], cumulative)),
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99)
+        }
+
+def label_key(labels):
+    return tuple(sorted(labels.items())) if labels else ()
+
+def format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}"
+
+class Metrics:
+    """Process-wide counters and latency histograms, exportable as Prometheus text or JSON.
+
+    Hot paths only take a lock and bump a number. Components that already keep their
+    own counters (the quote cache) register a collector that is read at export time.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.help = {}
+        self.collectors = []
+        self.started = time.time()
+
+    def describe(self, name, text):
+        self.help[name] = text
+
+    def inc(self, name, labels=None, value=1):
+        key = (name, label_key(labels))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, labels=None, buckets=LATENCY_BUCKETS):
+        key = (name, label_key(labels))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name, labels=None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, labels)
+
+    def register_collector(self, collector):
+        """`collector()` returns [(name, type, labels, value)] with type "counter" or "gauge" """
+        self.collectors.append(collector)
+
+    def collected(self):
+        samples = []
+        for collector in self.collectors:
+            try:
+                samples.extend(collector())
+            except Exception as e:
+                print(f"Metrics collector failed: {e}")
+        return samples
+
+    def snapshot(self):
+        with self.lock:
+            counters = dict(self.counters)
+            histograms = {key: histogram.to_dict() for key, histogram in self.histograms.items()}
+        return counters, histograms, self.collected()
+
+    def to_json(self):
+        counters, histograms, collected = self.snapshot()
+        result = {"uptime_seconds": time.time() - self.started, "counters": {}, "gauges": {}, "histograms": {}}
+        for (name, key), value in counters.items():
+            result["counters"].setdefault(name, []).append({"labels": dict(key), "value": value})
+        for name, kind, labels, value in collected:
+            section = "counters" if kind == "counter" else "gauges"
+            result[section].setdefault(name, []).append({"labels": labels or {}, "value": value})
+        for (name, key), histogram in histograms.items():
+            result["histograms"].setdefault(name, []).append({"labels": dict(key), **histogram})
+        return json.dumps(result, indent=2)
+
+    def to_prometheus(self):
+        counters, histograms, collected = self.snapshot()
+        families = {}
+        for (name, key), value in counters.items():
+            families.setdefault((name, "counter"), []).append(f"{name}{format_labels(key)} {value}")
+        for name, kind, labels, value in collected:
+            families.setdefault((name, kind), []).append(f"{name}{format_labels(label_key(labels))} {value}")
+        for (name, key), histogram in histograms.items():
+            lines = families.setdefault((name, "histogram"), [])
+            for bound, count in histogram["buckets"].items():
+                lines.append(f"{name}_bucket{format_labels(key, [('le', bound)])} {count}")
+            lines.append(f"{name}_sum{format_labels(key)} {histogram['sum']}")
+            lines.append(f"{name}_count{format_labels(key)} {histogram['count']}")
+
+        output = []
+        for (name, kind), lines in sorted(families.items()):
+            if name in self.help:
+                output.append(f"# HELP {name} {self.help[name]}")
+            output.append(f"# TYPE {name} {kind}")
+            output.extend(lines)
+        return "\n".join(output) + "\n"
+
+    def summary(self):
+        """Short human-readable digest for the debug panel"""
+        counters, histograms, collected = self.snapshot()
+        lines = ["Latency (count, p50 / p95 / p99 ms):"]
+        for (name, key), histogram in sorted(histograms.items()):
+            quantiles = " / ".join(f"{histogram[q] * 1000:.1f}" for q in ("p50", "p95", "p99"))
+            lines.append(f"  {name}{format_labels(key)}  n={histogram['count']}  {quantiles}")
+        lines.append("")
+        lines.append("Counters:")
+        for (name, key), value in sorted(counters.items()):
+            lines.append(f"  {name}{format_labels(key)}  {value}")
+        for name, kind, labels, value in collected:
+            shown = f"{value:.3f}" if isinstance(value, float) else value
+            lines.append(f"  {name}{format_labels(label_key(labels))}  {shown}")
+        return "\n".join(lines)
+
+METRICS = Metrics()
+METRICS.describe("tickr_provider_request_seconds", "Provider request latency per attempt")
+METRICS.describe("tickr_provider_errors_total", "Failed provider requests by kind")
+METRICS.describe("tickr_provider_throttled_total", "Provider answers that asked us to slow down (HTTP 429)")
+METRICS.describe("tickr_ratelimit_wait_seconds", "Time spent waiting for a local rate-limit slot")
+METRICS.describe("tickr_fetch_errors_total", "Quote fetches that failed inside data.py")
+METRICS.describe("tickr_loader_queue_seconds", "Time a UI load waited in the thread pool before running")
+METRICS.describe("tickr_loader_run_seconds", "Time a UI load spent running")
+METRICS.describe("tickr_event_loop_lag_seconds", "How late the Qt event loop serviced a periodic timer")
+METRICS.describe("tickr_update_display_seconds", "Duration of one TickrUI.update_display call")
+METRICS.describe("tickr_ui_errors_total", "Exceptions caught while updating the UI")
@@ -0,0 +1,10 @@
+import os
+
+DATA_DIR = os.getenv('TICKR_DATA_DIR', os.path.join(os.path.expanduser('~'), '.tickr'))
+# here rather than in snapshot.py, so the window can check for it without importing numpy
+SNAPSHOT_FILE = "snapshot.npz"
+
+def data_path(name):
+    """Path of a file in tickr's local data directory, creating the directory on first use"""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    return os.path.join(DATA_DIR, name)
@@ -0,0 +1,53 @@
+import dataclasses
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+
+from .formatting import format_market_cap
+
+def price_series(values):
+    """Price history as one contiguous float64 array instead of a list of boxed floats"""
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+def json_default(value):
+    """json.dumps fallback: numpy scalars (e.g. an int64 volume) aren't serializable by themselves"""
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+@dataclass(slots=True)
+class Quote:
+    symbol: str
+    current: float
+    open: float
+    prev_close: float
+    high: float
+    low: float
+    change: float
+    change_percent: float
+    pe_ratio: Optional[float]
+    market_cap: Optional[float]
+    volume: Optional[int]
+    avg_volume: Optional[int]
+    # only set from a real quote source; none of the current fast paths has one
+    bid: Optional[float]
+    ask: Optional[float]
+    data: np.ndarray
+    time_range: str
+    type: str
+    last_updated: float
+    # set on quotes restored from the on-disk snapshot until a fresh fetch replaces them
+    stale: bool = False
+
+    def replace(self, **changes):
+        return dataclasses.replace(self, **changes)
+
+    def to_dict(self):
+        """JSON-friendly form, with the series as a list and the legacy display fields"""
+        result = {field.name: getattr(self, field.name) for field in dataclasses.fields(self)}
+        result["data"] = self.data.tolist()
+        result["market_cap"] = format_market_cap(self.market_cap)
+        result["last_updated"] = datetime.fromtimestamp(self.last_updated).isoformat()
+        return result
@@ -0,0 +1,133 @@
+import asyncio
+import heapq
+import itertools
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Condition, Lock, Thread
+
+from .metrics import METRICS
+
+# (requests per second, burst) per upstream provider
+PROVIDER_LIMITS = {
+    'coingecko': (30 / 60, 5),       # public API: ~30 calls/min
+    'coinmarketcap': (30 / 60, 5),   # basic plan: 30 calls/min
+    'yahoo': (1.0, 10),              # unofficial API, throttles sustained bursts
+}
+
+class RateLimited(Exception):
+    pass
+
+class TokenBucket:
+    """Token bucket that hands out future slots instead of sleeping under its lock.
+
+    Tokens may go negative: each reservation claims the next free slot and is told
+    how long to wait for it, so concurrent callers are spaced at the bucket's rate
+    without serializing on each other.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = Lock()
+
+    def reserve(self, max_wait=None, cost=1):
+        """Claim `cost` tokens; returns the delay before they may be used, or None if that exceeds max_wait.
+
+        A cost above the burst waits for a full bucket and leaves the rest as debt,
+        which pushes later reservations back by cost / rate.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            delay = max(0.0, (min(cost, self.capacity) - self.tokens) / self.rate)
+            if max_wait is not None and delay > max_wait:
+                return None
+            self.tokens -= cost
+            return delay
+
+class Scheduler:
+    """Runs callables at a given monotonic time on a worker pool, without parking the caller"""
+
+    def __init__(self, max_workers=8):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tickr-ratelimit")
+        self.queue = []
+        self.counter = itertools.count()
+        self.condition = Condition()
+        self.thread = None
+
+    def schedule(self, when, fn, *args, **kwargs):
+        future = Future()
+        with self.condition:
+            heapq.heappush(self.queue, (when, next(self.counter), future, fn, args, kwargs))
+            if self.thread is None:
+                self.thread = Thread(target=self.dispatch, name="tickr-scheduler", daemon=True)
+                self.thread.start()
+            self.condition.notify()
+        return future
+
+    def dispatch(self):
+        while True:
+            with self.condition:
+                while not self.queue or self.queue[0][0] > time.monotonic():
+                    timeout = self.queue[0][0] - time.monotonic() if self.queue else None
+                    self.condition.wait(timeout)
+                _, _, future, fn, args, kwargs = heapq.heappop(self.queue)
+            if future.set_running_or_notify_cancel():
+                try:
+                    self.executor.submit(self.run, future, fn, args, kwargs)
+                except RuntimeError as e:
+                    # the pool is shut down at interpreter exit; fail the call instead of losing it
+                    future.set_exception(e)
+
+    @staticmethod
+    def run(future, fn, args, kwargs):
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+
+class RateLimiter:
+    """Per-provider token buckets for asyncio and as a request scheduler.
+
+    submit() queues the call on the scheduler and hands back a Future instead of
+    sleeping until the slot. A caller that needs the result still waits on that
+    Future, so synchronous paths pass a max_wait to fail fast once the budget is
+    spent, and queue independent requests before waiting on any of them.
+    """
+
+    def __init__(self, limits=PROVIDER_LIMITS, max_workers=16):
+        self.buckets = {provider: TokenBucket(rate, burst) for provider, (rate, burst) in limits.items()}
+        self.scheduler = Scheduler(max_workers)
+
+    def bucket(self, provider):
+        return self.buckets[provider]
+
+    def reserve(self, provider, max_wait=None, cost=1):
+        delay = self.bucket(provider).reserve(max_wait, cost)
+        if delay is None:
+            raise RateLimited(f"{provider} request budget exhausted")
+        METRICS.observe("tickr_ratelimit_wait_seconds", delay, {"provider": provider})
+        return delay
+
+    async def acquire_async(self, provider, max_wait=None):
+        delay = self.reserve(provider, max_wait)
+        if delay:
+            await asyncio.sleep(delay)
+
+    def submit(self, provider, fn, *args, max_wait=None, cost=1, **kwargs):
+        """Queue fn to run in the provider's next free slot; returns a concurrent.futures.Future.
+
+        `cost` is the number of upstream requests fn makes. Raises RateLimited right
+        away when the slot is more than max_wait seconds out.
+        """
+        delay = self.reserve(provider, max_wait, cost)
+        return self.scheduler.schedule(time.monotonic() + delay, fn, *args, **kwargs)
+
+    def later(self, delay, fn, *args, **kwargs):
+        """Run fn after delay seconds on the scheduler's pool; used for retry backoff"""
+        return self.scheduler.schedule(time.monotonic() + delay, fn, *args, **kwargs)
+
+RATE_LIMITER = RateLimiter()
@@ -0,0 +1,118 @@
+import random
+import time
+from threading import Lock
+
+FAST_INTERVAL = 10.0
+# hidden views refresh this slowly; None stops refreshing them altogether
+SLOW_INTERVAL = 120.0
+JITTER = 0.2
+MAX_BACKOFF = 600.0
+
+class RefreshScheduler:
+    """Decides which subscribed symbols are due for a refresh.
+
+    Each view (a tab, the watchlist, a server client) subscribes to (symbol, is_crypto,
+    time_range) entries. Visible views run at the fast cadence and hidden ones at the
+    slow one, every reschedule is jittered so refreshes spread out instead of bursting,
+    and symbols that keep failing back off exponentially. The scheduler never fetches
+    anything itself; callers poll `due()` from whatever timer they run on.
+    """
+
+    def __init__(self, fast_interval=FAST_INTERVAL, slow_interval=SLOW_INTERVAL,
+                 jitter=JITTER, max_backoff=MAX_BACKOFF):
+        self.fast_interval = fast_interval
+        self.slow_interval = slow_interval
+        self.jitter = jitter
+        self.max_backoff = max_backoff
+        self.views = {}
+        self.visible = {}
+        self.failures = {}
+        self.lock = Lock()
+
+    def interval(self, view):
+        return self.fast_interval if self.visible.get(view, True) else self.slow_interval
+
+    def next_delay(self, view, symbol, is_crypto):
+        base = self.interval(view)
+        if base is None:
+            return None
+        failures = self.failures.get((symbol, is_crypto), 0)
+        if failures:
+            base = min(self.max_backoff, base * 2 ** failures)
+        return base * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def schedule(self, view, entry, now):
+        delay = self.next_delay(view, entry[0], entry[1])
+        return None if delay is None else now + delay
+
+    def set_symbols(self, view, entries):
+        """Replace a view's subscriptions with (symbol, is_crypto, time_range) entries"""
+        now = time.monotonic()
+        with self.lock:
+            current = self.views.get(view, {})
+            self.views[view] = {
+                entry: current[entry] if entry in current else self.schedule(view, entry, now)
+                for entry in entries
+            }
+
+    def subscribe(self, view, symbol, is_crypto=False, time_range="1d"):
+        now = time.monotonic()
+        entry = (symbol, is_crypto, time_range)
+        with self.lock:
+            entries = self.views.setdefault(view, {})
+            if entry not in entries:
+                entries[entry] = self.schedule(view, entry, now)
+
+    def unsubscribe(self, view, symbol=None):
+        with self.lock:
+            if symbol is None:
+                self.views.pop(view, None)
+                self.visible.pop(view, None)
+                return
+            entries = self.views.get(view, {})
+            for entry in [entry for entry in entries if entry[0] == symbol]:
+                del entries[entry]
+
+    def set_visible(self, view, visible):
+        now = time.monotonic()
+        with self.lock:
+            if self.visible.get(view, True) == visible:
+                return
+            self.visible[view] = visible
+            entries = self.views.get(view, {})
+            for entry, due in entries.items():
+                if visible:
+                    # data that went stale while hidden is refreshed soon, spread over a few seconds
+                    spread = self.fast_interval * self.jitter
+                    entries[entry] = min(due if due is not None else now + spread,
+                                         now + random.uniform(0, spread))
+                else:
+                    entries[entry] = self.schedule(view, entry, now)
+
+    def due(self, now=None):
+        """Entries whose refresh time has passed, as (view, symbol, is_crypto, time_range); they are rescheduled"""
+        now = time.monotonic() if now is None else now
+        ready = []
+        with self.lock:
+            for view, entries in self.views.items():
+                for entry, due in entries.items():
+                    if due is not None and due <= now:
+                        ready.append((view,) + entry)
+                        entries[entry] = self.schedule(view, entry, now)
+        return ready
+
+    def report_success(self, symbol, is_crypto=False):
+        with self.lock:
+            self.failures.pop((symbol, is_crypto), None)
+
+    def report_error(self, symbol, is_crypto=False):
+        """Count a failure and push this symbol's next refresh out by the backoff"""
+        now = time.monotonic()
+        with self.lock:
+            key = (symbol, is_crypto)
+            self.failures[key] = self.failures.get(key, 0) + 1
+            for view, entries in self.views.items():
+                for entry, due in entries.items():
+                    if entry[:2] == key:
+                        backoff = self.schedule(view, entry, now)
+                        entries[entry] = None if backoff is None else max(due or 0, backoff)
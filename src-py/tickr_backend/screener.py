@@ -0,0 +1,315 @@
+import argparse
+import ast
+import sys
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache, reduce
+from threading import Lock
+
+import numpy as np
+
+FIELDS = ("current", "change_percent", "high", "low", "volume", "avg_volume", "market_cap", "pe_ratio")
+# derived columns are only computed when an expression asks for them
+DERIVED = {
+    "pct_from_high": lambda env: (env["current"] - env["high"]) / env["high"] * 100,
+    "pct_from_low": lambda env: (env["current"] - env["low"]) / env["low"] * 100,
+    "rel_volume": lambda env: env["volume"] / env["avg_volume"],
+}
+ALIASES = {"price": "current"}
+FUNCTIONS = {"abs": np.abs, "min": np.minimum, "max": np.maximum, "log": np.log}
+AVG_VOLUME_BARS = 63  # ~3 months of sessions, what Yahoo's averageVolume covers
+INITIAL_CAPACITY = 1024
+
+ALLOWED_NODES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub, ast.UAdd,
+    ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Mod, ast.Pow,
+    ast.Compare, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.Eq, ast.NotEq,
+    ast.Name, ast.Load, ast.Constant, ast.Call
+)
+
+class ExpressionError(ValueError):
+    pass
+
+def variables():
+    return sorted(set(FIELDS) | set(DERIVED) | set(ALIASES) | {"crypto"})
+
+class Vectorize(ast.NodeTransformer):
+    """Rewrite `and`/`or`/`not` and chained comparisons into element-wise numpy calls"""
+
+    def visit_BoolOp(self, node):
+        self.generic_visit(node)
+        name = "_and" if isinstance(node.op, ast.And) else "_or"
+        return ast.Call(func=ast.Name(id=name, ctx=ast.Load()), args=node.values, keywords=[])
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Not):
+            return ast.Call(func=ast.Name(id="_not", ctx=ast.Load()), args=[node.operand], keywords=[])
+        return node
+
+    def visit_Compare(self, node):
+        self.generic_visit(node)
+        if len(node.ops) == 1:
+            return node
+        operands = [node.left] + node.comparators
+        pairs = [ast.Compare(left=left, ops=[op], comparators=[right])
+                 for left, op, right in zip(operands, node.ops, operands[1:])]
+        return ast.Call(func=ast.Name(id="_and", ctx=ast.Load()), args=pairs, keywords=[])
+
+    def visit_Constant(self, node):
+        # floats only: `9 ** 9 ** 9` on Python ints would never finish
+        return ast.copy_location(ast.Constant(value=float(node.value)), node)
+
+@lru_cache(maxsize=128)
+def compile_expression(text):
+    """Validate a filter/sort expression against a whitelist and compile it for array evaluation"""
+    try:
+        tree = ast.parse(text.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ExpressionError(f"Invalid expression: {e.msg}")
+    known = set(variables())
+    for node in ast.walk(tree):
+        if not isinstance(node, ALLOWED_NODES):
+            raise ExpressionError(f"'{type(node).__name__}' is not allowed in screen expressions")
+        if isinstance(node, ast.Constant) and (isinstance(node.value, bool) or not isinstance(node.value, (int, float))):
+            raise ExpressionError(f"Only numbers are allowed, not {node.value!r}")
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS or node.keywords:
+                raise ExpressionError(f"Allowed functions: {', '.join(FUNCTIONS)}")
+        elif isinstance(node, ast.Name) and node.id not in known and node.id not in FUNCTIONS:
+            raise ExpressionError(f"Unknown name '{node.id}'; available: {', '.join(variables())}")
+    tree = ast.fix_missing_locations(Vectorize().visit(tree))
+    return compile(tree, "<screen>", "eval")
+
+GLOBALS = {
+    "__builtins__": {},
+    "_and": lambda *values: reduce(np.logical_and, values),
+    "_or": lambda *values: reduce(np.logical_or, values),
+    "_not": np.logical_not,
+    **FUNCTIONS
+}
+
+class Columns(dict):
+    """Evaluation namespace: stored columns up front, derived ones computed on first use"""
+
+    def __missing__(self, name):
+        if name in ALIASES:
+            value = self[ALIASES[name]]
+        elif name in DERIVED:
+            value = DERIVED[name](self)
+        else:
+            raise KeyError(name)
+        self[name] = value
+        return value
+
+class Screener:
+    """Quote fields for the whole cached universe as columnar float64 arrays.
+
+    One row per (symbol, type); quotes overwrite their row in place as they arrive
+    and missing values are NaN, so a comparison against them is simply False.
+    Filters and sort keys are evaluated over all rows at once and the top N is
+    picked with argpartition instead of a full sort.
+    """
+
+    def __init__(self, capacity=INITIAL_CAPACITY):
+        self.lock = Lock()
+        self.rows = {}
+        self.keys = []
+        self.size = 0
+        self.columns = {field: np.full(capacity, np.nan) for field in FIELDS}
+        self.crypto = np.zeros(capacity)
+
+    def __len__(self):
+        return self.size
+
+    def row_for(self, symbol, kind):
+        """Row index of a key, appending (and growing the arrays) on first sight; lock held"""
+        key = (symbol, kind)
+        row = self.rows.get(key)
+        if row is not None:
+            return row
+        if self.size == len(self.crypto):
+            capacity = 2 * self.size
+            for field, values in self.columns.items():
+                grown = np.full(capacity, np.nan)
+                grown[:self.size] = values
+                self.columns[field] = grown
+            self.crypto = np.concatenate([self.crypto, np.zeros(capacity - self.size)])
+        row = self.rows[key] = self.size
+        self.keys.append(key)
+        self.crypto[row] = 1.0 if kind == "crypto" else 0.0
+        self.size += 1
+        return row
+
+    def update(self, quote):
+        """Overwrite a symbol's row from a Quote"""
+        with self.lock:
+            row = self.row_for(quote.symbol, quote.type)
+            for field in FIELDS:
+                value = getattr(quote, field)
+                self.columns[field][row] = np.nan if value is None else value
+
+    def update_many(self, symbols, kind="stock", **columns):
+        """Bulk form of update: one array per field, aligned with `symbols`"""
+        with self.lock:
+            rows = np.fromiter((self.row_for(symbol, kind) for symbol in symbols), dtype=np.intp, count=len(symbols))
+            for field, values in columns.items():
+                self.columns[field][rows] = values
+
+    def remove(self, symbol, kind="stock"):
+        """Drop a row by moving the last row into its slot, keeping the arrays dense"""
+        with self.lock:
+            row = self.rows.pop((symbol, kind), None)
+            if row is None:
+                return
+            last = self.size - 1
+            if row != last:
+                moved = self.keys[last]
+                self.keys[row] = moved
+                self.rows[moved] = row
+                for values in self.columns.values():
+                    values[row] = values[last]
+                self.crypto[row] = self.crypto[last]
+            self.keys.pop()
+            for values in self.columns.values():
+                values[last] = np.nan
+            self.size = last
+
+    def screen(self, where=None, order_by=None, limit=None, ascending=False):
+        """Rows matching `where`, ordered by `order_by` (descending unless ascending) and cut to `limit`.
+
+        Both are expressions over the column names, e.g.
+        screen("pct_from_high > -2 and rel_volume > 1.5", order_by="rel_volume", limit=20)
+        """
+        where_code = compile_expression(where) if where else None
+        order_code = compile_expression(order_by) if order_by else None
+        with self.lock:
+            n = self.size
+            env = Columns({field: values[:n] for field, values in self.columns.items()})
+            env["crypto"] = self.crypto[:n]
+            with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+                try:
+                    rows = np.arange(n)
+                    if where_code is not None:
+                        mask = np.broadcast_to(np.asarray(eval(where_code, GLOBALS, env), dtype=bool), (n,))
+                        rows = np.flatnonzero(mask)
+                    scores = None
+                    if order_code is not None:
+                        keys = np.broadcast_to(np.asarray(eval(order_code, GLOBALS, env), dtype=np.float64), (n,))[rows]
+                        present = ~np.isnan(keys)
+                        rows, keys = rows[present], keys[present]
+                        keys = keys if ascending else -keys
+                        if limit is not None and limit < len(rows):
+                            top = np.argpartition(keys, limit - 1)[:limit]
+                            rows, keys = rows[top], keys[top]
+                        order = np.argsort(keys, kind="stable")
+                        rows, scores = rows[order], keys[order] if ascending else -keys[order]
+                    elif limit is not None:
+                        rows = rows[:limit]
+                except (ArithmeticError, TypeError, ValueError) as e:
+                    raise ExpressionError(f"Could not evaluate expression: {e}")
+                # one tolist() per column instead of a numpy scalar per cell
+                columns = {name: env[name][rows].tolist() for name in FIELDS + tuple(DERIVED)}
+            if scores is not None:
+                columns["score"] = scores.tolist()
+            keys = [self.keys[row] for row in rows.tolist()]
+        names = ["symbol", "type"] + list(columns)
+        return [
+            dict(zip(names, [symbol, kind] + [None if value != value else value for value in values]))
+            for (symbol, kind), values in zip(keys, zip(*columns.values()))
+        ]
+
+SCREENER = Screener()
+
+def bar_columns(frame):
+    """Screener columns from long-format daily bars (symbol, date, high, low, close, volume), one row per symbol"""
+    frame = frame.sort_values(["symbol", "date"])
+    groups = frame.groupby("symbol", sort=True)
+    last = groups.tail(1).set_index("symbol")
+    prev_close = groups["close"].shift(1).groupby(frame["symbol"]).last()
+    current = last["close"]
+    return last.index.tolist(), {
+        "current": current.to_numpy(dtype=np.float64),
+        "change_percent": ((current - prev_close) / prev_close * 100).to_numpy(dtype=np.float64),
+        "high": groups["high"].max().to_numpy(dtype=np.float64),
+        "low": groups["low"].min().to_numpy(dtype=np.float64),
+        "volume": last["volume"].to_numpy(dtype=np.float64),
+        "avg_volume": groups.tail(AVG_VOLUME_BARS).groupby("symbol", sort=True)["volume"].mean().to_numpy(dtype=np.float64),
+    }
+
+def load_history_store(screener, symbols=None, days=365):
+    """Fill the screener from the local history store with one query over the last `days` of bars"""
+    import pandas as pd
+    from .history import get_connection
+    start = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+    query = "SELECT symbol, date, high, low, close, volume FROM bars WHERE date > ?"
+    params = [start]
+    if symbols:
+        query += f" AND symbol IN ({','.join('?' * len(symbols))})"
+        params += list(symbols)
+    frame = pd.DataFrame(get_connection().execute(query, params).fetchall(),
+                         columns=["symbol", "date", "high", "low", "close", "volume"])
+    if frame.empty:
+        return 0
+    names, columns = bar_columns(frame)
+    screener.update_many(names, **columns)
+    return len(names)
+
+def load_backfill(screener, directory, days=365):
+    """Fill the screener from a tickr_backend.backfill output directory"""
+    import pandas as pd
+    from .backfill import read_backfill
+    frames = []
+    for symbol, bars in read_backfill(directory).items():
+        bars = bars[bars.index > bars.index.max() - pd.Timedelta(days=days)]
+        frames.append(pd.DataFrame({"symbol": symbol, "date": bars.index, "high": bars["High"].to_numpy(),
+                                    "low": bars["Low"].to_numpy(), "close": bars["Close"].to_numpy(),
+                                    "volume": bars["Volume"].to_numpy()}))
+    if not frames:
+        return 0
+    names, columns = bar_columns(pd.concat(frames, ignore_index=True))
+    screener.update_many(names, **columns)
+    return len(names)
+
+def format_result(row, columns):
+    cells = [f"{row['symbol']:<8}"]
+    for name in columns:
+        value = row.get(name)
+        cells.append(f"{'--':>12}" if value is None else f"{value:>12,.2f}")
+    return "  ".join(cells)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="tickr-screen", description="Screen stored daily history with a filter expression",
+                                     epilog=f"names: {', '.join(variables())}; functions: {', '.join(FUNCTIONS)}")
+    parser.add_argument('where', nargs='?', help='filter, e.g. "pct_from_high > -2 and rel_volume > 1.5"')
+    parser.add_argument('--sort', help="sort expression, largest first (see --ascending)")
+    parser.add_argument('--ascending', action='store_true')
+    parser.add_argument('--limit', type=int, default=25)
+    parser.add_argument('--symbols', nargs='+', help="only these symbols from the history store")
+    parser.add_argument('--backfill', metavar='DIR', help="read a backfill directory instead of the history store")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    if args.backfill:
+        loaded = load_backfill(SCREENER, args.backfill)
+    else:
+        loaded = load_history_store(SCREENER, [symbol.upper() for symbol in args.symbols or []])
+    load_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    try:
+        results = SCREENER.screen(args.where, args.sort, args.limit, args.ascending)
+    except ExpressionError as e:
+        print(e)
+        return 2
+    screen_ms = (time.perf_counter() - started) * 1000
+
+    columns = ["current", "change_percent", "pct_from_high", "pct_from_low", "rel_volume"]
+    print("  ".join([f"{'symbol':<8}"] + [f"{name:>12}" for name in columns]))
+    for row in results:
+        print(format_result(row, columns))
+    print(f"{len(results)} of {loaded} symbols (load {load_ms:.0f} ms, screen {screen_ms:.2f} ms)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from aiohttp import web, WSMsgType
+
+from .data import RANGE_DAYS, get_stock_data, get_crypto_data
+from .extremes import CRYPTO, EXCHANGE, EXTREMES
+from .metrics import METRICS
+from .quote import json_default
+from .scheduler import RefreshScheduler
+
+SERVER_HOST = os.getenv('TICKR_SERVER_HOST', '127.0.0.1')
+SERVER_PORT = int(os.getenv('TICKR_SERVER_PORT', '8765'))
+POLL_INTERVAL = 0.5
+# every client shares one scheduler view: a key is refreshed once no matter how many watch it
+SERVER_VIEW = "server"
+KINDS = {"stock": False, "crypto": True}
+CALENDARS = {"stock": EXCHANGE, "crypto": CRYPTO}
+
+def fetch_quote(symbol, is_crypto, time_range, force_refresh):
+    if is_crypto:
+        return get_crypto_data(symbol, force_refresh, time_range)
+    return get_stock_data(symbol, force_refresh, time_range)
+
+def finite(value):
+    return value if not isinstance(value, float) or math.isfinite(value) else None
+
+def payload(quote):
+    """Quote.to_dict() with NaN/inf as null, since JSON clients can't parse them"""
+    result = {name: finite(value) for name, value in quote.to_dict().items()}
+    result["data"] = [finite(value) for value in result["data"]]
+    return result
+
+def parse_key(kind, symbol, time_range=None):
+    """(symbol, is_crypto, time_range) for a request; raises ValueError saying what is wrong with it"""
+    if not isinstance(kind, str) or kind not in KINDS:
+        raise ValueError("kind must be stock or crypto")
+    if not symbol or not symbol.strip():
+        raise ValueError("symbol must not be empty")
+    time_range = "1d" if time_range is None else time_range
+    # the fetch would quietly serve 1y for an unknown range, cached under the wrong key
+    if not isinstance(time_range, str) or time_range not in RANGE_DAYS:
+        raise ValueError(f"range must be one of {', '.join(RANGE_DAYS)}")
+    return (symbol.strip().upper(), KINDS[kind], time_range)
+
+class QuoteServer:
+    """Headless HTTP + WebSocket front end for the data.py pipeline.
+
+    GET /quote/{stock|crypto}/{symbol}?range=1d returns one quote, GET /breadth?kind=stock
+    the 52-week highs/lows of the latest session and the daily breadth series. Clients on /ws send
+    {"action": "subscribe"|"unsubscribe", "kind": ..., "symbols": [...], "range": ...}
+    and receive {"type": "quote", ..., "fields": {...}} messages: the full quote first,
+    then only the fields that changed. Each key is fetched once per refresh on a
+    worker thread and the serialized result is fanned out to every subscriber.
+    """
+
+    def __init__(self, scheduler=None, fetch=fetch_quote, workers=8, poll_interval=POLL_INTERVAL):
+        self.scheduler = scheduler or RefreshScheduler()
+        self.fetch = fetch
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tickr-server")
+        self.poll_interval = poll_interval
+        self.subscribers = {}
+        self.latest = {}
+        self.inflight = {}
+        self.tasks = set()
+        self.upstream_fetches = 0
+        self.poller = None
+
+    def make_app(self):
+        app = web.Application()
+        app.router.add_get('/quote/{kind}/{symbol}', self.handle_quote)
+        app.router.add_get('/breadth', self.handle_breadth)
+        app.router.add_get('/ws', self.handle_ws)
+        app.router.add_get('/metrics', self.handle_metrics)
+        app.router.add_get('/metrics.json', self.handle_metrics_json)
+        app.on_startup.append(self.start_polling)
+        app.on_cleanup.append(self.stop_polling)
+        return app
+
+    async def start_polling(self, app):
+        self.poller = asyncio.create_task(self.poll())
+
+    async def stop_polling(self, app):
+        if self.poller is not None:
+            self.poller.cancel()
+        self.executor.shutdown(wait=False)
+
+    def spawn(self, coroutine):
+        task = asyncio.ensure_future(coroutine)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+
+    async def poll(self):
+        while True:
+            for view, symbol, is_crypto, time_range in self.scheduler.due():
+                self.spawn(self.refresh((symbol, is_crypto, time_range)))
+            await asyncio.sleep(self.poll_interval)
+
+    async def refresh(self, key, force_refresh=True):
+        """Latest payload for `key`; concurrent callers share a single upstream fetch"""
+        future = self.inflight.get(key)
+        if future is None:
+            future = self.inflight[key] = self.spawn(self.fetch_and_publish(key, force_refresh))
+            future.add_done_callback(lambda _: self.inflight.pop(key, None))
+        return await asyncio.shield(future)
+
+    async def fetch_and_publish(self, key, force_refresh):
+        symbol, is_crypto, time_range = key
+        loop = asyncio.get_running_loop()
+        self.upstream_fetches += 1
+        try:
+            quote = await loop.run_in_executor(self.executor, self.fetch, symbol, is_crypto, time_range, force_refresh)
+        except Exception as e:
+            print(f"Server fetch failed for {symbol}: {e}")
+            quote = None
+        if not quote:
+            self.scheduler.report_error(symbol, is_crypto)
+            return None
+        self.scheduler.report_success(symbol, is_crypto)
+
+        current = payload(quote)
+        previous = self.latest.get(key)
+        self.latest[key] = current
+        if previous is None:
+            await self.publish(key, current, full=True)
+        else:
+            changes = {name: value for name, value in current.items() if previous.get(name) != value}
+            # a new timestamp on its own is not worth a message
+            if set(changes) - {"last_updated"}:
+                await self.publish(key, changes, full=False)
+        return current
+
+    def message(self, key, fields, full):
+        symbol, is_crypto, time_range = key
+        return json.dumps({
+            "type": "quote",
+            "kind": "crypto" if is_crypto else "stock",
+            "symbol": symbol,
+            "range": time_range,
+            "full": full,
+            "fields": fields
+        }, default=json_default)
+
+    async def publish(self, key, fields, full):
+        subscribers = self.subscribers.get(key)
+        if not subscribers:
+            return
+        # serialized once, however many clients receive it
+        message = self.message(key, fields, full)
+        await asyncio.gather(*(ws.send_str(message) for ws in list(subscribers)), return_exceptions=True)
+
+    def update_schedule(self):
+        self.scheduler.set_symbols(SERVER_VIEW, list(self.subscribers))
+
+    async def subscribe(self, ws, key):
+        subscribers = self.subscribers.setdefault(key, set())
+        first = not subscribers
+        subscribers.add(ws)
+        if first:
+            self.update_schedule()
+        if key in self.latest:
+            await ws.send_str(self.message(key, self.latest[key], full=True))
+        if first or key not in self.latest:
+            self.spawn(self.refresh(key, force_refresh=False))
+
+    def unsubscribe(self, ws, key):
+        subscribers = self.subscribers.get(key)
+        if subscribers is None:
+            return
+        subscribers.discard(ws)
+        if not subscribers:
+            del self.subscribers[key]
+            self.update_schedule()
+
+    async def handle_quote(self, request):
+        try:
+            key = parse_key(request.match_info['kind'], request.match_info['symbol'], request.query.get('range'))
+        except ValueError as e:
+            return web.json_response({"error": str(e)}, status=400)
+        current = await self.refresh(key, force_refresh=False)
+        if current is None:
+            return web.json_response({"error": f"No data found for {key[0]}"}, status=404)
+        return web.json_response(current, dumps=lambda value: json.dumps(value, default=json_default))
+
+    async def handle_breadth(self, request):
+        kind = request.query.get('kind', 'stock')
+        if kind not in CALENDARS:
+            return web.json_response({"error": "kind must be stock or crypto"}, status=400)
+        calendar = CALENDARS[kind]
+        day = EXTREMES.session_day(calendar)
+        return web.json_response({
+            "kind": kind,
+            "session": day.isoformat() if day else None,
+            "new_highs": EXTREMES.highs_on(day, calendar) if day else [],
+            "new_lows": EXTREMES.lows_on(day, calendar) if day else [],
+            "breadth": [{"date": when.isoformat(), "highs": highs, "lows": lows, "net": net}
+                        for when, highs, lows, net in EXTREMES.breadth(calendar)]
+        })
+
+    async def handle_metrics(self, request):
+        return web.Response(body=METRICS.to_prometheus().encode(),
+                            headers={'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'})
+
+    async def handle_metrics_json(self, request):
+        return web.Response(text=METRICS.to_json(), content_type='application/json')
+
+    async def handle_ws(self, request):
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+        keys = set()
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                try:
+                    message = json.loads(msg.data)
+                    action = message.get("action")
+                    symbols = message.get("symbols", [])
+                except (ValueError, AttributeError):
+                    await ws.send_json({"type": "error", "message": "Malformed message"})
+                    continue
+                if action not in ("subscribe", "unsubscribe"):
+                    await ws.send_json({"type": "error", "message": "Expected a subscribe or unsubscribe action"})
+                    continue
+                # a bare string would otherwise be subscribed one character at a time
+                if not isinstance(symbols, list) or not all(isinstance(symbol, str) for symbol in symbols):
+                    await ws.send_json({"type": "error", "message": "symbols must be a list of strings"})
+                    continue
+                try:
+                    requested = [parse_key(message.get("kind", "stock"), symbol, message.get("range"))
+                                 for symbol in symbols]
+                except ValueError as e:
+                    await ws.send_json({"type": "error", "message": str(e)})
+                    continue
+                for key in requested:
+                    if action == "subscribe":
+                        keys.add(key)
+                        await self.subscribe(ws, key)
+                    else:
+                        keys.discard(key)
+                        self.unsubscribe(ws, key)
+        finally:
+            for key in keys:
+                self.unsubscribe(ws, key)
+        return ws
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="tickr-server", description="Serve tickr quotes over HTTP and WebSocket")
+    parser.add_argument('--host', default=SERVER_HOST)
+    parser.add_argument('--port', type=int, default=SERVER_PORT)
+    args = parser.parse_args(argv)
+    web.run_app(QuoteServer().make_app(), host=args.host, port=args.port)
+
+if __name__ == "__main__":
+    main()
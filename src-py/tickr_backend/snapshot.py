@@ -0,0 +1,109 @@
+import dataclasses
+import io
+import json
+import os
+import time
+import zipfile
+from threading import Lock
+
+import numpy as np
+
+from .paths import SNAPSHOT_FILE, data_path
+from .quote import Quote, json_default
+
+SNAPSHOT_VERSION = 1
+
+# one writer at a time, they share the temp file
+WRITE_LOCK = Lock()
+
+def build_snapshot(cache, views, current_tab=0):
+    """(meta, arrays) for every cached Quote plus the UI state; no serialization or I/O yet.
+
+    Cheap enough for the GUI thread: it only collects the scalar fields and references
+    to the series, which are never modified in place.
+    """
+    quotes = []
+    arrays = {}
+    for key, value, stored_at, ttl in cache.items():
+        if not isinstance(value, Quote):
+            continue
+        fields = {field.name: getattr(value, field.name) for field in dataclasses.fields(value)
+                  if field.name not in ('data', 'stale')}
+        arrays[f"q{len(quotes)}"] = value.data
+        quotes.append({"key": key, "stored_at": stored_at, "ttl": ttl, "fields": fields})
+
+    meta = {
+        "version": SNAPSHOT_VERSION,
+        "saved_at": time.time(),
+        "current_tab": current_tab,
+        "views": views,
+        "quotes": quotes
+    }
+    return meta, arrays
+
+def write_snapshot(payload, path=None):
+    """Write a build_snapshot payload to one .npz, atomically.
+
+    Scalar fields and view state go into a JSON `meta` member; each series is its
+    own float64 member so a reader only inflates the ones it actually shows.
+    """
+    meta, arrays = payload
+    path = path or data_path(SNAPSHOT_FILE)
+    temp_path = path + ".tmp"
+    with WRITE_LOCK:
+        with open(temp_path, 'wb') as f:
+            np.savez(f, meta=np.array(json.dumps(meta, default=json_default)), **arrays)
+        os.replace(temp_path, path)
+
+def save_snapshot(cache, views, current_tab=0, path=None):
+    """build_snapshot and write_snapshot in one go, on the calling thread"""
+    write_snapshot(build_snapshot(cache, views, current_tab), path)
+
+class Snapshot:
+    """A loaded snapshot; the metadata is parsed up front, series are read on demand.
+
+    The file is read into memory once and closed, so the next save can replace it
+    even on Windows; npz members are only decoded when asked for.
+    """
+
+    def __init__(self, meta, archive):
+        self.meta = meta
+        self.archive = archive
+        self.lock = Lock()
+        self.views = meta.get("views", {})
+        self.current_tab = meta.get("current_tab", 0)
+        self.index = {}
+        for index, entry in enumerate(meta["quotes"]):
+            fields = entry["fields"]
+            self.index[(fields["symbol"].upper(), fields["time_range"], fields["type"])] = index
+
+    def quote(self, index):
+        entry = self.meta["quotes"][index]
+        with self.lock:
+            series = self.archive[f"q{index}"]
+        return Quote(**entry["fields"], data=series, stale=True)
+
+    def find(self, symbol, time_range, kind):
+        """Stale Quote for a symbol/range/type, or None"""
+        index = self.index.get((symbol.upper(), time_range, kind))
+        return None if index is None else self.quote(index)
+
+    def seed(self, cache):
+        """Put the snapshot's quotes back in `cache` with their original ages, so they read as stale"""
+        for index, entry in enumerate(self.meta["quotes"]):
+            cache.restore(entry["key"], self.quote(index), entry["stored_at"], entry["ttl"])
+
+def load_snapshot(path=None):
+    path = path or data_path(SNAPSHOT_FILE)
+    try:
+        with open(path, 'rb') as f:
+            archive = np.load(io.BytesIO(f.read()))
+        meta = json.loads(archive["meta"].item())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile) as e:
+        print(f"Ignoring unreadable snapshot {path}: {e}")
+        return None
+    if meta.get("version") != SNAPSHOT_VERSION:
+        return None
+    return Snapshot(meta, archive)
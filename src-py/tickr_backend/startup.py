@@ -0,0 +1,76 @@
+import builtins
+import sys
+import threading
+import time
+
+class StartupProfiler:
+    """Records module import times and named startup phases for --profile-startup.
+
+    Imports are timed by wrapping builtins.__import__, so only modules imported after
+    install() show up; times are inclusive of everything a module pulls in. The
+    nesting depth is kept per thread, the Preloader imports on the worker pool
+    while the main thread builds the window.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.marks = []
+        self.imports = {}
+        self.local = threading.local()
+        self.original_import = None
+
+    def install(self):
+        self.original_import = builtins.__import__
+        builtins.__import__ = self.timed_import
+
+    def uninstall(self):
+        if self.original_import is not None:
+            builtins.__import__ = self.original_import
+            self.original_import = None
+
+    def timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level and globals:
+            package = globals.get('__package__') or ''
+            full_name = f"{package}.{name}" if name else package
+        else:
+            full_name = name
+        if full_name in sys.modules:
+            return self.original_import(name, globals, locals, fromlist, level)
+        began = time.perf_counter()
+        depth = getattr(self.local, 'depth', 0)
+        self.local.depth = depth + 1
+        try:
+            return self.original_import(name, globals, locals, fromlist, level)
+        finally:
+            self.local.depth = depth
+            self.imports.setdefault(full_name, (time.perf_counter() - began, depth))
+
+    def mark(self, phase):
+        self.marks.append((phase, time.perf_counter() - self.started))
+
+    def report(self, top=15, file=None):
+        file = file or sys.stdout
+        print("Startup phases (ms since launch):", file=file)
+        previous = 0.0
+        for phase, elapsed in self.marks:
+            print(f"  {phase:<32} {elapsed * 1000:9.1f}  (+{(elapsed - previous) * 1000:.1f})", file=file)
+            previous = elapsed
+        print(f"Slowest imports (inclusive ms, top {top}):", file=file)
+        slowest = sorted(self.imports.items(), key=lambda item: item[1][0], reverse=True)[:top]
+        for name, (elapsed, depth) in slowest:
+            print(f"  {elapsed * 1000:9.1f}  {'  ' * depth}{name}", file=file)
+
+def on_first_paint(widget, callback):
+    """Call `callback` once, right after `widget` has handled its first paint event"""
+    from PySide6.QtCore import QObject, QEvent, QTimer
+
+    class PaintWatcher(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Paint:
+                widget.removeEventFilter(self)
+                QTimer.singleShot(0, callback)
+            return False
+
+    watcher = PaintWatcher(widget)
+    widget.installEventFilter(watcher)
+    return watcher
@@ -0,0 +1,188 @@
+import json
+import os
+import time
+from bisect import bisect_left
+from dataclasses import dataclass
+from threading import Lock
+
+from .paths import data_path
+
+SYMBOLS_FILE = "symbols.json"
+SYMBOLS_MAX_AGE = 7 * 24 * 3600
+# Nasdaq Trader's symbol directory: every Nasdaq listing, and everything else traded in the US
+NASDAQ_LISTED_URL = "https://www.nasdaqtrader.com/dynamic/SymDir/nasdaqlisted.txt"
+OTHER_LISTED_URL = "https://www.nasdaqtrader.com/dynamic/SymDir/otherlisted.txt"
+EXCHANGES = {"Q": "NASDAQ", "N": "NYSE", "A": "NYSE American", "P": "NYSE Arca", "Z": "Cboe BZX", "V": "IEX"}
+# TradingView files NYSE American and NYSE Arca listings (SPY, most ETFs) under AMEX
+TRADINGVIEW_PREFIXES = {"Q": "NASDAQ", "N": "NYSE", "A": "AMEX", "P": "AMEX", "Z": "CBOE"}
+COMPLETION_LIMIT = 12
+
+@dataclass(slots=True)
+class Listing:
+    symbol: str
+    name: str
+    exchange: str
+    type: str
+
+    @property
+    def exchange_name(self):
+        return EXCHANGES.get(self.exchange, self.exchange)
+
+def yahoo_symbol(symbol):
+    """Nasdaq Trader writes class shares as BRK.B and preferreds as ABR$D; Yahoo uses BRK-B and ABR-PD"""
+    return symbol.replace("$", "-P").replace(".", "-")
+
+def parse_directory(text, symbol_column, exchange_column=None):
+    """Listings from one pipe-delimited directory file, skipping test issues and the trailer line"""
+    lines = text.splitlines()
+    header = lines[0].split("|")
+    columns = {name: index for index, name in enumerate(header)}
+    listings = []
+    for line in lines[1:]:
+        # the trailer is padded with empty fields to the header's width
+        if line.startswith("File Creation Time"):
+            continue
+        fields = line.split("|")
+        if len(fields) != len(header) or fields[columns["Test Issue"]] == "Y":
+            continue
+        name = fields[columns["Security Name"]].split(" - ")[0].strip()
+        exchange = fields[columns[exchange_column]] if exchange_column else "Q"
+        kind = "ETF" if fields[columns["ETF"]] == "Y" else "Stock"
+        listings.append(Listing(yahoo_symbol(fields[columns[symbol_column]]), name, exchange, kind))
+    return listings
+
+def name_words(name):
+    return {word.strip(".,()&'").upper() for word in name.split() if len(word) > 1}
+
+def prefix_range(keys, prefix):
+    return bisect_left(keys, prefix), bisect_left(keys, prefix + "\uffff")
+
+class SymbolIndex:
+    """Prefix search over listings by ticker and by words of the company name.
+
+    Both indexes are plain sorted lists searched with bisect: a prefix is the
+    contiguous run between bisect(prefix) and bisect(prefix + U+FFFF), so a lookup
+    is two binary searches plus a slice. It builds in milliseconds and costs two
+    list slots per key, where a trie would need a dict per character node.
+    """
+
+    def __init__(self, listings=()):
+        self.listings = sorted(listings, key=lambda listing: listing.symbol)
+        self.symbols = [listing.symbol for listing in self.listings]
+        words = sorted((word, row) for row, listing in enumerate(self.listings) for word in name_words(listing.name))
+        self.words = [word for word, _ in words]
+        self.word_rows = [row for _, row in words]
+
+    def __len__(self):
+        return len(self.listings)
+
+    def get(self, symbol):
+        index = bisect_left(self.symbols, symbol)
+        if index < len(self.symbols) and self.symbols[index] == symbol:
+            return self.listings[index]
+        return None
+
+    def complete(self, text, limit=COMPLETION_LIMIT):
+        """Ticker prefix matches first, then companies with a name word starting with the text"""
+        prefix = text.strip().upper()
+        if not prefix:
+            return []
+        start, end = prefix_range(self.symbols, prefix)
+        rows = list(range(start, min(end, start + limit)))
+        if len(rows) < limit:
+            start, end = prefix_range(self.words, prefix)
+            seen = set(rows)
+            for row in self.word_rows[start:end]:
+                if row not in seen:
+                    seen.add(row)
+                    rows.append(row)
+                    if len(rows) == limit:
+                        break
+        return [self.listings[row] for row in rows]
+
+class SymbolDirectory:
+    """The symbol master on disk plus its index; refreshed from Nasdaq Trader once a week"""
+
+    def __init__(self, path=None, max_age=SYMBOLS_MAX_AGE):
+        self.path = path
+        self.max_age = max_age
+        self.index = SymbolIndex()
+        self.fetched_at = 0
+        self.lock = Lock()
+
+    def file_path(self):
+        return self.path or data_path(SYMBOLS_FILE)
+
+    def load(self):
+        path = self.file_path()
+        if not os.path.exists(path):
+            return False
+        try:
+            with open(path) as f:
+                state = json.load(f)
+            listings = [Listing(*row) for row in state["listings"]]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Ignoring unreadable symbol master {path}: {e}")
+            return False
+        # built aside and swapped in one assignment, readers never see a half-built index
+        self.index = SymbolIndex(listings)
+        self.fetched_at = state.get("fetched_at", 0)
+        return True
+
+    def save(self, listings):
+        path = self.file_path()
+        temp_path = path + ".tmp"
+        with open(temp_path, 'w') as f:
+            json.dump({
+                "fetched_at": self.fetched_at,
+                "listings": [[listing.symbol, listing.name, listing.exchange, listing.type] for listing in listings]
+            }, f, separators=(",", ":"))
+        os.replace(temp_path, path)
+
+    def download(self):
+        from .transport import get_session
+        session = get_session("www.nasdaqtrader.com")
+        texts = []
+        for url in (NASDAQ_LISTED_URL, OTHER_LISTED_URL):
+            response = session.get(url, timeout=30)
+            response.raise_for_status()
+            texts.append(response.text)
+        return parse_directory(texts[0], "Symbol") + parse_directory(texts[1], "ACT Symbol", "Exchange")
+
+    def refresh(self):
+        listings = self.download()
+        if not listings:
+            raise ValueError("symbol directory came back empty")
+        self.fetched_at = time.time()
+        self.index = SymbolIndex(listings)
+        self.save(listings)
+
+    def is_stale(self):
+        return time.time() - self.fetched_at > self.max_age
+
+    def ensure(self):
+        """Load from disk and refresh when missing or older than max_age; a failed refresh keeps the old index"""
+        with self.lock:
+            if not len(self.index):
+                self.load()
+            if self.is_stale():
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"Error refreshing symbol master: {e}")
+        return self.index
+
+    def lookup(self, symbol):
+        return self.index.get(symbol.upper())
+
+    def complete(self, text, limit=COMPLETION_LIMIT):
+        return self.index.complete(text, limit)
+
+    def tradingview_symbol(self, symbol):
+        """EXCHANGE:SYMBOL from the listing's exchange, None when the symbol isn't in the master"""
+        listing = self.lookup(symbol)
+        if listing is None or listing.exchange not in TRADINGVIEW_PREFIXES:
+            return None
+        return f"{TRADINGVIEW_PREFIXES[listing.exchange]}:{listing.symbol.replace('-', '.')}"
+
+SYMBOLS = SymbolDirectory()
@@ -0,0 +1,223 @@
+import random
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, InvalidStateError
+from threading import Lock
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .ratelimit import RATE_LIMITER, RateLimited
+from .metrics import METRICS
+
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+POOL_MAXSIZE = 16
+VALIDATOR_ENTRIES = 256
+# validators keep the whole payload, so their memory is bounded by body size as well as by count;
+# large documents (the coin lists) are fetched rarely and not worth holding on to
+VALIDATOR_MAX_BODY = 256 * 1024
+VALIDATOR_MAX_BYTES = 8 * 1024 * 1024
+
+DEFAULT_HEADERS = {
+    'Accept': 'application/json',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+    'User-Agent': 'tickr',
+}
+
+SESSIONS = {}
+SESSIONS_LOCK = Lock()
+
+# (url, params) -> (etag, last_modified, payload, size) for conditional re-requests
+VALIDATORS = OrderedDict()
+VALIDATORS_LOCK = Lock()
+validator_bytes = 0
+
+def get_session(host):
+    """Shared keep-alive session per host; urllib3's connection pool is thread-safe"""
+    with SESSIONS_LOCK:
+        session = SESSIONS.get(host)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE, max_retries=0)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update(DEFAULT_HEADERS)
+            SESSIONS[host] = session
+        return session
+
+def backoff_delay(attempt, retry_after=None):
+    """Full-jitter exponential backoff, or the server's Retry-After when it sends one"""
+    if retry_after:
+        try:
+            return min(BACKOFF_MAX, float(retry_after))
+        except ValueError:
+            pass
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+def get_validator(key):
+    with VALIDATORS_LOCK:
+        return VALIDATORS.get(key)
+
+def set_validator(key, etag, last_modified, payload, size):
+    """Remember a response for conditional re-requests; `size` is its body length in bytes"""
+    global validator_bytes
+    with VALIDATORS_LOCK:
+        previous = VALIDATORS.pop(key, None)
+        if previous is not None:
+            validator_bytes -= previous[3]
+        if size > VALIDATOR_MAX_BODY:
+            return
+        VALIDATORS[key] = (etag, last_modified, payload, size)
+        validator_bytes += size
+        while len(VALIDATORS) > VALIDATOR_ENTRIES or validator_bytes > VALIDATOR_MAX_BYTES:
+            validator_bytes -= VALIDATORS.popitem(last=False)[1][3]
+
+def settle(future, result=None, error=None):
+    """Complete a Future unless its caller cancelled it meanwhile"""
+    try:
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    except InvalidStateError:
+        pass
+
+def submit_attempts(provider, attempt_fn, max_wait=None, cost=1):
+    """Future for a retried call without a thread waiting on it.
+
+    `attempt_fn(attempt)` returns (True, result), or (False, delay) to be retried
+    after delay seconds. Each attempt is queued for the provider's next rate-limit
+    slot, charged `cost` tokens, and backoffs are rescheduled on RATE_LIMITER's scheduler. Cancelling the
+    Future stops the attempts that have not started yet.
+    """
+    future = Future()
+
+    def run(attempt):
+        if future.cancelled():
+            return
+        try:
+            done, value = attempt_fn(attempt)
+        except BaseException as e:
+            settle(future, error=e)
+            return
+        if done:
+            settle(future, value)
+        else:
+            RATE_LIMITER.later(value, queue, attempt + 1).add_done_callback(forward)
+
+    def forward(scheduled):
+        # run() reports its own outcome; an exception here means it never got to run
+        if not scheduled.cancelled() and scheduled.exception() is not None:
+            settle(future, error=scheduled.exception())
+
+    def queue(attempt):
+        if future.cancelled():
+            return
+        try:
+            if provider:
+                scheduled = RATE_LIMITER.submit(provider, run, attempt, max_wait=max_wait, cost=cost)
+            else:
+                scheduled = RATE_LIMITER.later(0, run, attempt)
+        except RateLimited as e:
+            settle(future, error=e)
+            return
+        scheduled.add_done_callback(forward)
+
+    queue(0)
+    return future
+
+def submit_json(url, params=None, headers=None, provider=None, timeout=10, max_wait=None, conditional=True):
+    """GET a JSON document over the pooled session for its host; returns a Future.
+
+    Each attempt takes a slot from the provider's rate limiter. Connection errors,
+    429 and 5xx responses are retried with jittered backoff, and a 304 answer to a
+    conditional request returns the previously received payload.
+    """
+    host = urlsplit(url).netloc
+    session = get_session(host)
+    key = (url, tuple(sorted((params or {}).items())))
+    labels = {"provider": provider or host}
+
+    def attempt_fn(attempt):
+        request_headers = dict(headers or {})
+        validator = get_validator(key) if conditional else None
+        if validator:
+            etag, last_modified = validator[:2]
+            if etag:
+                request_headers['If-None-Match'] = etag
+            if last_modified:
+                request_headers['If-Modified-Since'] = last_modified
+
+        started = time.perf_counter()
+        try:
+            response = session.get(url, params=params, headers=request_headers, timeout=timeout)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            METRICS.observe("tickr_provider_request_seconds", time.perf_counter() - started, labels)
+            METRICS.inc("tickr_provider_errors_total", {**labels, "kind": type(e).__name__})
+            if attempt == MAX_RETRIES:
+                raise
+            return False, backoff_delay(attempt)
+
+        METRICS.observe("tickr_provider_request_seconds", time.perf_counter() - started, labels)
+        if response.status_code == 429:
+            METRICS.inc("tickr_provider_throttled_total", labels)
+        elif response.status_code >= 400:
+            METRICS.inc("tickr_provider_errors_total", {**labels, "kind": f"http_{response.status_code}"})
+        if response.status_code == 304 and validator:
+            return True, validator[2]
+        if response.status_code in RETRY_STATUSES and attempt < MAX_RETRIES:
+            return False, backoff_delay(attempt, response.headers.get('Retry-After'))
+        response.raise_for_status()
+
+        payload = response.json()
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if conditional and (etag or last_modified):
+            set_validator(key, etag, last_modified, payload, len(response.content))
+        return True, payload
+
+    return submit_attempts(provider, attempt_fn, max_wait)
+
+def get_json(url, params=None, headers=None, provider=None, timeout=10, max_wait=None, conditional=True):
+    """submit_json for callers that need the document before they can go on.
+
+    The calling thread waits on the Future, for its rate-limit slot too: pass
+    max_wait on interactive paths so an exhausted budget fails fast instead.
+    """
+    return submit_json(url, params, headers, provider, timeout, max_wait, conditional).result()
+
+def submit_call(provider, fn, *args, retry_on=(requests.ConnectionError, requests.Timeout), throttled_on=(), cost=1,
+                max_wait=None, **kwargs):
+    """Rate-limited call with jittered backoff for client libraries that bring their own HTTP stack; returns a Future"""
+    labels = {"provider": provider}
+
+    def attempt_fn(attempt):
+        started = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+            METRICS.observe("tickr_provider_request_seconds", time.perf_counter() - started, labels)
+            return True, result
+        except Exception as e:
+            METRICS.observe("tickr_provider_request_seconds", time.perf_counter() - started, labels)
+            if isinstance(e, throttled_on):
+                METRICS.inc("tickr_provider_throttled_total", labels)
+            else:
+                METRICS.inc("tickr_provider_errors_total", {**labels, "kind": type(e).__name__})
+            if not isinstance(e, retry_on):
+                raise
+            if attempt == MAX_RETRIES:
+                raise
+            return False, backoff_delay(attempt)
+
+    return submit_attempts(provider, attempt_fn, max_wait, cost)
+
+def call_with_retries(provider, fn, *args, retry_on=(requests.ConnectionError, requests.Timeout), throttled_on=(), cost=1,
+                      max_wait=None, **kwargs):
+    """submit_call for callers that need the result before they can go on; they wait on its Future like get_json"""
+    return submit_call(provider, fn, *args, retry_on=retry_on, throttled_on=throttled_on, cost=cost,
+                       max_wait=max_wait, **kwargs).result()
@@ -2,59 +2,212 @@ from PySide6.QtWidgets import (
     QMainWindow, QVBoxLayout, QWidget, QLabel,
     QLineEdit, QPushButton, QHBoxLayout, QFormLayout,
     QTabWidget, QGroupBox, QGridLayout, QSizePolicy, QMessageBox,
-    QComboBox
+    QComboBox, QStackedWidget, QCompleter
 )
-from PySide6.QtCore import Qt, QTimer, QThread, Signal, QObject, QPropertyAnimation, QEasingCurve, QUrl
-from PySide6.QtGui import QFont, QColor, QPalette, QLinearGradient, QBrush
-from .data import get_stock_data, get_crypto_data
+from PySide6.QtCore import Qt, QTimer, QThreadPool, QRunnable, Signal, QObject, QPropertyAnimation, QEasingCurve, QUrl, QEvent
+from PySide6.QtGui import QFont, QColor, QPalette, QLinearGradient, QBrush, QKeySequence, QShortcut, QStandardItemModel, QStandardItem
+from .formatting import format_market_cap
+from .scheduler import RefreshScheduler
+from .watchlist import WatchlistModel, WatchlistProxy, create_watchlist_view
+from .startup import on_first_paint
+from .coalescer import UpdateCoalescer
+from .symbols import SYMBOLS, COMPLETION_LIMIT
+from .metrics import METRICS
+from .paths import SNAPSHOT_FILE, data_path
+from .debug_panel import DebugPanel, EventLoopLagMonitor
 import os
+import sys
+import time
 from PySide6.QtGui import QIcon
-from PySide6.QtWebEngineWidgets import QWebEngineView
 
 
-class DataLoader(QObject):
-    finished = Signal(dict, bool, str)
-    error = Signal(str)
+WATCHLIST_BATCH_SIZE = 100
+WATCHLIST_VIEW = "watchlist"
+SNAPSHOT_INTERVAL = 60 * 1000
+# "native" draws our own fetched series; "tradingview" opens the embedded TradingView page instead
+CHART_BACKEND = os.getenv('TICKR_CHART_BACKEND', 'native').lower()
+TRADINGVIEW_URL = "https://www.tradingview.com/chart/?symbol={}"
 
-    def __init__(self, query, is_crypto, force_refresh, time_range="1d"):
-        super().__init__()
+def tradingview_symbol(symbol, is_crypto):
+    """EXCHANGE:SYMBOL for the TradingView page, from the symbol master when it knows the listing"""
+    if is_crypto:
+        return f"BINANCE:{symbol}USDT"
+    resolved = SYMBOLS.tradingview_symbol(symbol)
+    if resolved:
+        return resolved
+    # no symbol master yet (first run, offline): guess
+    nasdaq = {"AAPL", "MSFT", "GOOGL", "TSLA", "AMZN", "NVDA", "META", "QQQ"}
+    if symbol == "SPY":
+        return f"AMEX:{symbol}"
+    if symbol in nasdaq:
+        return f"NASDAQ:{symbol}"
+    return f"NYSE:{symbol}"
+
+def attach_symbol_completer(line_edit):
+    """Suggest listings from the local symbol master under a search box; the popup shows
+    ticker, name and exchange, choosing one fills in the ticker"""
+    model = QStandardItemModel(line_edit)
+    completer = QCompleter(model, line_edit)
+    completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+    completer.setCompletionRole(Qt.UserRole)
+    completer.setMaxVisibleItems(COMPLETION_LIMIT)
+
+    def suggest(text):
+        listings = SYMBOLS.complete(text)
+        model.clear()
+        for listing in listings:
+            item = QStandardItem(f"{listing.symbol}  ·  {listing.name}  ·  {listing.exchange_name}")
+            item.setData(listing.symbol, Qt.UserRole)
+            model.appendRow(item)
+
+    # textEdited fires before the line edit asks the completer for its popup
+    line_edit.textEdited.connect(suggest)
+    line_edit.setCompleter(completer)
+    return completer
+
+def create_tradingview_view():
+    # imported on demand: QtWebEngine starts Chromium processes that cost hundreds of MB each
+    from PySide6.QtWebEngineWidgets import QWebEngineView
+    view = QWebEngineView()
+    view.setMinimumHeight(350)
+    view.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+    return view
+
+class CancelToken:
+    """Shared flag a superseded load checks before fetching and before reporting back"""
+    __slots__ = ('cancelled',)
+
+    def __init__(self):
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+class LoadRequest:
+    __slots__ = ('view', 'query', 'is_crypto', 'force_refresh', 'time_range', 'generation', 'token')
+
+    def __init__(self, view, query, is_crypto, force_refresh, time_range, generation, token):
+        self.view = view
         self.query = query
         self.is_crypto = is_crypto
         self.force_refresh = force_refresh
         self.time_range = time_range
+        self.generation = generation
+        self.token = token
+
+class LoaderSignals(QObject):
+    """Signals of a pooled loader.
+
+    Parented to the window so the QObject is never destroyed on a worker thread
+    when the runnable goes away; `done` schedules its deletion on the GUI thread.
+    """
+    # the Quote object itself crosses threads, no copy into a QVariantMap
+    finished = Signal(object, object)
+    error = Signal(str, object)
+    done = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.done.connect(self.deleteLater)
+
+class DataLoader(QRunnable):
+    def __init__(self, request, parent=None):
+        super().__init__()
+        self.request = request
+        self.signals = LoaderSignals(parent)
+        self.finished = self.signals.finished
+        self.error = self.signals.error
+        self.queued_at = time.perf_counter()
 
     def run(self):
+        from .data import get_stock_data, get_crypto_data
+        request = self.request
+        started = time.perf_counter()
+        METRICS.observe("tickr_loader_queue_seconds", started - self.queued_at, {"loader": "quote"})
         try:
-            if not self.query:
-                self.error.emit("Please enter a valid symbol")
+            if request.token.cancelled:
+                return
+            if not request.query:
+                self.error.emit("Please enter a valid symbol", request)
                 return
 
-            data = get_crypto_data(self.query, self.force_refresh, self.time_range) if self.is_crypto else get_stock_data(self.query, self.force_refresh, self.time_range)
+            data = get_crypto_data(request.query, request.force_refresh, request.time_range) if request.is_crypto else get_stock_data(request.query, request.force_refresh, request.time_range)
             
+            if request.token.cancelled:
+                return
             if data:
-                self.finished.emit(data, self.is_crypto, "")
+                self.finished.emit(data, request)
             else:
-                self.error.emit(f"No data found for {self.query}. Try a different symbol.")
+                self.error.emit(f"No data found for {request.query}. Try a different symbol.", request)
         except Exception as e:
-            self.error.emit(f"Error fetching data: {str(e)}")
-
-def initiate_data_load(self, query, labels_dict, chart_widget, is_crypto, force_refresh=False):
-    """Start data loading in a separate thread"""
-    if self.data_thread and self.data_thread.isRunning():
-        self.data_thread.quit()
-        self.data_thread.wait()
-
-    self.data_thread = QThread()
-    self.data_loader = DataLoader(query, is_crypto, force_refresh, self.current_time_range)
-    self.data_loader.moveToThread(self.data_thread)
-    
-    self.data_thread.started.connect(self.data_loader.run)
-    self.data_loader.finished.connect(self.handle_data_loaded)
-    self.data_loader.error.connect(self.handle_data_error)
-    self.data_loader.finished.connect(self.data_thread.quit)
-    self.data_loader.error.connect(self.data_thread.quit)
-    
-    self.data_thread.start()
+            self.error.emit(f"Error fetching data: {str(e)}", request)
+        finally:
+            METRICS.observe("tickr_loader_run_seconds", time.perf_counter() - started, {"loader": "quote"})
+            self.signals.done.emit()
+
+class BatchLoader(QRunnable):
+    """Loads a whole list of stock symbols with one get_stocks_data call"""
+
+    def __init__(self, request, parent=None):
+        super().__init__()
+        self.request = request
+        self.signals = LoaderSignals(parent)
+        self.finished = self.signals.finished
+        self.error = self.signals.error
+        self.queued_at = time.perf_counter()
+
+    def run(self):
+        from .data import get_stocks_data
+        request = self.request
+        started = time.perf_counter()
+        METRICS.observe("tickr_loader_queue_seconds", started - self.queued_at, {"loader": "batch"})
+        try:
+            if request.token.cancelled:
+                return
+            quotes = get_stocks_data(request.query, request.force_refresh, request.time_range)
+            if not request.token.cancelled:
+                self.finished.emit(quotes, request)
+        except Exception as e:
+            self.error.emit(f"Error fetching data: {str(e)}", request)
+        finally:
+            METRICS.observe("tickr_loader_run_seconds", time.perf_counter() - started, {"loader": "batch"})
+            self.signals.done.emit()
+
+class Preloader(QRunnable):
+    """Imports the data and plotting stacks on the pool once the window is already up,
+    then puts the snapshot's quotes back into the data cache and loads the symbol master"""
+
+    def __init__(self, snapshot=None):
+        super().__init__()
+        self.snapshot = snapshot
+
+    def run(self):
+        from . import data, chart
+        if self.snapshot is not None:
+            self.snapshot.seed(data.DATA_CACHE)
+        # loads the local symbol master, downloading it on first run or once it is a week old
+        SYMBOLS.ensure()
+        # same for the coin index, so the first crypto search doesn't wait for the coin lists
+        data.COINS.ensure()
+
+class SnapshotWriter(QRunnable):
+    """Serializes and writes a snapshot payload off the GUI thread"""
+
+    def __init__(self, payload):
+        super().__init__()
+        self.payload = payload
+
+    def run(self):
+        from .snapshot import write_snapshot
+        try:
+            write_snapshot(self.payload)
+        except OSError as e:
+            print(f"Could not save snapshot: {e}")
+
+def set_text(label, text):
+    """setText only when the text differs, so unchanged fields cost no relayout or repaint"""
+    if label.text() != text:
+        label.setText(text)
 
 class PriceChangeVisualization(QLabel):
     def __init__(self, parent=None):
@@ -125,13 +278,35 @@ class TickrUI(QMainWindow):
         self.current_symbols = {}
         self.refresh_timer = QTimer(self)
         self.refresh_timer.timeout.connect(self.refresh_data)
-        self.refresh_interval = 10000
-        self.data_thread = None
-        self.data_loader = None
+        # the timer only polls the scheduler, which spreads the actual refreshes out
+        self.refresh_interval = 1000
+        self.scheduler = RefreshScheduler()
+        # loads run on a bounded pool; the GUI thread never waits for one to finish
+        self.thread_pool = QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(8)
+        self.load_generations = {}
+        self.load_tokens = {}
+        # results are applied at most once per frame, newest per view/symbol wins
+        self.coalescer = UpdateCoalescer(self)
         self.current_time_range = "1d"
+        # hidden tabs are placeholders until first shown: placeholder -> (attribute, builder)
+        self.pending_tabs = {}
+        self.first_paint_done = False
+        # last session's state; its quotes are shown as stale until refreshed
+        self.snapshot = self.read_snapshot()
+        self.snapshot_timer = QTimer(self)
+        self.snapshot_timer.timeout.connect(self.write_snapshot)
+        # F12 shows latency histograms and counters; the lag monitor runs regardless
+        self.lag_monitor = EventLoopLagMonitor(self)
+        self.debug_panel = None
+        QShortcut(QKeySequence(Qt.Key_F12), self, self.toggle_debug_panel)
 
         self.init_ui()
         self.apply_dark_theme()
+        if self.snapshot is not None:
+            self.tabs.setCurrentIndex(self.snapshot.current_tab)
+        self.snapshot_timer.start(SNAPSHOT_INTERVAL)
+        on_first_paint(self, self.start_background_work)
 
     def init_ui(self):
         main_widget = QWidget()
@@ -151,14 +326,67 @@ class TickrUI(QMainWindow):
         self.tabs = QTabWidget()
         
         self.stock_tab = self.build_tab(is_crypto=False)
-        self.crypto_tab = self.build_tab(is_crypto=True)
+        self.crypto_tab = None
+        self.watchlist_tab = None
 
         self.tabs.addTab(self.stock_tab, "Stocks")
-        self.tabs.addTab(self.crypto_tab, "Crypto")
+        self.add_deferred_tab("Crypto", 'crypto_tab', lambda: self.build_tab(is_crypto=True))
+        self.add_deferred_tab("Watchlist", 'watchlist_tab', self.build_watchlist_tab)
+        self.tabs.currentChanged.connect(self.on_tab_changed)
 
         main_layout.addWidget(self.tabs)
         self.refresh_timer.start(self.refresh_interval)
 
+    def start_background_work(self):
+        """Runs once the window has painted: refresh restored views, warm up the heavy imports, open web views if configured"""
+        self.first_paint_done = True
+        self.thread_pool.start(Preloader(self.snapshot))
+        for tab in (self.stock_tab, self.crypto_tab):
+            if tab is None:
+                continue
+            if tab.restored_quote is not None:
+                self.draw_chart(self.ensure_chart(tab), tab.restored_quote)
+            self.refresh_restored(tab)
+        if self.watchlist_tab is not None and self.watchlist_model.symbols:
+            self.initiate_batch_load(list(self.watchlist_model.symbols), force_refresh=True)
+        if CHART_BACKEND == "tradingview":
+            self.stock_tab.tradingview_button.setChecked(True)
+
+    def toggle_debug_panel(self):
+        if self.debug_panel is None:
+            self.debug_panel = DebugPanel(self)
+            self.addDockWidget(Qt.RightDockWidgetArea, self.debug_panel)
+            return
+        self.debug_panel.setVisible(not self.debug_panel.isVisible())
+
+    def add_deferred_tab(self, label, attribute, builder):
+        placeholder = QWidget()
+        self.pending_tabs[placeholder] = (attribute, builder)
+        self.tabs.addTab(placeholder, label)
+
+    def ensure_tab(self, index):
+        """Swap a placeholder for its real tab the first time it is needed"""
+        placeholder = self.tabs.widget(index)
+        pending = self.pending_tabs.pop(placeholder, None)
+        if pending is None:
+            return placeholder
+        attribute, builder = pending
+        tab = builder()
+        setattr(self, attribute, tab)
+        current = self.tabs.currentIndex()
+        label = self.tabs.tabText(index)
+        self.tabs.blockSignals(True)
+        self.tabs.removeTab(index)
+        self.tabs.insertTab(index, tab, label)
+        self.tabs.setCurrentIndex(current)
+        self.tabs.blockSignals(False)
+        placeholder.deleteLater()
+        return tab
+
+    def on_tab_changed(self, index):
+        self.ensure_tab(index)
+        self.update_visibility()
+
     def apply_dark_theme(self):
         dark_stylesheet = """
             QMainWindow {
@@ -252,11 +480,28 @@ class TickrUI(QMainWindow):
             QFormLayout {
                 color: #E0E0E0;
             }
+            QTableView {
+                background-color: #1E1E1E;
+                alternate-background-color: #242424;
+                color: #E0E0E0;
+                gridline-color: #333;
+                border: 1px solid #444;
+                selection-background-color: #3700B3;
+                selection-color: white;
+            }
+            QHeaderView::section {
+                background-color: #2A2A2A;
+                color: #BB86FC;
+                padding: 6px;
+                border: none;
+                border-bottom: 1px solid #444;
+            }
         """
         self.setStyleSheet(dark_stylesheet)
 
     def build_tab(self, is_crypto=False):
         tab = QWidget()
+        tab.view_key = "crypto" if is_crypto else "stocks"
         tab_layout = QVBoxLayout(tab)
         tab_layout.setContentsMargins(15, 15, 15, 15)
         tab_layout.setSpacing(15)
@@ -279,10 +524,16 @@ class TickrUI(QMainWindow):
         time_range_combo.addItems(["1h", "1d", "1w", "1m", "3m", "1y", "5y"])
         time_range_combo.setCurrentText("1d")
         time_range_combo.setMinimumHeight(40)
+
+        tradingview_button = QPushButton("TradingView")
+        tradingview_button.setCheckable(True)
+        tradingview_button.setMinimumHeight(40)
+        tradingview_button.setCursor(Qt.PointingHandCursor)
         
         search_layout.addWidget(search_input, stretch=2)
         search_layout.addWidget(time_range_combo)
         search_layout.addWidget(search_button)
+        search_layout.addWidget(tradingview_button)
         search_group.setLayout(search_layout)
 
         info_group = QGroupBox("Market Data")
@@ -299,33 +550,41 @@ class TickrUI(QMainWindow):
         info_layout.addWidget(volume_section, 1, 0, 1, 2)
         info_group.setLayout(info_layout)
 
-        # Replace ChartWidget with TradingView QWebEngineView
-        chart = QWebEngineView()
-        chart.setMinimumHeight(350)
-        chart.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
-        # Set default chart
-        if is_crypto:
-            chart.setUrl(QUrl("https://www.tradingview.com/chart/?symbol=BINANCE:BTCUSDT"))
-        else:
-            chart.setUrl(QUrl("https://www.tradingview.com/chart/?symbol=NASDAQ:AAPL"))
+        # the matplotlib chart is created with the first series (see ensure_chart)
+        chart_placeholder = QWidget()
+        chart_placeholder.setMinimumHeight(350)
+        chart_stack = QStackedWidget()
+        chart_stack.addWidget(chart_placeholder)
+        tab.chart = None
+        tab.tradingview = None
+        tab.tradingview_symbol = None
+
+        def sync_tradingview():
+            """Point the web view at the searched symbol, loading the page only when it changed"""
+            if tab.tradingview is None:
+                return
+            symbol = search_input.text().strip().upper() or ("BTC" if is_crypto else "AAPL")
+            tvsym = tradingview_symbol(symbol, is_crypto)
+            if tvsym != tab.tradingview_symbol:
+                tab.tradingview_symbol = tvsym
+                tab.tradingview.setUrl(QUrl(TRADINGVIEW_URL.format(tvsym)))
+
+        def toggle_tradingview(checked):
+            if checked and tab.tradingview is None:
+                tab.tradingview = create_tradingview_view()
+                chart_stack.addWidget(tab.tradingview)
+            if checked:
+                sync_tradingview()
+            chart_stack.setCurrentWidget(tab.tradingview if checked else (tab.chart or chart_placeholder))
+
+        tradingview_button.toggled.connect(toggle_tradingview)
 
         def initiate_search():
             symbol = search_input.text().strip().upper()
             self.current_time_range = time_range_combo.currentText()
-            # Update TradingView chart
-            if is_crypto:
-                chart.setUrl(QUrl(f"https://www.tradingview.com/chart/?symbol=BINANCE:{symbol}USDT"))
-            else:
-                # Guess exchange for TradingView (improve as needed)
-                nasdaq = {"AAPL", "MSFT", "GOOGL", "TSLA", "AMZN", "NVDA", "META", "QQQ"}
-                if symbol == "SPY":
-                    tvsym = f"AMEX:{symbol}"
-                elif symbol in nasdaq:
-                    tvsym = f"NASDAQ:{symbol}"
-                else:
-                    tvsym = f"NYSE:{symbol}"
-                chart.setUrl(QUrl(f"https://www.tradingview.com/chart/?symbol={tvsym}"))
-            # ...existing code to fetch and update market data...
+            if symbol:
+                self.scheduler.set_symbols(tab.view_key, [(symbol, is_crypto, self.current_time_range)])
+            sync_tradingview()
             self.initiate_data_load(
                 symbol,
                 {
@@ -333,62 +592,306 @@ class TickrUI(QMainWindow):
                     'stats_labels': stats_section.property('labels'),
                     'volume_labels': volume_section.property('labels')
                 },
-                chart,
+                tab.chart,
                 is_crypto
             )
 
         search_button.clicked.connect(initiate_search)
         search_input.returnPressed.connect(initiate_search)
+        if not is_crypto:
+            completer = attach_symbol_completer(search_input)
+            completer.activated.connect(lambda _: initiate_search())
+        # a new range means a different series, reload it right away
+        time_range_combo.currentTextChanged.connect(
+            lambda _: initiate_search() if search_input.text().strip() else None
+        )
 
         tab_layout.addWidget(search_group)
         tab_layout.addWidget(info_group)
-        tab_layout.addWidget(chart, stretch=1)
+        tab_layout.addWidget(chart_stack, stretch=1)
+        # before the first paint start_background_work does this, so startup never waits on Chromium
+        tradingview_button.setChecked(CHART_BACKEND == "tradingview" and self.first_paint_done)
 
         tab.info_group = info_group
-        tab.chart = chart
+        tab.chart_stack = chart_stack
+        tab.tradingview_button = tradingview_button
         tab.is_crypto = is_crypto
         tab.search_input = search_input
         tab.price_section = price_section
         tab.stats_section = stats_section
         tab.volume_section = volume_section
         tab.time_range_combo = time_range_combo
+        tab.restored_quote = None
+        self.restore_tab(tab)
 
         return tab
 
-    def initiate_data_load(self, query, labels_dict, chart_widget, is_crypto, force_refresh=False):
-        """Start data loading in a separate thread"""
-        if self.data_thread and self.data_thread.isRunning():
-            self.data_thread.quit()
-            self.data_thread.wait()
+    def labels_for(self, tab):
+        return {
+            'price_labels': tab.price_section.property('labels'),
+            'stats_labels': tab.stats_section.property('labels'),
+            'volume_labels': tab.volume_section.property('labels')
+        }
 
-        self.data_thread = QThread()
-        self.data_loader = DataLoader(query, is_crypto, force_refresh, self.current_time_range)
-        self.data_loader.moveToThread(self.data_thread)
-        
-        self.data_thread.started.connect(self.data_loader.run)
-        self.data_loader.finished.connect(self.handle_data_loaded)
-        self.data_loader.error.connect(self.handle_data_error)
-        self.data_loader.finished.connect(self.data_thread.quit)
-        self.data_loader.error.connect(self.data_thread.quit)
-        
-        self.data_thread.start()
+    def restore_tab(self, tab):
+        """Show the tab's last search from the snapshot, marked stale, and subscribe it for refreshes"""
+        state = self.snapshot.views.get(tab.view_key) if self.snapshot is not None else None
+        if not state or not state.get("symbol"):
+            return
+        symbol = state["symbol"]
+        time_range = state.get("time_range", "1d")
+        tab.time_range_combo.blockSignals(True)
+        tab.time_range_combo.setCurrentText(time_range)
+        tab.time_range_combo.blockSignals(False)
+        tab.search_input.setText(symbol)
+
+        quote = self.snapshot.find(symbol, time_range, "crypto" if tab.is_crypto else "stock")
+        if quote is not None:
+            tab.restored_quote = quote
+            # before the first paint the chart (and matplotlib) don't exist yet; start_background_work draws it
+            self.update_display(quote, self.labels_for(tab), self.ensure_chart(tab) if self.first_paint_done else None)
+
+        self.scheduler.set_symbols(tab.view_key, [(symbol, tab.is_crypto, time_range)])
+        # no network before the first paint; tabs built later refresh right away
+        if self.first_paint_done:
+            self.refresh_restored(tab)
+
+    def refresh_restored(self, tab):
+        """Force a refresh of the search a tab restored from the snapshot"""
+        symbol = tab.search_input.text().strip().upper()
+        if symbol:
+            self.initiate_data_load(symbol, self.labels_for(tab), tab.chart, tab.is_crypto,
+                                    force_refresh=True, time_range=tab.time_range_combo.currentText())
+
+    def read_snapshot(self):
+        """The last session's snapshot; numpy is only imported when there is one to read"""
+        if not os.path.exists(data_path(SNAPSHOT_FILE)):
+            return None
+        from .snapshot import load_snapshot
+        return load_snapshot()
+
+    def write_snapshot(self, wait=False):
+        """Persist cached quotes and each tab's search so the next launch can start warm.
+
+        The payload is collected here; serializing and writing it runs on the pool
+        unless `wait` is set, as on close when the pool is about to be cleared.
+        """
+        data = sys.modules.get(f"{__package__}.data")
+        if data is None:
+            # nothing was fetched this session; keep the previous snapshot as it is
+            return
+        views = dict(self.snapshot.views) if self.snapshot is not None else {}
+        for tab in (self.stock_tab, self.crypto_tab):
+            if tab is not None:
+                views[tab.view_key] = {
+                    "symbol": tab.search_input.text().strip().upper(),
+                    "time_range": tab.time_range_combo.currentText()
+                }
+        if self.watchlist_tab is not None:
+            views[WATCHLIST_VIEW] = {"symbols": list(self.watchlist_model.symbols)}
+        from .snapshot import build_snapshot
+        writer = SnapshotWriter(build_snapshot(data.DATA_CACHE, views, self.tabs.currentIndex()))
+        if wait:
+            writer.run()
+        else:
+            self.thread_pool.start(writer)
+
+    def ensure_chart(self, tab):
+        if tab.chart is None:
+            from .chart import ChartWidget
+            tab.chart = ChartWidget()
+            tab.chart.setMinimumHeight(350)
+            tab.chart.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+            tab.chart_stack.addWidget(tab.chart)
+            if not tab.tradingview_button.isChecked():
+                tab.chart_stack.setCurrentWidget(tab.chart)
+        return tab.chart
+
+    def build_watchlist_tab(self):
+        tab = QWidget()
+        tab.view_key = WATCHLIST_VIEW
+        tab_layout = QVBoxLayout(tab)
+        tab_layout.setContentsMargins(15, 15, 15, 15)
+        tab_layout.setSpacing(15)
+
+        controls_group = QGroupBox("Watchlist")
+        controls_group.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+        controls_layout = QHBoxLayout()
+        controls_layout.setContentsMargins(15, 15, 15, 15)
+        controls_layout.setSpacing(15)
+
+        symbols_input = QLineEdit()
+        symbols_input.setPlaceholderText("Add stock tickers, e.g. AAPL, MSFT, NVDA")
+        symbols_input.setMinimumHeight(40)
+
+        add_button = QPushButton("＋ Add")
+        add_button.setMinimumHeight(40)
+        add_button.setCursor(Qt.PointingHandCursor)
+
+        remove_button = QPushButton("Remove")
+        remove_button.setMinimumHeight(40)
+        remove_button.setCursor(Qt.PointingHandCursor)
+
+        filter_input = QLineEdit()
+        filter_input.setPlaceholderText("Filter")
+        filter_input.setMinimumHeight(40)
+
+        screen_input = QLineEdit()
+        screen_input.setPlaceholderText("Screen, e.g. pct_from_high > -2 and rel_volume > 1.5")
+        screen_input.setMinimumHeight(40)
+
+        controls_layout.addWidget(symbols_input, stretch=2)
+        controls_layout.addWidget(add_button)
+        controls_layout.addWidget(remove_button)
+        controls_layout.addWidget(filter_input, stretch=1)
+        controls_layout.addWidget(screen_input, stretch=2)
+        controls_group.setLayout(controls_layout)
+
+        self.watchlist_model = WatchlistModel(self)
+        self.watchlist_proxy = WatchlistProxy(self)
+        self.watchlist_proxy.setSourceModel(self.watchlist_model)
+        table = create_watchlist_view(self.watchlist_proxy)
+
+        def subscribe_watchlist():
+            self.scheduler.set_symbols(tab.view_key, [(symbol, False, "1y") for symbol in self.watchlist_model.symbols])
+
+        def add_symbols():
+            symbols = [symbol.strip().upper() for symbol in symbols_input.text().replace(" ", ",").split(",")]
+            new = self.watchlist_model.add_symbols(symbols)
+            symbols_input.clear()
+            if new:
+                subscribe_watchlist()
+                self.initiate_batch_load(new)
+
+        def remove_selected():
+            rows = table.selectionModel().selectedRows()
+            self.watchlist_model.remove_symbols([self.watchlist_proxy.data(index) for index in rows])
+            subscribe_watchlist()
+
+        add_button.clicked.connect(add_symbols)
+        symbols_input.returnPressed.connect(add_symbols)
+        remove_button.clicked.connect(remove_selected)
+        filter_input.textChanged.connect(self.watchlist_proxy.setFilterFixedString)
+        screen_input.returnPressed.connect(self.update_screen)
+
+        tab_layout.addWidget(controls_group)
+        tab_layout.addWidget(table, stretch=1)
 
-    def handle_data_loaded(self, data, is_crypto, error_message):
+        tab.table = table
+        tab.symbols_input = symbols_input
+        tab.filter_input = filter_input
+        tab.screen_input = screen_input
+
+        state = self.snapshot.views.get(WATCHLIST_VIEW) if self.snapshot is not None else None
+        if state and state.get("symbols"):
+            restored = self.watchlist_model.add_symbols(state["symbols"])
+            for symbol in restored:
+                quote = self.snapshot.find(symbol, "1y", "stock")
+                if quote is not None:
+                    self.watchlist_model.update_quote(quote)
+            subscribe_watchlist()
+            if self.first_paint_done:
+                self.initiate_batch_load(restored, force_refresh=True)
+
+        return tab
+
+    def update_screen(self):
+        """Narrow the watchlist to the symbols passing the screen expression, over the cached quotes"""
+        tab = self.watchlist_tab
+        if tab is None:
+            return
+        expression = tab.screen_input.text().strip()
+        if not expression:
+            self.watchlist_proxy.set_matches(None)
+            return
+        from .screener import SCREENER, ExpressionError
+        try:
+            rows = SCREENER.screen(expression)
+            error = ""
+        except ExpressionError as e:
+            rows = None
+            error = str(e)
+        if tab.screen_input.toolTip() != error:
+            tab.screen_input.setStyleSheet("border: 1px solid #CF6679;" if error else "")
+            tab.screen_input.setToolTip(error)
+        if rows is not None:
+            self.watchlist_proxy.set_matches({row["symbol"] for row in rows if row["type"] == "stock"})
+
+    def initiate_batch_load(self, symbols, force_refresh=False):
+        """Queue watchlist symbols on the worker pool in chunks of one bulk request each"""
+        view = WATCHLIST_VIEW
+        if view not in self.load_tokens:
+            self.load_generations[view] = 1
+            self.load_tokens[view] = CancelToken()
+        for start in range(0, len(symbols), WATCHLIST_BATCH_SIZE):
+            request = LoadRequest(view, symbols[start:start + WATCHLIST_BATCH_SIZE], False, force_refresh, "1y",
+                                  self.load_generations[view], self.load_tokens[view])
+            batch_loader = BatchLoader(request, self)
+            batch_loader.finished.connect(self.handle_batch_loaded)
+            batch_loader.error.connect(self.handle_batch_error)
+            self.thread_pool.start(batch_loader)
+
+    def handle_batch_loaded(self, quotes, request):
+        for symbol in request.query:
+            quote = quotes.get(symbol)
+            if quote is None:
+                self.scheduler.report_error(symbol)
+                continue
+            self.scheduler.report_success(symbol)
+            self.coalescer.push((WATCHLIST_VIEW, symbol), self.watchlist_model.update_quote, quote)
+
+    def handle_batch_error(self, error_message, request):
+        for symbol in request.query:
+            self.scheduler.report_error(symbol)
+        print(f"Watchlist refresh failed for {len(request.query)} symbols: {error_message}")
+
+    def initiate_data_load(self, query, labels_dict, chart_widget, is_crypto, force_refresh=False, time_range=None):
+        """Queue a data load on the worker pool.
+
+        A user search starts a new generation for its view and cancels the loads of
+        the previous one; refreshes join the current generation.
+        """
+        view = "crypto" if is_crypto else "stocks"
+        if not force_refresh or view not in self.load_tokens:
+            if view in self.load_tokens:
+                self.load_tokens[view].cancel()
+            self.load_generations[view] = self.load_generations.get(view, 0) + 1
+            self.load_tokens[view] = CancelToken()
+
+        request = LoadRequest(view, query, is_crypto, force_refresh, time_range or self.current_time_range,
+                              self.load_generations[view], self.load_tokens[view])
+        data_loader = DataLoader(request, self)
+        data_loader.finished.connect(self.handle_data_loaded)
+        data_loader.error.connect(self.handle_data_error)
+        self.thread_pool.start(data_loader)
+
+    def is_current(self, request):
+        return not request.token.cancelled and request.generation == self.load_generations.get(request.view)
+
+    def handle_data_loaded(self, data, request):
         """Handle successfully loaded data"""
-        tab = self.crypto_tab if is_crypto else self.stock_tab
-        self.update_display(
-            data,
-            {
-                'price_labels': tab.price_section.property('labels'),
-                'stats_labels': tab.stats_section.property('labels'),
-                'volume_labels': tab.volume_section.property('labels')
-            },
-            tab.chart
-        )
+        self.scheduler.report_success(data.symbol, request.is_crypto)
+        if not self.is_current(request):
+            # a late answer for a search that has since been replaced
+            return
+        self.coalescer.push(request.view, self.show_loaded, data, request)
+
+    def show_loaded(self, data, request):
+        # checked again: a newer search may have started while this waited for the next frame
+        if not self.is_current(request):
+            return
+        tab = self.crypto_tab if request.is_crypto else self.stock_tab
+        self.update_display(data, self.labels_for(tab), self.ensure_chart(tab))
 
-    def handle_data_error(self, error_message):
+    def handle_data_error(self, error_message, request):
         """Handle data loading errors"""
-        QMessageBox.warning(self, "Error", error_message)
+        if request.force_refresh:
+            # background refreshes back off quietly instead of popping a dialog every cycle
+            self.scheduler.report_error(request.query, request.is_crypto)
+            print(f"Refresh failed for {request.query}: {error_message}")
+            return
+        if self.is_current(request):
+            QMessageBox.warning(self, "Error", error_message)
 
     def create_price_section(self):
         group = QGroupBox("Price Information")
@@ -463,6 +966,7 @@ class TickrUI(QMainWindow):
         return group
 
     def update_display(self, data, labels_dict, chart_widget):
+        started = time.perf_counter()
         try:
             price_labels = labels_dict['price_labels']
             stats_labels = labels_dict['stats_labels']
@@ -478,74 +982,122 @@ class TickrUI(QMainWindow):
                 except:
                     return default
 
-            change = data.get('change', 0)
+            change = data.change or 0
             change_color = "#03DAC6" if change >= 0 else "#CF6679"
             
-            current_price = format_value(data.get('current'), '$')
-            price_labels['current'].setText(current_price)
+            current_price = format_value(data.current, '$')
+            set_text(price_labels['current'], current_price)
+            # a restored snapshot quote is greyed out until the first fresh fetch lands
+            style = "color: #9E9E9E;" if data.stale else "color: #BB86FC;"
+            if price_labels['current'].styleSheet() != style:
+                price_labels['current'].setStyleSheet(style)
+                price_labels['current'].setToolTip("Last known price, refreshing..." if data.stale else "")
             
             try:
-                current_price_num = float(data.get('current', 0))
-                price_labels['visualization'].update_value(current_price_num)
+                current_price_num = float(data.current or 0)
+                # restyle and animate only on an actual price move
+                if current_price_num != price_labels['visualization'].current_value:
+                    price_labels['visualization'].update_value(current_price_num)
             except (ValueError, TypeError):
                 pass
             
-            price_labels['open'].setText(format_value(data.get('open'), '$'))
-            price_labels['prev_close'].setText(format_value(data.get('prev_close'), '$'))
+            set_text(price_labels['open'], format_value(data.open, '$'))
+            set_text(price_labels['prev_close'], format_value(data.prev_close, '$'))
             
             change_text = (
                 f"<span style='color:{change_color}'>"
                 f"{'+' if change >= 0 else ''}"
                 f"{format_value(change, '', '')} "
-                f"({format_value(data.get('change_percent'), '', '%')})"
+                f"({format_value(data.change_percent, '', '%')})"
                 f"</span>"
             )
-            price_labels['change'].setText(change_text)
-
-            stats_labels['high'].setText(format_value(data.get('high'), '$'))
-            stats_labels['low'].setText(format_value(data.get('low'), '$'))
-            stats_labels['pe_ratio'].setText(format_value(data.get('pe_ratio')))
-            stats_labels['market_cap'].setText(format_value(data.get('market_cap'), '$'))
-
-            volume_labels['volume'].setText(format_value(data.get('volume'), default='0'))
-            volume_labels['avg_volume'].setText(format_value(data.get('avg_volume')))
-            bid = format_value(data.get('bid'), '$')
-            ask = format_value(data.get('ask'), '$')
-            volume_labels['bid_ask'].setText(f"{bid} / {ask}")
-
-            chart_data = data.get('data', [])
-            symbol = data.get('symbol', '')
-            if chart_data and isinstance(chart_data, list) and len(chart_data) > 0:
-                chart_widget.update_chart(chart_data, f"{symbol} Price History - {self.current_time_range}")
-            else:
-                chart_widget.update_chart([], "")
+            set_text(price_labels['change'], change_text)
+
+            set_text(stats_labels['high'], format_value(data.high, '$'))
+            set_text(stats_labels['low'], format_value(data.low, '$'))
+            set_text(stats_labels['pe_ratio'], format_value(data.pe_ratio))
+            set_text(stats_labels['market_cap'], format_value(format_market_cap(data.market_cap), '$'))
+
+            set_text(volume_labels['volume'], format_value(data.volume, default='0'))
+            set_text(volume_labels['avg_volume'], format_value(data.avg_volume))
+            bid = format_value(data.bid, '$')
+            ask = format_value(data.ask, '$')
+            set_text(volume_labels['bid_ask'], f"{bid} / {ask}")
+
+            if chart_widget is not None:
+                self.draw_chart(chart_widget, data)
 
         except Exception as e:
+            METRICS.inc("tickr_ui_errors_total", {"where": "update_display"})
             print(f"Error in update_display: {str(e)}")
             import traceback
             traceback.print_exc()
+        finally:
+            METRICS.observe("tickr_update_display_seconds", time.perf_counter() - started)
+
+    def draw_chart(self, chart_widget, data):
+        chart_data = data.data
+        if chart_data is not None and len(chart_data) > 0:
+            chart_widget.update_chart(chart_data, f"{data.symbol} Price History - {data.time_range}")
+        else:
+            chart_widget.update_chart([], "")
 
     def refresh_data(self):
-        """Refresh data for all active tabs"""
+        """Refresh whatever the scheduler says is due"""
+        tabs = {tab.view_key: tab for tab in (self.stock_tab, self.crypto_tab) if tab is not None}
+        watchlist_due = []
+        for view, symbol, is_crypto, time_range in self.scheduler.due():
+            if view == WATCHLIST_VIEW:
+                watchlist_due.append(symbol)
+                continue
+            tab = tabs.get(view)
+            if tab is None:
+                continue
+            self.initiate_data_load(
+                symbol,
+                {
+                    'price_labels': tab.price_section.property('labels'),
+                    'stats_labels': tab.stats_section.property('labels'),
+                    'volume_labels': tab.volume_section.property('labels')
+                },
+                tab.chart,
+                is_crypto,
+                force_refresh=True,
+                time_range=time_range
+            )
+        if watchlist_due:
+            self.initiate_batch_load(watchlist_due, force_refresh=True)
+        # quotes keep streaming in, so an active screen is re-evaluated on every tick
+        if self.watchlist_tab is not None and self.watchlist_tab.screen_input.text():
+            self.update_screen()
+
+    def update_visibility(self, *args):
+        """Only the current tab of a shown, non-minimized window refreshes at the fast cadence"""
+        window_visible = self.isVisible() and not self.isMinimized()
         for i in range(self.tabs.count()):
             tab = self.tabs.widget(i)
-            if hasattr(tab, 'search_input') and tab.search_input.text():
-                self.current_time_range = tab.time_range_combo.currentText()
-                self.initiate_data_load(
-                    tab.search_input.text().strip(),
-                    {
-                        'price_labels': tab.price_section.property('labels'),
-                        'stats_labels': tab.stats_section.property('labels'),
-                        'volume_labels': tab.volume_section.property('labels')
-                    },
-                    tab.chart,
-                    tab.is_crypto,
-                    force_refresh=True
-                )
+            if hasattr(tab, 'view_key'):
+                self.scheduler.set_visible(tab.view_key, window_visible and self.tabs.currentIndex() == i)
+
+    def changeEvent(self, event):
+        if event.type() == QEvent.WindowStateChange:
+            self.update_visibility()
+        super().changeEvent(event)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.update_visibility()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.update_visibility()
 
     def closeEvent(self, event):
-        """Clean up threads when closing the window"""
-        if self.data_thread and self.data_thread.isRunning():
-            self.data_thread.quit()
-            self.data_thread.wait()
-        event.accept()
\ No newline at end of file
+        """Save a snapshot, stop refreshing and drop outstanding loads when closing the window"""
+        self.write_snapshot(wait=True)
+        self.snapshot_timer.stop()
+        self.refresh_timer.stop()
+        for token in self.load_tokens.values():
+            token.cancel()
+        self.thread_pool.clear()
+        event.accept()
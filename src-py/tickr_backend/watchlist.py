@@ -0,0 +1,158 @@
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel
+from PySide6.QtGui import QColor
+from PySide6.QtWidgets import QTableView, QHeaderView, QAbstractItemView
+
+COLUMNS = ["Symbol", "Price", "Change %", "From 52W High", "From 52W Low"]
+UP_COLOR = QColor("#03DAC6")
+DOWN_COLOR = QColor("#CF6679")
+
+def percent_from(value, reference):
+    if value is None or not reference:
+        return None
+    return (value - reference) / reference * 100
+
+def row_values(quote):
+    """Raw per-column values of a quote, used for sorting"""
+    return [
+        quote.symbol,
+        quote.current,
+        quote.change_percent,
+        percent_from(quote.current, quote.high),
+        percent_from(quote.current, quote.low),
+    ]
+
+def format_cell(column, value):
+    if value is None:
+        return "--"
+    if column == 0:
+        return value
+    if column == 1:
+        return f"${value:,.2f}"
+    return f"{value:+.2f}%"
+
+class WatchlistModel(QAbstractTableModel):
+    """Flat table of quotes keyed by symbol.
+
+    Rows keep both raw values (sort role) and their formatted text; an update only
+    emits dataChanged for the cells whose text actually changed, so views repaint
+    just those cells while quotes stream in.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.symbols = []
+        self.rows = {}
+        self.values = []
+        self.texts = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.symbols)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+        if role == Qt.DisplayRole:
+            return self.texts[row][column]
+        if role == Qt.UserRole:
+            value = self.values[row][column]
+            # missing numbers sort below every real one
+            return float("-inf") if value is None else value
+        if role == Qt.ForegroundRole and column == 2:
+            value = self.values[row][column]
+            if value is not None:
+                return UP_COLOR if value >= 0 else DOWN_COLOR
+        if role == Qt.TextAlignmentRole and column > 0:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return COLUMNS[section]
+        return None
+
+    def add_symbols(self, symbols):
+        new = [symbol for symbol in dict.fromkeys(symbols) if symbol and symbol not in self.rows]
+        if not new:
+            return []
+        first = len(self.symbols)
+        self.beginInsertRows(QModelIndex(), first, first + len(new) - 1)
+        for symbol in new:
+            self.rows[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+            self.values.append([symbol] + [None] * (len(COLUMNS) - 1))
+            self.texts.append([symbol] + ["--"] * (len(COLUMNS) - 1))
+        self.endInsertRows()
+        return new
+
+    def remove_symbols(self, symbols):
+        for row in sorted((self.rows[symbol] for symbol in symbols if symbol in self.rows), reverse=True):
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self.symbols[row]
+            del self.values[row]
+            del self.texts[row]
+            self.endRemoveRows()
+        self.rows = {symbol: row for row, symbol in enumerate(self.symbols)}
+
+    def update_quote(self, quote):
+        row = self.rows.get(quote.symbol)
+        if row is None:
+            return
+        values = row_values(quote)
+        texts = [format_cell(column, value) for column, value in enumerate(values)]
+        old_texts = self.texts[row]
+        self.values[row] = values
+        changed = [column for column in range(len(COLUMNS)) if texts[column] != old_texts[column]]
+        if not changed:
+            return
+        self.texts[row] = texts
+        # one signal per contiguous run of changed cells
+        start = previous = changed[0]
+        for column in changed[1:] + [None]:
+            if column is not None and column == previous + 1:
+                previous = column
+                continue
+            self.dataChanged.emit(self.index(row, start), self.index(row, previous),
+                                  [Qt.DisplayRole, Qt.UserRole, Qt.ForegroundRole])
+            if column is not None:
+                start = previous = column
+
+class WatchlistProxy(QSortFilterProxyModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setSortRole(Qt.UserRole)
+        self.setFilterKeyColumn(0)
+        self.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        self.setDynamicSortFilter(True)
+        # symbols passing the active screen, None when no screen is set
+        self.matches = None
+
+    def set_matches(self, matches):
+        if matches == self.matches:
+            return
+        self.matches = matches
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if self.matches is not None and self.sourceModel().symbols[source_row] not in self.matches:
+            return False
+        return super().filterAcceptsRow(source_row, source_parent)
+
+def create_watchlist_view(proxy):
+    view = QTableView()
+    view.setModel(proxy)
+    view.setSortingEnabled(True)
+    view.setSelectionBehavior(QAbstractItemView.SelectRows)
+    view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+    view.setAlternatingRowColors(True)
+    view.setWordWrap(False)
+    # fixed row heights keep layout O(1) per row instead of measuring every cell
+    view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+    view.verticalHeader().setDefaultSectionSize(28)
+    view.verticalHeader().setVisible(False)
+    view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+    view.sortByColumn(0, Qt.AscendingOrder)
+    return view